@@ -19,8 +19,15 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
-from importlib.metadata import version, PackageNotFoundError
-import gi
+import sys
+from proton.vpn.app.gtk.utils.startup_profiler import startup_profiler
+
+# The startup profiler is enabled as soon as possible to record import times.
+startup_profiler.enable_if_requested(sys.argv)
+
+# pylint: disable=wrong-import-position
+from importlib.metadata import version, PackageNotFoundError  # noqa: E402
+import gi  # noqa: E402
 
 try:
     __version__ = version("proton-vpn-gtk-app")
@@ -31,8 +38,12 @@ gi.require_version("Gtk", "3.0")
 from gi.repository import Gtk  # pylint: disable=C0413 # noqa: E402
 
 from proton.vpn import logging  # pylint: disable=C0413 # noqa: E402
+from proton.vpn.app.gtk.utils import async_logging  # pylint: disable=C0413 # noqa: E402
 
 
 logging.config(filename="vpn-app")
+if async_logging.AsyncLoggingPipeline.is_enabled_in_environment():
+    # Log records are written from a background thread instead of from the GTK one.
+    async_logging.enable()
 
 __all__ = [Gtk]
@@ -24,15 +24,32 @@ import sys
 
 from proton.vpn.app.gtk.app import App
 from proton.vpn.app.gtk.controller import Controller
-from proton.vpn.app.gtk.utils.executor import AsyncExecutor
+from proton.vpn.app.gtk.utils.executor import AsyncExecutor, EventLoopMode
+from proton.vpn.app.gtk.utils.startup_profiler import (
+    startup_profiler, remove_profile_startup_option
+)
+from proton.vpn.app.gtk.utils.watchdog import LagWatchdog
 
 
 def main():
     """Runs the app."""
 
-    with AsyncExecutor() as executor:
-        controller = Controller.get(executor)
-        sys.exit(App(controller).run(sys.argv))
+    startup_profiler.mark("main")
+
+    executor = AsyncExecutor(loop_mode=EventLoopMode.from_environment())
+    with startup_profiler.phase("AsyncExecutor.start"):
+        executor.start()
+
+    try:
+        if LagWatchdog.is_enabled_in_environment():
+            LagWatchdog(executor).start()
+
+        with startup_profiler.phase("Controller.get"):
+            controller = Controller.get(executor)
+
+        sys.exit(App(controller).run(remove_profile_startup_option(sys.argv)))
+    finally:
+        executor.stop()
 
 
 if __name__ == "__main__":
@@ -28,7 +28,11 @@ from proton.vpn import logging
 from proton.vpn.app.gtk.controller import Controller
 from proton.vpn.app.gtk.widgets.main.tray_indicator import TrayIndicator, TrayIndicatorNotSupported
 from proton.vpn.app.gtk.widgets.main.main_window import MainWindow
+from proton.vpn.app.gtk.assets import icons
 from proton.vpn.app.gtk.assets.style import STYLE_PATH
+from proton.vpn.app.gtk.config import REFRESHER_METRICS_FILE
+from proton.vpn.app.gtk.utils.executor import TaskPriority
+from proton.vpn.app.gtk.utils.startup_profiler import startup_profiler
 
 logger = logging.getLogger(__name__)
 
@@ -48,6 +52,8 @@ class App(Gtk.Application):
        exits automatically when the last one is closed.
      - It allows desktop shell integration by exporting actions and menus.
     """
+    # Maximum amount of time to wait for pending writes on quit.
+    FLUSH_TIMEOUT_IN_SECONDS = 5
 
     def __init__(
             self,
@@ -66,42 +72,84 @@ class App(Gtk.Application):
         Runs at application startup, to load
         any necessary UI elements.
         """
-        Gtk.Application.do_startup(self)
-        css_provider = Gtk.CssProvider()
-        css_provider.load_from_path(str(STYLE_PATH / "main.css"))
+        with startup_profiler.phase("App.do_startup"):
+            Gtk.Application.do_startup(self)
+            css_provider = Gtk.CssProvider()
+            css_provider.load_from_path(str(STYLE_PATH / "main.css"))
+
+            screen = Gdk.Screen.get_default()
+            Gtk.StyleContext.add_provider_for_screen(
+                screen,
+                css_provider,
+                Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
+            )
 
-        screen = Gdk.Screen.get_default()
-        Gtk.StyleContext.add_provider_for_screen(
-            screen,
-            css_provider,
-            Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
-        )
+            # Icons are pre-rendered in the background before the server list is built.
+            self._controller.executor.submit_with_options(
+                icons.warm_up,
+                kwargs={
+                    "scale": icons.get_default_scale_factor(),
+                    "disk_cache_dir": icons.DISK_CACHE_DIR
+                },
+                priority=TaskPriority.BACKGROUND
+            )
 
     def do_activate(self):  # pylint: disable=W0221
         """
         Method called by Gtk.Application when the default first window should
         be shown to the user.
         """
-        if not self.window:
-            self.window = MainWindow(self, self._controller)
-            # Process signal connection requests asap.
-            self._process_signal_connect_queue()
-            # Windows are associated with the application like this.
-            # When the last one is closed, the application shuts down.
-            self.add_window(self.window)
-            # The behaviour of the button to close the window is configured
-            # depending on whether the tray indicator is shown or not.
-            self.tray_indicator = self._build_tray_indicator_if_possible(
-                self._controller, self.window
-            )
-            self.window.configure_close_button_behaviour(
-                tray_indicator_enabled=(self.tray_indicator is not None)
-            )
-            self.window.show_all()
+        with startup_profiler.phase("App.do_activate"):
+            if not self.window:
+                with startup_profiler.phase("MainWindow"):
+                    self.window = MainWindow(self, self._controller)
+                # Process signal connection requests asap.
+                self._process_signal_connect_queue()
+                # Windows are associated with the application like this.
+                # When the last one is closed, the application shuts down.
+                self.add_window(self.window)
+                # The behaviour of the button to close the window is configured
+                # depending on whether the tray indicator is shown or not.
+                with startup_profiler.phase("TrayIndicator"):
+                    self.tray_indicator = self._build_tray_indicator_if_possible(
+                        self._controller, self.window
+                    )
+                self.window.configure_close_button_behaviour(
+                    tray_indicator_enabled=(self.tray_indicator is not None)
+                )
+                self.window.show_all()
 
-        self.window.present()
+            self.window.present()
         self.emit("app-ready")
 
+    def do_shutdown(self):  # pylint: disable=arguments-differ
+        """Default GTK method.
+
+        Runs when the application is about to quit.
+        """
+        # Pending writes are flushed, since the main loop is about to stop.
+        try:
+            self._controller.flush_settings().result(timeout=self.FLUSH_TIMEOUT_IN_SECONDS)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Unable to save settings on quit.")
+        try:
+            self._controller.app_config_store.flush().result(
+                timeout=self.FLUSH_TIMEOUT_IN_SECONDS
+            )
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Unable to save app configuration on quit.")
+        try:
+            self._controller.reconnection_metrics.flush().result(
+                timeout=self.FLUSH_TIMEOUT_IN_SECONDS
+            )
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Unable to save reconnection metrics on quit.")
+        try:
+            self._controller.vpn_data_refresher.metrics.dump(REFRESHER_METRICS_FILE)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Unable to save refresher metrics on quit.")
+        Gtk.Application.do_shutdown(self)
+
     @property
     def error_dialog(self) -> Gtk.MessageDialog:
         """
@@ -17,7 +17,13 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
-from proton.vpn.app.gtk.assets.icons.icons import get, ICONS_PATH
+from proton.vpn.app.gtk.assets.icons.icons import (
+    get, set_on_image, warm_up, get_default_scale_factor,
+    ICONS_PATH, DISK_CACHE_DIR, SERVER_LIST_ICONS
+)
 
 
-__all__ = ["get", "ICONS_PATH"]
+__all__ = [
+    "get", "set_on_image", "warm_up", "get_default_scale_factor",
+    "ICONS_PATH", "DISK_CACHE_DIR", "SERVER_LIST_ICONS"
+]
@@ -4,21 +4,46 @@ Utility module to load and cache icons.
 We should consider to switch to Gtk.IconTheme:
 https://docs.gtk.org/gtk3/class.IconTheme.html
 """
+import hashlib
+import os
 from pathlib import Path
-from typing import Optional
+from threading import Lock
+from typing import Iterable, Optional
 
-from gi.repository import GdkPixbuf
+from gi.repository import Gdk, GdkPixbuf, Gtk
+
+from proton.vpn import logging
+from proton.vpn.app.gtk.config import ICONS_CACHE_DIR
+
+logger = logging.getLogger(__name__)
 
 ICONS_PATH = Path(__file__).parent
 
+# Directory where rendered icons are cached as PNG files across app runs.
+DISK_CACHE_DIR = Path(ICONS_CACHE_DIR)
+
+# Icons rendered while building the server list, which are worth pre-rendering.
+SERVER_LIST_ICONS = (
+    Path("maintenance-icon.svg"),
+    Path("servers/smart-routing.svg"),
+    Path("servers/streaming.svg"),
+    Path("servers/p2p.svg"),
+    Path("servers/tor.svg"),
+    Path("servers/secure-core.svg"),
+)
+
 _cache = {}
+# Icons are rendered both from the main thread and from worker threads.
+_cache_lock = Lock()
 
 
 def get(
         relative_path: Path,
         width: Optional[int] = None,
         height: Optional[int] = None,
-        preserve_aspect_ratio: bool = True
+        preserve_aspect_ratio: bool = True,
+        scale: int = 1,
+        disk_cache_dir: Optional[Path] = None
 ) -> GdkPixbuf.Pixbuf:
     """
     Loads the image (if it wasn't cached), caches it and returns it.
@@ -27,13 +52,18 @@ def get(
     :param height: Optional height of the image to be loaded.
     :param preserve_aspect_ratio: Whether the aspect ratio should be preserved
     or not. The default is True.
+    :param scale: Scale factor of the monitor the image is displayed on. The
+    returned image size is multiplied by it. The default is 1.
+    :param disk_cache_dir: Optional directory where rendered images are
+    cached as PNG files, so that SVG files don't need to be parsed again.
     """
     # Pixbuf API quirks.
     width = width if width is not None else -1
     height = height if height is not None else -1
 
-    cache_key = (relative_path, width, height, preserve_aspect_ratio)
-    cached_icon = _cache.get(cache_key)
+    cache_key = (relative_path, width, height, preserve_aspect_ratio, scale)
+    with _cache_lock:
+        cached_icon = _cache.get(cache_key)
     if cached_icon:
         return cached_icon
 
@@ -41,11 +71,130 @@ def get(
     if not full_path.is_file():
         raise ValueError(f"File not found: {full_path}")
 
-    filename = str(ICONS_PATH / relative_path)
-    pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(
-        filename=filename, width=width, height=height,
-        preserve_aspect_ratio=preserve_aspect_ratio
-    )
-    _cache[cache_key] = pixbuf
+    pixbuf = None
+    disk_cache_path = None
+    if disk_cache_dir:
+        # The requested size is part of the key, rather than the scaled size,
+        # so that the image file does not need to be parsed on cache hits.
+        disk_cache_path = _get_disk_cache_path(
+            disk_cache_dir, full_path, width, height, preserve_aspect_ratio, scale
+        )
+        pixbuf = _load_from_disk_cache(disk_cache_path)
+
+    if not pixbuf:
+        if scale != 1:
+            width, height = _get_scaled_size(full_path, width, height, scale)
+        pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(
+            filename=str(full_path), width=width, height=height,
+            preserve_aspect_ratio=preserve_aspect_ratio
+        )
+        if disk_cache_path:
+            _save_to_disk_cache(disk_cache_path, pixbuf)
+
+    with _cache_lock:
+        _cache[cache_key] = pixbuf
 
     return pixbuf
+
+
+def set_on_image(
+        image: Gtk.Image,
+        relative_path: Path,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        disk_cache_dir: Optional[Path] = DISK_CACHE_DIR
+):
+    """
+    Sets the icon on the image, rendered for the scale factor of the image,
+    and renders it again whenever the scale factor changes.
+
+    On HiDPI monitors, the icon is rendered at the scaled size and set as a
+    cairo surface, so that GTK does not upscale it. Icons not pre-rendered
+    yet at that scale are loaded from the disk cache when available.
+    """
+    def render(*_):
+        scale = image.get_scale_factor()
+        pixbuf = get(
+            relative_path, width=width, height=height, scale=scale,
+            disk_cache_dir=disk_cache_dir
+        )
+        if scale == 1:
+            image.set_from_pixbuf(pixbuf)
+        else:
+            image.set_from_surface(
+                Gdk.cairo_surface_create_from_pixbuf(pixbuf, scale, None)
+            )
+
+    render()
+    image.connect("notify::scale-factor", render)
+
+
+def warm_up(
+        relative_paths: Iterable[Path] = SERVER_LIST_ICONS,
+        scale: int = 1,
+        disk_cache_dir: Optional[Path] = None
+):
+    """
+    Renders the icons at their natural size and stores them in the cache.
+
+    It's meant to be run on a worker thread at startup, so that icons don't
+    have to be rendered on the main thread while building the UI.
+    """
+    for relative_path in relative_paths:
+        try:
+            get(relative_path, scale=scale, disk_cache_dir=disk_cache_dir)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception(f"Unable to pre-render icon {relative_path}.")
+
+
+def get_default_scale_factor() -> int:
+    """Returns the scale factor of the primary monitor."""
+    display = Gdk.Display.get_default()
+    if not display:
+        return 1
+    monitor = display.get_primary_monitor() or display.get_monitor(0)
+    return monitor.get_scale_factor() if monitor else 1
+
+
+def _get_scaled_size(full_path: Path, width: int, height: int, scale: int):
+    if width == -1 and height == -1:
+        _format, width, height = GdkPixbuf.Pixbuf.get_file_info(str(full_path))
+    return (
+        width * scale if width != -1 else -1,
+        height * scale if height != -1 else -1
+    )
+
+
+def _get_disk_cache_path(
+        disk_cache_dir: Path, full_path: Path,
+        width: int, height: int, preserve_aspect_ratio: bool, scale: int
+) -> Path:
+    # The file hash is part of the key so that cached images are not
+    # used anymore once the source image changes.
+    file_hash = hashlib.sha256(full_path.read_bytes()).hexdigest()[:16]
+    return disk_cache_dir / (
+        f"{full_path.stem}-{file_hash}-{width}x{height}@{scale}x"
+        f"{'' if preserve_aspect_ratio else '-stretched'}.png"
+    )
+
+
+def _load_from_disk_cache(disk_cache_path: Path) -> Optional[GdkPixbuf.Pixbuf]:
+    if not disk_cache_path.is_file():
+        return None
+    try:
+        return GdkPixbuf.Pixbuf.new_from_file(str(disk_cache_path))
+    except Exception:  # pylint: disable=broad-except
+        logger.warning(f"Unable to load cached icon {disk_cache_path}.")
+        return None
+
+
+def _save_to_disk_cache(disk_cache_path: Path, pixbuf: GdkPixbuf.Pixbuf):
+    try:
+        disk_cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # The image is written to a temporary file first so that other
+        # instances never read a partially written image.
+        tmp_path = disk_cache_path.with_suffix(f".{os.getpid()}.tmp")
+        pixbuf.savev(str(tmp_path), "png", [], [])
+        os.replace(tmp_path, disk_cache_path)
+    except Exception:  # pylint: disable=broad-except
+        logger.warning(f"Unable to cache icon {disk_cache_path}.")
@@ -36,6 +36,26 @@ APP_CONFIG = os.path.join(
     "app-config.json"
 )
 
+ICONS_CACHE_DIR = os.path.join(
+    VPNExecutionEnvironment().path_cache,
+    "icons"
+)
+
+RECONNECTION_METRICS_FILE = os.path.join(
+    VPNExecutionEnvironment().path_cache,
+    "reconnection-metrics.json"
+)
+
+REFRESHER_METRICS_FILE = os.path.join(
+    VPNExecutionEnvironment().path_cache,
+    "refresher-metrics.json"
+)
+
+AUTO_PROTOCOL_CACHE_FILE = os.path.join(
+    VPNExecutionEnvironment().path_cache,
+    "auto-protocol.json"
+)
+
 
 @dataclass
 class AppConfig:
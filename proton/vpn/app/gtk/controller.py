@@ -17,30 +17,43 @@ You should have received a copy of the GNU General Public License
 along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
 from __future__ import annotations
+import asyncio
+import copy
+import dataclasses
+import time
 from concurrent.futures import Future
 from importlib import metadata
 from types import TracebackType
 
-from typing import Optional, Type
+from typing import Callable, List, Optional, Type
 
 from proton.vpn import logging
 
+from proton.session.exceptions import ProtonAPINotReachable, ProtonAPINotAvailable
 from proton.vpn.connection import VPNConnection, states
 from proton.vpn.core.api import ProtonVPNAPI, VPNAccount
 from proton.vpn.core.session import ClientTypeMetadata
 from proton.vpn.core.connection import VPNConnectorWrapper
-from proton.vpn.core.cache_handler import CacheHandler
 from proton.vpn.session.servers import LogicalServer
-
-from proton.vpn.app.gtk.services import VPNDataRefresher, VPNReconnector
-from proton.vpn.app.gtk.services.reconnector.network_monitor import NetworkMonitor
+from proton.vpn.session.servers.logicals import ServerList
+
+from proton.vpn.app.gtk.services import (
+    AppConfigStore, AutoProtocolSelector, LatencyProber, VPNDataRefresher, VPNReconnector
+)
+from proton.vpn.app.gtk.services.auto_protocol import AUTO_PROTOCOL
+from proton.vpn.app.gtk.services.latency_prober import get_candidates
+from proton.vpn.app.gtk.services.reconnector.network_monitor import NetlinkNetworkMonitor
+from proton.vpn.app.gtk.services.reconnector.reconnection_metrics import ReconnectionMetrics
 from proton.vpn.app.gtk.services.reconnector.session_monitor import SessionMonitor
 from proton.vpn.app.gtk.services.reconnector.vpn_monitor import VPNMonitor
 from proton.vpn.core.settings import Settings
+from proton.vpn.session import BugReportForm
 from proton.vpn.app.gtk.utils import semver
-from proton.vpn.app.gtk.utils.executor import AsyncExecutor
-from proton.vpn.app.gtk.widgets.headerbar.menu.bug_report_dialog import BugReportForm
-from proton.vpn.app.gtk.config import AppConfig, APP_CONFIG
+from proton.vpn.app.gtk.utils.debounce import DebouncedWriter
+from proton.vpn.app.gtk.utils.executor import AsyncExecutor, chain_future
+from proton.vpn.app.gtk.utils.glib import run_on_main_thread
+from proton.vpn.app.gtk.utils.startup_profiler import startup_profiler
+from proton.vpn.app.gtk.config import AppConfig
 from proton.vpn.connection.enum import KillSwitchSetting as KillSwitchSettingEnum
 
 logger = logging.getLogger(__name__)
@@ -49,12 +62,27 @@ logger = logging.getLogger(__name__)
 class Controller:  # pylint: disable=too-many-public-methods, too-many-instance-attributes
     """The C in the MVC pattern."""
     DEFAULT_BACKEND = "linuxnetworkmanager"
+    # Server loads older than this are updated before choosing a server to connect to.
+    SERVER_LOADS_MAX_AGE_IN_SECONDS = 5 * 60
+    # Maximum amount of time to wait for the server loads update before
+    # falling back to the cached server loads.
+    SERVER_LOADS_UPDATE_TIMEOUT_IN_SECONDS = 3
 
     @staticmethod
     def get(executor: AsyncExecutor):
-        """Preferred method to get an instance of Controller."""
+        """
+        Preferred method to get an instance of Controller.
+
+        The VPN connector is initialized in the background, so that the UI
+        can be built in the meantime. See ``vpn_connector_ready``.
+        """
         controller = Controller(executor)
-        executor.submit(controller.initialize_vpn_connector).result()
+        controller.preload_settings()
+        controller.app_config_store.preload()
+        controller.reconnection_metrics.preload()
+        future = executor.submit(controller.initialize_vpn_connector)
+        # Bubble up exceptions if any.
+        future.add_done_callback(lambda f: run_on_main_thread(f.result))
         return controller
 
     def __init__(
@@ -66,9 +94,16 @@ class Controller:  # pylint: disable=too-many-public-methods, too-many-instance-
         vpn_reconnector: VPNReconnector = None,
         app_config: AppConfig = None,
         settings: Settings = None,
-        cache_handler: CacheHandler = None
+        app_config_store: AppConfigStore = None,
+        reconnection_metrics: ReconnectionMetrics = None,
+        auto_protocol_selector: AutoProtocolSelector = None,
+        latency_prober: LatencyProber = None,
+        server_loads_max_age_in_seconds: float = SERVER_LOADS_MAX_AGE_IN_SECONDS,
+        server_loads_update_timeout_in_seconds: float = SERVER_LOADS_UPDATE_TIMEOUT_IN_SECONDS
     ):  # pylint: disable=too-many-arguments
         self.executor = executor
+        self.server_loads_max_age_in_seconds = server_loads_max_age_in_seconds
+        self.server_loads_update_timeout_in_seconds = server_loads_update_timeout_in_seconds
 
         client_type_metadata = ClientTypeMetadata(
             type="gui", version=semver.from_pep440(self.app_version)
@@ -80,10 +115,34 @@ class Controller:  # pylint: disable=too-many-public-methods, too-many-instance-
         )
         self._connector = vpn_connector
         self.reconnector = vpn_reconnector
+        self._vpn_connector_ready = Future()
+        # Whether the VPN connector readiness was already handled on the main thread.
+        self._vpn_connector_ready_handled = False
+        # Subscribers registered before the VPN connector was ready.
+        self._pending_connection_status_subscribers: List = []
+        self._reconnector_enabled = False
+        if vpn_connector:
+            self._vpn_connector_ready.set_result(vpn_connector)
+            self._vpn_connector_ready_handled = True
 
-        self._app_config = app_config
         self._settings = settings
-        self._cache_handler = cache_handler or CacheHandler(APP_CONFIG)
+        self._settings_load: Optional[Future] = None
+        # Default settings handed out before settings were loaded, and a copy
+        # of them to find out the changes to apply to the loaded settings.
+        self._default_settings: Optional[Settings] = None
+        self._unchanged_default_settings: Optional[Settings] = None
+        self._settings_writer = DebouncedWriter(
+            self.executor, self._api.save_settings, name="settings"
+        )
+        self.app_config_store = app_config_store or AppConfigStore(
+            self.executor, app_config=app_config
+        )
+        self.reconnection_metrics = reconnection_metrics or ReconnectionMetrics(self.executor)
+        self.auto_protocol_selector = auto_protocol_selector or AutoProtocolSelector(self.executor)
+        self._auto_protocol_selector_registered = False
+        self.latency_prober = latency_prober or LatencyProber(
+            vpn_connection_active_getter=lambda: self.is_connection_active
+        )
 
         self._api.usage_reporting.init(
             client_type_metadata,
@@ -94,16 +153,81 @@ class Controller:  # pylint: disable=too-many-public-methods, too-many-instance-
         """
         Runs the required initializations to be able to start new VPN connections.
         """
-        self._connector = await self._api.get_vpn_connector()
+        try:
+            with startup_profiler.phase("Controller.initialize_vpn_connector"):
+                connector = await self._api.get_vpn_connector()
+
+                self.reconnector = VPNReconnector(
+                    vpn_connector=connector,
+                    vpn_data_refresher=self.vpn_data_refresher,
+                    vpn_monitor=VPNMonitor(vpn_connector=connector),
+                    network_monitor=NetlinkNetworkMonitor(executor=self.executor),
+                    session_monitor=SessionMonitor(),
+                    async_executor=self.executor,
+                    metrics=self.reconnection_metrics,
+                    fallback_protocol_getter=self.auto_protocol_selector.get_fallback_protocol
+                )
+                self._connector = connector
+        except BaseException as error:
+            self._vpn_connector_ready.set_exception(error)
+            raise
+
+        self._vpn_connector_ready.set_result(connector)
+        run_on_main_thread(self._on_vpn_connector_ready)
 
-        self.reconnector = VPNReconnector(
-            vpn_connector=self._connector,
-            vpn_data_refresher=self.vpn_data_refresher,
-            vpn_monitor=VPNMonitor(vpn_connector=self._connector),
-            network_monitor=NetworkMonitor(pool=self.executor),
-            session_monitor=SessionMonitor(),
-            async_executor=self.executor
-        )
+    @property
+    def vpn_connector_ready(self) -> Future:
+        """
+        Returns a future which resolves with the VPN connector once it has
+        been initialized.
+        """
+        return self._vpn_connector_ready
+
+    def _on_vpn_connector_ready(self):
+        """
+        Applies the actions requested before the VPN connector was ready.
+        It's called on the main thread.
+        """
+        logger.info("VPN connector ready.", category="app", event="vpn_connector_ready")
+        startup_profiler.mark("vpn-connector-ready")
+        self._vpn_connector_ready_handled = True
+
+        subscribers = self._pending_connection_status_subscribers
+        self._pending_connection_status_subscribers = []
+        for subscriber in subscribers:
+            self._connector.register(subscriber)
+            # The subscriber is brought up to date with the current connection state.
+            subscriber.status_update(self._connector.current_state)
+
+        if self._reconnector_enabled:
+            self.reconnector.enable()
+
+    async def _wait_for_vpn_connector(self) -> VPNConnectorWrapper:
+        return await asyncio.wrap_future(self._vpn_connector_ready)
+
+    def _get_vpn_connector_initialization_failure(self) -> Future:
+        """
+        Returns a future failing with the error raised while initializing
+        the VPN connector. It must only be called once initialization failed.
+        """
+        future = Future()
+        future.set_exception(self._vpn_connector_ready.exception())
+        return future
+
+    def enable_reconnector(self):
+        """
+        Enables the VPN reconnector. If the VPN connector is not ready yet,
+        the reconnector is enabled as soon as it is.
+        """
+        self._reconnector_enabled = True
+        if self._vpn_connector_ready_handled:
+            self.reconnector.enable()
+
+    def disable_reconnector(self):
+        """Disables the VPN reconnector."""
+        self._reconnector_enabled = False
+        if self._vpn_connector_ready_handled:
+            self.reconnector.disable()
 
     def login(self, username: str, password: str) -> Future:
         """
@@ -144,6 +268,14 @@ class Controller:  # pylint: disable=too-many-public-methods, too-many-instance-
 
     def run_startup_actions(self, _):
         """Runs any startup actions that are necessary once the app has loaded."""
+        app_config_load = self.app_config_store.preload()
+        if not app_config_load.done():
+            # Startup actions depend on the app configuration.
+            app_config_load.add_done_callback(
+                lambda _: run_on_main_thread(self.run_startup_actions, None)
+            )
+            return
+
         logger.info(
             "Running startup actions",
             category="app", subcategory="startup", event="startup_actions"
@@ -183,8 +315,9 @@ class Controller:  # pylint: disable=too-many-public-methods, too-many-instance-
         :return: A Future object that resolves once the connection reaches the
         "connected" state.
         """
-        server = self._api.server_list.get_fastest_in_country(country_code)
-        return self._connect_to_vpn(server)
+        return self._connect_to_vpn_with_fresh_server_loads(
+            lambda server_list: server_list.get_fastest_in_country(country_code)
+        )
 
     def connect_to_fastest_server(self) -> Future:
         """
@@ -192,8 +325,9 @@ class Controller:  # pylint: disable=too-many-public-methods, too-many-instance-
         :return: A Future object that resolves once the connection reaches the
         "connected" state.
         """
-        server = self._api.server_list.get_fastest()
-        return self._connect_to_vpn(server)
+        return self._connect_to_vpn_with_fresh_server_loads(
+            lambda server_list: server_list.get_fastest()
+        )
 
     def connect_to_server(self, server_name: str = None) -> Future:
         """
@@ -205,25 +339,163 @@ class Controller:  # pylint: disable=too-many-public-methods, too-many-instance-
         server = self._api.server_list.get_by_name(server_name)
         return self._connect_to_vpn(server)
 
+    @property
+    def server_loads_age_in_seconds(self) -> float:
+        """
+        Returns the approximate amount of seconds elapsed since the
+        server loads were last updated.
+        """
+        seconds_until_loads_expiration = (
+            self._api.server_list.loads_expiration_time - time.time()
+        )
+        return (
+            ServerList.get_loads_refresh_interval_in_seconds()
+            - seconds_until_loads_expiration
+        )
+
+    def _connect_to_vpn_with_fresh_server_loads(
+            self, select_server: Callable[[ServerList], LogicalServer]
+    ) -> Future:
+        """
+        Connects to the server returned by ``select_server``, making sure
+        that the server loads used to select the server are not older than
+        ``server_loads_max_age_in_seconds``.
+
+        When the server loads are too old, they are updated first. If the update
+        does not finish within ``server_loads_update_timeout_in_seconds`` then
+        the server is selected using the cached server loads.
+        """
+        server_loads_age = self.server_loads_age_in_seconds
+        server_loads_update = None
+        if server_loads_age > self.server_loads_max_age_in_seconds:
+            logger.info(
+                f"Server loads are {server_loads_age:.0f} seconds old: "
+                f"updating them before connecting."
+            )
+            server_loads_update = self.vpn_data_refresher.update_server_loads()
+
+        return self.executor.submit(
+            self._select_server_and_connect,
+            select_server, server_loads_update, server_loads_age
+        )
+
+    async def _select_server_and_connect(
+            self, select_server: Callable[[ServerList], LogicalServer],
+            server_loads_update: Optional[Future], server_loads_age: float
+    ):
+        server_list = self._api.server_list
+        if server_loads_update:
+            try:
+                # The update is shielded so that it's not cancelled on timeout,
+                # since the refresher still needs its result.
+                server_list = await asyncio.wait_for(
+                    asyncio.shield(asyncio.wrap_future(server_loads_update)),
+                    timeout=self.server_loads_update_timeout_in_seconds
+                )
+                server_loads_age = 0
+            except asyncio.TimeoutError:
+                logger.warning(
+                    "Server loads update timed out: falling back to cached server loads."
+                )
+            except (ProtonAPINotReachable, ProtonAPINotAvailable) as error:
+                logger.warning(
+                    f"Server loads update failed: falling back to cached server loads. {error}"
+                )
+
+        logger.info(
+            f"Selecting server using server loads {server_loads_age:.0f} seconds old.",
+            category="app", subcategory="connection", event="select_server"
+        )
+        server = select_server(server_list)
+        server = await self._select_lowest_latency_server(server_list, server)
+        return await asyncio.wrap_future(self._connect_to_vpn(server))
+
+    async def _select_lowest_latency_server(
+            self, server_list: ServerList, server: LogicalServer
+    ) -> LogicalServer:
+        """
+        Returns the server with the lowest latency out of the best scored
+        ones in the same country as the specified server. If probing is
+        disabled or fails, the specified server is returned.
+        """
+        if not self.latency_prober.enabled:
+            return server
+
+        try:
+            candidates = get_candidates(
+                server_list, server, self.user_tier, self.latency_prober.max_candidates
+            )
+            return await self.latency_prober.select_fastest(candidates) or server
+        except Exception:  # pylint: disable=broad-except
+            # Probing is only an optimization: it should never prevent connecting.
+            logger.exception("Latency probing failed: falling back to the best scored server.")
+            return server
+
     def _connect_to_vpn(self, server: LogicalServer) -> Future:
+        settings_loaded = self._settings or self.preload_settings().done()
+        if not self._vpn_connector_ready.done() or not settings_loaded:
+            return self.executor.submit(self._connect_to_vpn_once_ready, server)
+
+        if self._vpn_connector_ready.exception():
+            return self._get_vpn_connector_initialization_failure()
+
         vpn_server = self._connector.get_vpn_server(
             server, self.vpn_data_refresher.client_config
         )
 
+        protocol = self.get_settings().protocol
+        if protocol == AUTO_PROTOCOL:
+            return self.executor.submit(self._connect_with_auto_protocol, vpn_server)
+
         return self.executor.submit(
             self._connector.connect,
             vpn_server,
-            protocol=self.get_settings().protocol
+            protocol=protocol
         )
 
+    async def _connect_with_auto_protocol(self, vpn_server):
+        available_protocols = [
+            available_protocol.cls.protocol
+            for available_protocol in self._connector.get_available_protocols_for_backend(
+                self.DEFAULT_BACKEND
+            )
+        ]
+        protocol = await self.auto_protocol_selector.select(vpn_server, available_protocols)
+        if not self._auto_protocol_selector_registered:
+            # The selected protocol is only remembered once the connection is established.
+            self._connector.register(self.auto_protocol_selector)
+            self._auto_protocol_selector_registered = True
+        return await asyncio.wrap_future(self.executor.submit(
+            self._connector.connect,
+            vpn_server,
+            protocol=protocol
+        ))
+
+    async def _connect_to_vpn_once_ready(self, server: LogicalServer):
+        await self._wait_for_vpn_connector()
+        if not self._settings:
+            # Settings are required to know which protocol to connect with.
+            await asyncio.wrap_future(self.preload_settings())
+        return await asyncio.wrap_future(self._connect_to_vpn(server))
+
     def disconnect(self) -> Future:
         """
         Terminates a VPN connection.
         :return: A Future object that resolves once the connection reaches the
         "disconnected" state.
         """
+        if not self._vpn_connector_ready.done():
+            return self.executor.submit(self._disconnect_once_connector_is_ready)
+
+        if self._vpn_connector_ready.exception():
+            return self._get_vpn_connector_initialization_failure()
+
         return self.executor.submit(self._connector.disconnect)
 
+    async def _disconnect_once_connector_is_ready(self):
+        await self._wait_for_vpn_connector()
+        return await asyncio.wrap_future(self.disconnect())
+
     @property
     def account_name(self) -> str:
         """Returns account name."""
@@ -237,17 +509,25 @@ class Controller:  # pylint: disable=too-many-public-methods, too-many-instance-
     @property
     def current_connection(self) -> VPNConnection:
         """Returns the current VPN connection, if it exists."""
+        if not self._connector:
+            return None
         return self._connector.current_connection
 
     @property
     def current_connection_status(self) -> states.State:
         """Returns the current VPN connection status. If there is not a
-        current VPN connection, then the Disconnected state is returned."""
+        current VPN connection, then the Disconnected state is returned.
+        The Disconnected state is also returned until the VPN connector is
+        ready, after which connection status subscribers are updated."""
+        if not self._connector:
+            return states.Disconnected()
         return self._connector.current_state
 
     @property
     def current_server_id(self) -> str:
         """Returns the server id of the current connection."""
+        if not self._connector:
+            return None
         return self._connector.current_server_id
 
     @property
@@ -258,12 +538,14 @@ class Controller:  # pylint: disable=too-many-public-methods, too-many-instance-
         A connection is considered active in the connecting, connected
         and disconnecting states.
         """
+        if not self._connector:
+            return False
         return self._connector.is_connection_active
 
     @property
     def is_connection_disconnected(self) -> bool:
         """Returns whether the current connection is in disconnected state or not."""
-        return isinstance(self._connector.current_state, states.Disconnected)
+        return isinstance(self.current_connection_status, states.Disconnected)
 
     def submit_bug_report(self, bug_report: BugReportForm) -> Future:
         """Submits an issue report.
@@ -276,85 +558,195 @@ class Controller:  # pylint: disable=too-many-public-methods, too-many-instance-
     def register_connection_status_subscriber(self, subscriber):
         """
         Registers a new subscriber to connection status updates.
+
+        If the VPN connector is not ready yet, the subscriber is registered
+        as soon as it is, and it receives the current connection status.
         :param subscriber: The subscriber to be registered.
         """
+        if not self._vpn_connector_ready_handled:
+            self._pending_connection_status_subscribers.append(subscriber)
+            return
+
         self._connector.register(subscriber)
 
     def unregister_connection_status_subscriber(self, subscriber):
         """
         Unregisters an existing subscriber from connection status updates.
+
+        If the VPN connector is not ready yet, the subscriber is just not
+        registered once it is.
         :param subscriber: The subscriber to be unregistered.
         """
+        if not self._vpn_connector_ready_handled:
+            if subscriber in self._pending_connection_status_subscribers:
+                self._pending_connection_status_subscribers.remove(subscriber)
+            return
+
         self._connector.unregister(subscriber)
 
     @property
-    def vpn_connector(self) -> VPNConnectorWrapper:
-        """Returns the VPN connector"""
+    def vpn_connector(self) -> Optional[VPNConnectorWrapper]:
+        """Returns the VPN connector, or None if it's not ready yet."""
         return self._connector
 
     def disable_killswitch(self) -> Future:
-        """Disables the kill switch and stores the change to file."""
-        self.get_settings().killswitch = KillSwitchSettingEnum.OFF
-        return self.save_settings()
+        """
+        Disables the kill switch and stores the change to file. If settings
+        are still being loaded, the kill switch is disabled once they are.
+        """
+        def disable(settings: Settings):
+            settings.killswitch = KillSwitchSettingEnum.OFF
+
+        return self.update_settings(disable, flush=True)
 
     @property
     def app_configuration(self) -> AppConfig:
         """Return object with app specific configurations."""
-        if self._app_config is not None:
-            return self._app_config
-
-        app_config = self._cache_handler.load()
-
-        if app_config is None:
-            self._app_config = AppConfig.default()
-            self._cache_handler.save(
-                self._app_config.to_dict()
-            )
-        else:
-            self._app_config = AppConfig.from_dict(app_config)
-
-        return self._app_config
+        return self.app_config_store.get()
 
     @app_configuration.setter
     def app_configuration(self, new_value: AppConfig):
-        self._app_config = new_value
-        self._cache_handler.save(self._app_config.to_dict())
+        """
+        Sets the new app configuration. It's written to disk in the
+        background, shortly afterwards. See :class:`AppConfigStore`.
+        """
+        self.app_config_store.set(new_value)
 
     @property
     def app_version(self) -> str:
         """Returns the current app version."""
         return metadata.version("proton-vpn-gtk-app")
 
+    def preload_settings(self) -> Future:
+        """
+        Loads general settings in the background, so that they are already
+        available when ``get_settings`` is called.
+        :return: A Future object wrapping the settings.
+        """
+        if self._settings_load is None:
+            self._settings_load = self.executor.submit(self._api.load_settings)
+        return self._settings_load
+
     def get_settings(self) -> Settings:
-        """Returns general settings."""
+        """
+        Returns general settings.
+
+        Settings are expected to have been preloaded. Until they are, the
+        default settings are returned, so that the main thread never waits
+        for them to be read from disk. Changes made to the default settings
+        are applied to the loaded ones once :meth:`save_settings` is called.
+        Note that, in this case, setting a value back to its default is not
+        detected: use :meth:`update_settings` for changes that must not be lost.
+        """
         if not self._settings:
-            self._settings = self.executor.submit(
-                self._api.load_settings
-            ).result()
+            settings_load = self.preload_settings()
+            if not settings_load.done():
+                if self._default_settings is None:
+                    logger.warning(
+                        "Settings were accessed before they were loaded: using defaults."
+                    )
+                    self._default_settings = Settings.default(self.user_tier)
+                    self._unchanged_default_settings = copy.deepcopy(self._default_settings)
+                return self._default_settings
+
+            self._settings = settings_load.result()
+            if self._default_settings is not None:
+                _apply_changes(
+                    self._unchanged_default_settings, self._default_settings, self._settings
+                )
+                self._default_settings = self._unchanged_default_settings = None
 
         return self._settings
 
     def save_settings(self) -> Future:
-        """Saves current settings to disk"""
-        return self.executor.submit(
-            self._api.save_settings,
-            self._settings
-        )
+        """
+        Saves current settings to disk.
+
+        Settings changed in a burst (e.g. while toggling switches) are
+        written to disk only once. See :class:`DebouncedWriter`. If settings
+        are still being loaded, they are saved once they are.
+        :return: A Future object that resolves once settings are written.
+        """
+        return self.update_settings(None)
+
+    def update_settings(
+            self, change: Optional[Callable[[Settings], None]], flush: bool = False
+    ) -> Future:
+        """
+        Applies the change to the settings and saves them to disk.
+
+        If settings are still being loaded, the change is applied on the
+        main thread once they are, without waiting for them.
+        :param change: function changing the settings passed to it.
+        :param flush: whether settings should be written right away instead
+            of waiting for other changes to write them at once.
+        :return: A Future object that resolves once settings are written.
+        """
+        if not self._settings and not self.preload_settings().done():
+            logger.info("Settings will be saved once they are loaded.")
+            saved = Future()
+            self.preload_settings().add_done_callback(
+                lambda _: run_on_main_thread(self._update_loaded_settings, change, flush, saved)
+            )
+            return saved
+
+        settings = self.get_settings()
+        if change:
+            change(settings)
+        written = self._settings_writer.request_write(settings)
+        if flush:
+            self._settings_writer.flush()
+        return written
+
+    def _update_loaded_settings(
+            self, change: Optional[Callable[[Settings], None]], flush: bool, saved: Future
+    ):
+        try:
+            written = self.update_settings(change, flush)
+        except Exception as error:  # pylint: disable=broad-except
+            # E.g. settings could not be loaded.
+            logger.error(f"Unable to save settings: {error}")
+            saved.set_exception(error)
+            return
+
+        chain_future(written, saved)
+
+    def flush_settings(self) -> Future:
+        """Writes pending settings changes to disk right away."""
+        return self._settings_writer.flush()
 
     def clear_settings(self):
         """Clear in-memory settings."""
+        # The pending write is discarded so that it does not overwrite the
+        # settings being reloaded.
+        self._settings_writer.cancel()
         self._settings = None
+        self._settings_load = None
+        self._default_settings = self._unchanged_default_settings = None
+        # Settings are reloaded in the background so that they are ready on next login.
+        self.preload_settings()
 
-    def get_available_protocols(self) -> Optional[str]:
-        """Returns an alphabetically sorted list of available protocol to use."""
-        available_protocols = self._connector.get_available_protocols_for_backend(
-            self.DEFAULT_BACKEND
-        )
-
-        return sorted(
-            available_protocols,
-            key=lambda protocol: protocol.cls.ui_protocol
-        )
+    def get_available_protocols(self) -> Future:
+        """
+        Returns a future wrapping an alphabetically sorted list of available
+        protocols to use. The future resolves once the VPN connector is ready.
+        """
+        available_protocols = Future()
+
+        def on_vpn_connector_ready(vpn_connector_ready: Future):
+            try:
+                protocols = vpn_connector_ready.result().get_available_protocols_for_backend(
+                    self.DEFAULT_BACKEND
+                )
+                available_protocols.set_result(sorted(
+                    protocols,
+                    key=lambda protocol: protocol.cls.ui_protocol
+                ))
+            except BaseException as error:  # pylint: disable=broad-except
+                available_protocols.set_exception(error)
+
+        self._vpn_connector_ready.add_done_callback(on_vpn_connector_ready)
+        return available_protocols
 
     def send_error_to_proton(self,
                              error: BaseException |
@@ -363,3 +755,20 @@ class Controller:  # pylint: disable=too-many-public-methods, too-many-instance-
                                    Optional[TracebackType]]):
         """Sends the error to Sentry."""
         self._api.usage_reporting.report_error(error)
+
+
+def _apply_changes(unchanged, changed, target):
+    """
+    Sets on the target the attributes which differ between the changed
+    object and its unchanged copy, recursing into nested dataclasses.
+    """
+    if not dataclasses.is_dataclass(changed):
+        return
+
+    for field in dataclasses.fields(changed):
+        unchanged_value = getattr(unchanged, field.name)
+        changed_value = getattr(changed, field.name)
+        if dataclasses.is_dataclass(changed_value):
+            _apply_changes(unchanged_value, changed_value, getattr(target, field.name))
+        elif changed_value != unchanged_value:
+            setattr(target, field.name, changed_value)
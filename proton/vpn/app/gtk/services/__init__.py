@@ -26,7 +26,12 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
+from proton.vpn.app.gtk.services.app_config_store import AppConfigStore
+from proton.vpn.app.gtk.services.auto_protocol import AutoProtocolSelector
+from proton.vpn.app.gtk.services.latency_prober import LatencyProber
 from proton.vpn.app.gtk.services.reconnector.reconnector import VPNReconnector
 from proton.vpn.app.gtk.services.refresher.vpn_data_refresher import VPNDataRefresher
 
-__all__ = ["VPNDataRefresher", "VPNReconnector"]
+__all__ = [
+    "AppConfigStore", "AutoProtocolSelector", "LatencyProber", "VPNDataRefresher", "VPNReconnector"
+]
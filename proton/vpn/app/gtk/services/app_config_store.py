@@ -0,0 +1,223 @@
+"""
+App configuration store.
+
+
+Copyright (c) 2023 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import copy
+import json
+from concurrent.futures import Future
+from typing import Optional
+
+from gi.repository import GObject
+
+from proton.vpn import logging
+
+from proton.vpn.app.gtk.config import AppConfig, APP_CONFIG
+from proton.vpn.app.gtk.utils.debounce import DebouncedWriter
+from proton.vpn.app.gtk.utils.executor import AsyncExecutor, chain_future
+from proton.vpn.app.gtk.utils.files import write_json_atomically
+from proton.vpn.app.gtk.utils.glib import run_on_main_thread
+
+logger = logging.getLogger(__name__)
+
+
+class AppConfigStore(GObject.Object):
+    """
+    Keeps the app configuration in memory and persists it to disk.
+
+    The configuration is loaded once, in the background, and changes are
+    written to disk in batches (see :class:`DebouncedWriter`). Each write
+    goes to a temporary file first, which is then renamed over the
+    configuration file, so that the configuration file is never left
+    half-written.
+
+    The ``changed`` signal is emitted on the main thread whenever the
+    configuration changes, including once it's loaded, so that widgets
+    showing it can stay in sync.
+
+    Until the configuration is loaded, the default one is handed out, and
+    changes made to it are applied to the loaded configuration once it is.
+    """
+    def __init__(
+            self,
+            executor: AsyncExecutor,
+            file_path: str = APP_CONFIG,
+            app_config: Optional[AppConfig] = None,
+            write_delay_ms: int = DebouncedWriter.DEFAULT_DELAY_IN_MS
+    ):
+        super().__init__()
+        self._executor = executor
+        self._file_path = file_path
+        self._load: Optional[Future] = None
+        self._app_config: Optional[AppConfig] = None
+        # Copy of the last configuration set, used to detect changes, since
+        # callers usually modify the object returned by ``get`` in place.
+        self._last_known_config: Optional[dict] = None
+        # Whether the loaded configuration has to be written to disk, because
+        # the configuration file did not exist or was not valid.
+        self._write_loaded_config = False
+        # Default configuration handed out before the configuration was loaded,
+        # and the configuration set before it was loaded, to be applied once it is.
+        self._default_config: Optional[AppConfig] = None
+        self._pending_config: Optional[AppConfig] = None
+        self._pending_config_saved: Optional[Future] = None
+        self._writer = DebouncedWriter(
+            executor, self._write, delay_ms=write_delay_ms, name="app configuration"
+        )
+        if app_config:
+            self._load = Future()
+            self._load.set_result(app_config)
+            self._set_loaded(app_config)
+
+    @GObject.Signal(name="changed", arg_types=(object,))
+    def changed(self, app_config: AppConfig):
+        """Signal emitted after the app configuration changed."""
+
+    @property
+    def loaded(self) -> bool:
+        """Returns whether the configuration was already loaded or not."""
+        return self._app_config is not None
+
+    def preload(self) -> Future:
+        """
+        Loads the configuration in the background, so that it's already
+        available when ``get`` is called.
+        :return: A Future object wrapping the configuration.
+        """
+        if self._load is None:
+            self._load = self._executor.submit(self._read)
+            self._load.add_done_callback(
+                lambda load: run_on_main_thread(self._on_load_done, load)
+            )
+        return self._load
+
+    def get(self) -> AppConfig:
+        """
+        Returns the app configuration.
+
+        The configuration is expected to have been preloaded. Until it is,
+        the default configuration is returned, so that the main thread never
+        waits for it to be read from disk.
+        """
+        if not self.loaded:
+            load = self.preload()
+            if not load.done():
+                if self._default_config is None:
+                    logger.warning(
+                        "App configuration was accessed before it was loaded: using defaults."
+                    )
+                    # A copy is made since the default values may be mutable.
+                    self._default_config = copy.deepcopy(AppConfig.default())
+                return self._default_config
+            self._apply_load(load)
+
+        return self._app_config
+
+    def set(self, app_config: AppConfig) -> Future:
+        """
+        Sets the new app configuration, which is written to disk shortly
+        afterwards. Nothing is written if the configuration did not change.
+
+        If the configuration was not loaded yet, the changes made to the
+        default configuration are applied to the loaded one once it is.
+
+        This method is expected to be called from the main thread.
+        :return: A Future object that resolves once the configuration is written.
+        """
+        if not self.loaded:
+            logger.info("App configuration was set before it was loaded: saving it once it is.")
+            self._pending_config = app_config
+            if self._pending_config_saved is None:
+                self._pending_config_saved = Future()
+            return self._pending_config_saved
+
+        new_config = app_config.to_dict()
+        self._app_config = app_config
+        if new_config == self._last_known_config:
+            future = Future()
+            future.set_result(None)
+            return future
+
+        self._last_known_config = new_config
+        future = self._writer.request_write(copy.deepcopy(new_config))
+        self.emit("changed", app_config)
+        return future
+
+    def flush(self) -> Future:
+        """Writes pending configuration changes to disk right away."""
+        return self._writer.flush()
+
+    def _set_loaded(self, app_config: AppConfig):
+        self._app_config = app_config
+        self._last_known_config = app_config.to_dict()
+
+    def _on_load_done(self, load: Future):
+        if self.loaded or load.exception():
+            return
+
+        self._apply_load(load)
+        # Callers which got the default configuration are notified.
+        self.emit("changed", self._app_config)
+
+    def _apply_load(self, load: Future):
+        self._set_loaded(load.result())
+        if self._write_loaded_config:
+            self._write_loaded_config = False
+            self._writer.request_write(copy.deepcopy(self._last_known_config))
+        self._default_config = None
+        if self._pending_config is not None:
+            self._apply_pending_config()
+
+    def _apply_pending_config(self):
+        pending_config, self._pending_config = self._pending_config, None
+        saved, self._pending_config_saved = self._pending_config_saved, None
+        merged_config = copy.deepcopy(self._last_known_config)
+        _apply_changes(AppConfig.default().to_dict(), pending_config.to_dict(), merged_config)
+        chain_future(self.set(AppConfig.from_dict(merged_config)), saved)
+
+    def _read(self) -> AppConfig:
+        try:
+            with open(self._file_path, "r", encoding="utf-8") as file:
+                return AppConfig.from_dict(json.load(file))
+        except FileNotFoundError:
+            app_config = AppConfig.default()
+        except (OSError, ValueError) as error:
+            logger.warning(
+                f"Unable to load app configuration, the default one is used instead: {error}"
+            )
+            app_config = AppConfig.default()
+
+        self._write_loaded_config = True
+        return app_config
+
+    def _write(self, data: dict):
+        write_json_atomically(self._file_path, data)
+
+
+def _apply_changes(unchanged: dict, changed: dict, target: dict):
+    """
+    Sets on the target the values which differ between the changed dict
+    and the unchanged one, recursing into nested dicts.
+    """
+    for key, changed_value in changed.items():
+        unchanged_value = unchanged.get(key)
+        if isinstance(changed_value, dict) and isinstance(target.get(key), dict):
+            _apply_changes(unchanged_value or {}, changed_value, target[key])
+        elif changed_value != unchanged_value:
+            target[key] = copy.deepcopy(changed_value)
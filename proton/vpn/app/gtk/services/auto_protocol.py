@@ -0,0 +1,432 @@
+"""
+Automatic VPN protocol selection.
+
+When the protocol setting is set to ``auto``, a quick reachability probe is
+run against the server for each available protocol, all of them in parallel,
+and the connection is established with the preferred protocol that is
+reachable. Once the connection is established, the protocol selected on the
+current network is remembered, so that it's preferred the next time on that
+network. If the connection fails, it's forgotten.
+
+
+Copyright (c) 2023 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+import json
+import secrets
+import socket
+import struct
+from dataclasses import dataclass
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from proton.vpn import logging
+from proton.vpn.connection import states
+
+from proton.vpn.app.gtk.config import AUTO_PROTOCOL_CACHE_FILE
+from proton.vpn.app.gtk.utils.executor import AsyncExecutor, TaskPriority
+from proton.vpn.app.gtk.utils.files import write_json_atomically
+
+logger = logging.getLogger(__name__)
+
+AUTO_PROTOCOL = "auto"
+
+# When several protocols are reachable, UDP-based ones are preferred since they are faster.
+DEFAULT_PROTOCOL_PREFERENCE = ("wireguard", "openvpn-udp", "openvpn-tcp")
+
+TCP_PROBE_TIMEOUT_IN_SECONDS = 1.0
+# Rejected UDP packets are reported back (ICMP port unreachable) within a round trip.
+UDP_PROBE_TIMEOUT_IN_SECONDS = 0.3
+
+# OpenVPN P_CONTROL_HARD_RESET_CLIENT_V2 (opcode 7, key id 0) without tls-auth.
+OPENVPN_HARD_RESET_CLIENT_V2 = 7 << 3
+
+ROUTE_TABLE_PATH = "/proc/net/route"
+
+
+@dataclass(frozen=True)
+class ProbeTarget:
+    """
+    Endpoint probed to check whether a protocol is reachable.
+
+    Attributes:
+        protocol: protocol the endpoint is used with (e.g. ``openvpn-tcp``).
+        host: IP address of the server.
+        port: port of the server.
+        transport: either ``tcp`` or ``udp``.
+        payload: datagram sent to UDP endpoints.
+    """
+    protocol: str
+    host: str
+    port: int
+    transport: str
+    payload: bytes = b"\x00"
+
+
+def build_openvpn_hard_reset() -> bytes:
+    """Builds the packet an OpenVPN client sends to start a session over UDP."""
+    session_id = secrets.token_bytes(8)
+    # Opcode/key id, session id, empty ack array and message packet id.
+    return struct.pack("!B8sBI", OPENVPN_HARD_RESET_CLIENT_V2, session_id, 0, 0)
+
+
+def get_probe_targets(vpn_server, protocols: Sequence[str]) -> List[ProbeTarget]:
+    """
+    Returns the endpoints to probe for the specified protocols. Protocols
+    which are not known are not probed.
+    """
+    endpoints = {
+        "openvpn-udp": (vpn_server.openvpn_ports.udp, "udp", build_openvpn_hard_reset()),
+        "openvpn-tcp": (vpn_server.openvpn_ports.tcp, "tcp", b""),
+        "wireguard": (vpn_server.wireguard_ports.udp, "udp", b"\x00"),
+    }
+    targets = []
+    for protocol in protocols:
+        if protocol not in endpoints:
+            continue
+        ports, transport, payload = endpoints[protocol]
+        if ports:
+            targets.append(ProbeTarget(
+                protocol=protocol, host=vpn_server.server_ip, port=ports[0],
+                transport=transport, payload=payload
+            ))
+    return targets
+
+
+async def probe_tcp(host: str, port: int, timeout: float = TCP_PROBE_TIMEOUT_IN_SECONDS) -> bool:
+    """Returns whether a TCP connection to the endpoint could be established."""
+    try:
+        _reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    return True
+
+
+class _UDPProbeProtocol(asyncio.DatagramProtocol):
+    def __init__(self, result: asyncio.Future):
+        self._result = result
+
+    def datagram_received(self, data, addr):
+        if not self._result.done():
+            self._result.set_result(True)
+
+    def error_received(self, exc):
+        if not self._result.done():
+            self._result.set_result(False)
+
+
+async def probe_udp(
+        host: str, port: int, payload: bytes,
+        timeout: float = UDP_PROBE_TIMEOUT_IN_SECONDS
+) -> Optional[bool]:
+    """
+    Sends the payload to the endpoint.
+
+    VPN servers usually ignore unauthenticated packets, so not getting a
+    reply does not mean that the endpoint is not reachable.
+    :return: True if the endpoint replied, False if the packet was rejected
+        and None if there was no reply before the timeout.
+    """
+    loop = asyncio.get_running_loop()
+    result = loop.create_future()
+    try:
+        transport, _ = await loop.create_datagram_endpoint(
+            lambda: _UDPProbeProtocol(result), remote_addr=(host, port)
+        )
+    except OSError:
+        return False
+
+    try:
+        transport.sendto(payload)
+        return await asyncio.wait_for(result, timeout)
+    except asyncio.TimeoutError:
+        return None
+    finally:
+        transport.close()
+
+
+async def probe(target: ProbeTarget) -> Optional[bool]:
+    """Probes the target, see :func:`probe_tcp` and :func:`probe_udp`."""
+    if target.transport == "tcp":
+        return await probe_tcp(target.host, target.port)
+    return await probe_udp(target.host, target.port, target.payload)
+
+
+async def race_probes(
+        targets: Sequence[ProbeTarget], trusted_protocol: Optional[str] = None
+) -> Optional[str]:
+    """
+    Probes all targets concurrently and returns the protocol of the first
+    target, in the specified order, that was found reachable.
+
+    VPN servers usually ignore unauthenticated UDP packets, but networks
+    blocking UDP usually drop them silently too. That's why targets which
+    did not reply are only selected if no target was found reachable, unless
+    their protocol is the trusted one (e.g. the one a connection was
+    established with the last time on the current network).
+
+    It returns as soon as the result is known: a target is selected once
+    the targets before it were found unreachable or silent, without waiting
+    for the ones after it.
+    :return: the selected protocol or None if no target is reachable.
+    """
+    tasks = [asyncio.ensure_future(probe(target)) for target in targets]
+    try:
+        first_silent_protocol = None
+        for target, task in zip(targets, tasks):
+            result = await task
+            if result or (result is None and target.protocol == trusted_protocol):
+                return target.protocol
+            if result is None and first_silent_protocol is None:
+                first_silent_protocol = target.protocol
+        return first_silent_protocol
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def get_network_id(route_table_path: str = ROUTE_TABLE_PATH) -> Optional[str]:
+    """
+    Returns an identifier of the current network, made of the interface and
+    the gateway of the default route, or None if there is no default route.
+    """
+    try:
+        with open(route_table_path, "r", encoding="utf-8") as file:
+            next(file)  # Skip the header.
+            for line in file:
+                fields = line.split()
+                interface, destination, gateway = fields[0], fields[1], fields[2]
+                if destination == "00000000":
+                    gateway_ip = socket.inet_ntoa(struct.pack("<I", int(gateway, 16)))
+                    return f"{interface}/{gateway_ip}"
+    except (OSError, ValueError, IndexError, StopIteration):
+        pass
+    return None
+
+
+@dataclass
+class _Selection:
+    """
+    Protocol selected for the connection being established.
+
+    Attributes:
+        network_id: network the protocol was selected on, if known.
+        protocol: protocol the connection is being established with.
+        fallback_protocols: protocols to fall back to, in order, if the
+            connection fails before being established.
+        connecting: whether the connection with the protocol was initiated.
+    """
+    network_id: Optional[str]
+    protocol: str
+    fallback_protocols: List[str]
+    connecting: bool = False
+
+
+class AutoProtocolSelector:
+    """
+    Selects the protocol to connect with when the protocol setting is ``auto``.
+
+    :meth:`select` is meant to be used from the asyncio loop of the
+    :class:`AsyncExecutor`, while file I/O runs on its thread pool. The
+    selector has to be registered to connection status updates so that the
+    selected protocol is only remembered once the connection is established.
+
+    If the connection fails before being established, the reconnector falls
+    back to the next protocol, see :meth:`get_fallback_protocol`.
+    """
+    MAX_REMEMBERED_NETWORKS = 20
+
+    def __init__(
+            self,
+            executor: AsyncExecutor,
+            file_path: str = AUTO_PROTOCOL_CACHE_FILE,
+            network_id_getter: Callable[[], Optional[str]] = get_network_id,
+            preference: Sequence[str] = DEFAULT_PROTOCOL_PREFERENCE
+    ):
+        self._executor = executor
+        self._file_path = file_path
+        self._get_network_id = network_id_getter
+        self._preference = preference
+        self._lock = Lock()
+        # Protocol selected per network, from least to most recently used.
+        self._protocol_per_network: Optional[Dict[str, str]] = None
+        self._selection: Optional[_Selection] = None
+
+    def get_remembered_protocol(self, network_id: Optional[str]) -> Optional[str]:
+        """
+        Returns the protocol selected the last time on the network, if any.
+        Note that it blocks the first time, while the file is read.
+        """
+        if network_id is None:
+            return None
+        with self._lock:
+            return self._get_protocol_per_network().get(network_id)
+
+    async def select(self, vpn_server, protocols: Sequence[str]) -> str:
+        """
+        Probes the server and returns the protocol to connect with.
+        :param vpn_server: server to connect to.
+        :param protocols: available protocols.
+        """
+        network_id, remembered_protocol = await asyncio.wrap_future(
+            self._executor.submit(self._get_network_id_and_remembered_protocol)
+        )
+        candidates = self._sort_by_preference(protocols, remembered_protocol)
+        protocol = await race_probes(
+            get_probe_targets(vpn_server, candidates), trusted_protocol=remembered_protocol
+        )
+        if not protocol:
+            protocol = candidates[0]
+            logger.warning(f"No protocol seems to be reachable: falling back to {protocol}.")
+        else:
+            logger.info(
+                f"Protocol {protocol} selected for network {network_id}.",
+                category="app", subcategory="connection", event="auto_protocol"
+            )
+
+        with self._lock:
+            self._selection = _Selection(
+                network_id=network_id, protocol=protocol,
+                fallback_protocols=[candidate for candidate in candidates if candidate != protocol]
+            )
+        return protocol
+
+    def get_fallback_protocol(self, failed_protocol: str) -> Optional[str]:
+        """
+        Returns the protocol to retry with after the connection with the
+        selected protocol failed before being established, or None if the
+        failed connection was not established with a selected protocol or
+        if there is no protocol left to fall back to.
+        :param failed_protocol: protocol of the connection that failed.
+        """
+        with self._lock:
+            selection = self._selection
+            if (
+                not selection or selection.protocol != failed_protocol
+                or not selection.fallback_protocols
+            ):
+                return None
+
+            selection.protocol = selection.fallback_protocols.pop(0)
+            selection.connecting = False
+            return selection.protocol
+
+    def status_update(self, connection_status):
+        """
+        Remembers the protocol selected for the network once the connection
+        is established with it, and forgets it if the connection fails.
+        """
+        with self._lock:
+            selection = self._selection
+            if not selection:
+                return
+
+            connection = connection_status.context.connection
+            if connection and connection.protocol != selection.protocol:
+                # The update is about a connection with another protocol.
+                return
+
+            if isinstance(connection_status, states.Connecting):
+                selection.connecting = True
+                return
+
+            if isinstance(connection_status, states.Connected):
+                self._selection = None
+                update = self._remember
+            elif isinstance(connection_status, states.Error):
+                # The selection is kept to fall back to the next protocol.
+                update = self._forget
+            elif isinstance(connection_status, states.Disconnected) and selection.connecting:
+                # The connection was cancelled.
+                self._selection = None
+                return
+            else:
+                return
+            network_id, protocol = selection.network_id, selection.protocol
+
+        if network_id is None:
+            return
+
+        self._executor.submit_with_options(
+            update, args=(network_id, protocol), priority=TaskPriority.BACKGROUND
+        )
+
+    def _get_network_id_and_remembered_protocol(self) -> Tuple[Optional[str], Optional[str]]:
+        network_id = self._get_network_id()
+        return network_id, self.get_remembered_protocol(network_id)
+
+    def _sort_by_preference(
+            self, protocols: Sequence[str], remembered_protocol: Optional[str]
+    ) -> List[str]:
+        def rank(protocol: str):
+            if protocol == remembered_protocol:
+                return -1
+            if protocol in self._preference:
+                return self._preference.index(protocol)
+            return len(self._preference)
+
+        # The sort is stable, so unknown protocols keep their order.
+        return sorted(protocols, key=rank)
+
+    def _remember(self, network_id: str, protocol: str):
+        with self._lock:
+            protocol_per_network = self._get_protocol_per_network()
+            if protocol_per_network.get(network_id) == protocol:
+                return
+
+            protocol_per_network.pop(network_id, None)
+            protocol_per_network[network_id] = protocol
+            while len(protocol_per_network) > self.MAX_REMEMBERED_NETWORKS:
+                del protocol_per_network[next(iter(protocol_per_network))]
+            self._write(protocol_per_network)
+
+    def _forget(self, network_id: str, protocol: str):
+        with self._lock:
+            protocol_per_network = self._get_protocol_per_network()
+            if protocol_per_network.get(network_id) != protocol:
+                return
+
+            logger.info(
+                f"Forgetting protocol {protocol} for network {network_id}, "
+                f"since the connection failed.",
+                category="app", subcategory="connection", event="auto_protocol"
+            )
+            del protocol_per_network[network_id]
+            self._write(protocol_per_network)
+
+    def _get_protocol_per_network(self) -> Dict[str, str]:
+        if self._protocol_per_network is None:
+            self._protocol_per_network = self._read()
+        return self._protocol_per_network
+
+    def _read(self) -> Dict[str, str]:
+        try:
+            with open(self._file_path, "r", encoding="utf-8") as file:
+                return dict(json.load(file))
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, TypeError) as error:
+            logger.warning(f"Unable to load protocols selected per network: {error}")
+            return {}
+
+    def _write(self, protocol_per_network: Dict[str, str]):
+        try:
+            write_json_atomically(self._file_path, protocol_per_network)
+        except OSError as error:
+            logger.warning(f"Unable to save protocols selected per network: {error}")
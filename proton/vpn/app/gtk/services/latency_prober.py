@@ -0,0 +1,211 @@
+"""
+Latency probing of candidate servers.
+
+Servers are ranked by the score computed by the API, which does not take
+into account the latency from the user's network. Before connecting to the
+fastest server (in a country), the round-trip time of a TCP handshake with
+the best scored servers is measured, and the one with the lowest latency is
+chosen instead.
+
+
+Copyright (c) 2023 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+import os
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from proton.vpn import logging
+from proton.vpn.session.servers import LogicalServer, ServerFeatureEnum
+
+from proton.vpn.app.gtk.services.auto_protocol import get_network_id
+
+logger = logging.getLogger(__name__)
+
+# Environment variable disabling latency probing.
+LATENCY_PROBING_ENV_VAR = "PROTON_VPN_LATENCY_PROBING"
+
+# Features of servers which are never selected when connecting to the fastest server.
+EXCLUDED_FEATURES = frozenset((ServerFeatureEnum.SECURE_CORE, ServerFeatureEnum.TOR))
+
+
+def get_candidates(
+        servers: Iterable[LogicalServer], selected_server: LogicalServer,
+        user_tier: int, max_candidates: int
+) -> List[LogicalServer]:
+    """
+    Returns the best scored servers in the same country as the selected one,
+    which the user can connect to.
+    """
+    candidates = [
+        server for server in servers
+        if server.enabled
+        and server.exit_country == selected_server.exit_country
+        and server.tier <= user_tier
+        and not EXCLUDED_FEATURES.intersection(server.features)
+    ]
+    # The lower the score, the better the server.
+    return sorted(candidates, key=lambda server: server.score)[:max_candidates]
+
+
+def get_entry_ip(server: LogicalServer) -> Optional[str]:
+    """Returns the entry IP of the first enabled physical server, if any."""
+    for physical_server in server.physical_servers:
+        if physical_server.enabled:
+            return physical_server.entry_ip
+    return None
+
+
+class LatencyProber:
+    """
+    Measures the latency to servers, concurrently and within a deadline.
+
+    Measurements are cached per network for a while. Probing is disabled
+    by setting the ``PROTON_VPN_LATENCY_PROBING`` environment variable to
+    ``0``, in which case servers are selected by score only.
+
+    Servers are not probed while a VPN connection is active, since probes
+    would go through the VPN tunnel and would measure the latency from the
+    current VPN server instead.
+
+    It's meant to be used from the asyncio loop of the :class:`AsyncExecutor`.
+    """
+    DEFAULT_MAX_CANDIDATES = 5
+    DEFAULT_DEADLINE_IN_SECONDS = 1.0
+    DEFAULT_TTL_IN_SECONDS = 10 * 60
+    # Port accepting OpenVPN over TCP on Proton VPN servers.
+    DEFAULT_PORT = 443
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+            self,
+            enabled: Optional[bool] = None,
+            max_candidates: int = DEFAULT_MAX_CANDIDATES,
+            deadline_in_seconds: float = DEFAULT_DEADLINE_IN_SECONDS,
+            ttl_in_seconds: float = DEFAULT_TTL_IN_SECONDS,
+            port: int = DEFAULT_PORT,
+            network_id_getter: Callable[[], Optional[str]] = get_network_id,
+            entry_ip_getter: Callable[[LogicalServer], Optional[str]] = get_entry_ip,
+            vpn_connection_active_getter: Optional[Callable[[], bool]] = None
+    ):
+        self.enabled = self.is_enabled_in_environment() if enabled is None else enabled
+        self.max_candidates = max_candidates
+        self._deadline_in_seconds = deadline_in_seconds
+        self._ttl_in_seconds = ttl_in_seconds
+        self._port = port
+        self._get_network_id = network_id_getter
+        self._get_entry_ip = entry_ip_getter
+        self._is_vpn_connection_active = vpn_connection_active_getter or (lambda: False)
+        # Time of the measurement and round-trip time (None if the server
+        # was not reachable) per network id and server id.
+        self._cache: Dict[Tuple[Optional[str], str], Tuple[float, Optional[float]]] = {}
+
+    @staticmethod
+    def is_enabled_in_environment() -> bool:
+        """Returns whether probing was not disabled with an environment variable."""
+        return os.environ.get(LATENCY_PROBING_ENV_VAR, "").lower() not in ("0", "false", "no")
+
+    async def measure(self, servers: Sequence[LogicalServer]) -> Dict[str, Optional[float]]:
+        """
+        Measures the round-trip time to the servers, in seconds.
+
+        Servers measured recently on the current network are not probed again,
+        and no server is probed while a VPN connection is active.
+        :return: the round-trip time per server id. Servers which could not be
+            reached are mapped to None, and the ones which could not be
+            measured before the deadline are left out.
+        """
+        if self._is_vpn_connection_active():
+            logger.info(
+                "Latency to servers is not measured while a VPN connection is active.",
+                category="app", subcategory="connection", event="latency_probe"
+            )
+            return {}
+
+        network_id = self._get_network_id()
+        now = time.monotonic()
+        round_trip_times = {}
+        servers_to_probe = []
+        for server in servers:
+            cached = self._cache.get((network_id, server.id))
+            if cached and now - cached[0] < self._ttl_in_seconds:
+                round_trip_times[server.id] = cached[1]
+            else:
+                servers_to_probe.append(server)
+
+        if not servers_to_probe:
+            return round_trip_times
+
+        tasks = {
+            asyncio.ensure_future(self._measure_round_trip_time(server)): server
+            for server in servers_to_probe
+        }
+        done, pending = await asyncio.wait(tasks, timeout=self._deadline_in_seconds)
+        for task in pending:
+            task.cancel()
+
+        measured_at = time.monotonic()
+        for task in done:
+            server = tasks[task]
+            round_trip_times[server.id] = task.result()
+            self._cache[(network_id, server.id)] = (measured_at, task.result())
+
+        return round_trip_times
+
+    async def select_fastest(
+            self, candidates: Sequence[LogicalServer]
+    ) -> Optional[LogicalServer]:
+        """
+        Returns the candidate with the lowest latency, or None if probing is
+        disabled or none of the candidates could be measured.
+        """
+        if not self.enabled or not candidates:
+            return None
+
+        round_trip_times = await self.measure(candidates)
+        measured = [
+            server for server in candidates
+            if round_trip_times.get(server.id) is not None
+        ]
+        if not measured:
+            logger.warning("Latency to the candidate servers could not be measured.")
+            return None
+
+        fastest = min(measured, key=lambda server: round_trip_times[server.id])
+        logger.info(
+            f"{fastest.name} has the lowest latency "
+            f"({round_trip_times[fastest.id] * 1000:.0f} ms) out of {len(candidates)} "
+            "candidate servers.",
+            category="app", subcategory="connection", event="latency_probe"
+        )
+        return fastest
+
+    async def _measure_round_trip_time(self, server: LogicalServer) -> Optional[float]:
+        host = self._get_entry_ip(server)
+        if not host:
+            return None
+
+        start = time.perf_counter()
+        try:
+            _reader, writer = await asyncio.open_connection(host, self._port)
+        except OSError:
+            return None
+        # The connection is established once the handshake completed.
+        round_trip_time = time.perf_counter() - start
+        writer.close()
+        return round_trip_time
@@ -0,0 +1,202 @@
+"""
+Minimal rtnetlink client, used to monitor network changes and to look
+up routes without spawning ``ip route get``.
+
+See https://man7.org/linux/man-pages/man7/rtnetlink.7.html.
+
+
+Copyright (c) 2023 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import itertools
+import socket
+import struct
+from typing import Callable, Iterator, Tuple
+
+NETLINK_ROUTE = 0
+
+# Multicast groups (legacy bitmask API, see linux/rtnetlink.h).
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+RTMGRP_IPV4_ROUTE = 0x40
+RTMGRP_IPV6_IFADDR = 0x100
+RTMGRP_IPV6_ROUTE = 0x400
+
+# Message types.
+NLMSG_NOOP = 1
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+RTM_NEWLINK = 16
+RTM_DELLINK = 17
+RTM_NEWADDR = 20
+RTM_DELADDR = 21
+RTM_NEWROUTE = 24
+RTM_DELROUTE = 25
+RTM_GETROUTE = 26
+
+# Message flags.
+NLM_F_REQUEST = 0x1
+
+# Route attributes.
+RTA_DST = 1
+
+# Messages notifying changes that might affect the default route.
+NETWORK_CHANGE_MESSAGE_TYPES = frozenset((
+    RTM_NEWLINK, RTM_DELLINK, RTM_NEWADDR, RTM_DELADDR, RTM_NEWROUTE, RTM_DELROUTE
+))
+
+# struct nlmsghdr: length, type, flags, sequence number and port id.
+NLMSG_HEADER = struct.Struct("=IHHII")
+# struct rtmsg: family, dst_len, src_len, tos, table, protocol, scope, type and flags.
+RTMSG = struct.Struct("=BBBBBBBBI")
+# struct rtattr: length and type.
+RTATTR_HEADER = struct.Struct("=HH")
+# struct nlmsgerr starts with the (negative) errno, 0 meaning success.
+NLMSG_ERROR_CODE = struct.Struct("=i")
+
+ROUTE_LOOKUP_TIMEOUT_IN_SECONDS = 1
+
+_sequence_numbers = itertools.count(1)
+
+RECEIVE_BUFFER_SIZE = 65536
+
+
+def open_route_monitor_socket() -> socket.socket:
+    """
+    Opens a non-blocking netlink socket subscribed to link, address and
+    route changes.
+    :raises OSError: if netlink is not available (e.g. in some sandboxes).
+    """
+    sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW | socket.SOCK_CLOEXEC, NETLINK_ROUTE)
+    try:
+        sock.setblocking(False)
+        sock.bind((0, (
+            RTMGRP_LINK | RTMGRP_IPV4_IFADDR | RTMGRP_IPV4_ROUTE
+            | RTMGRP_IPV6_IFADDR | RTMGRP_IPV6_ROUTE
+        )))
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def iter_messages(data: bytes) -> Iterator[Tuple[int, bytes]]:
+    """
+    Splits a netlink datagram into its messages.
+    :return: an iterator of (message type, message payload) tuples.
+    """
+    for message_type, _seq, payload in _iter_messages_with_seq(data):
+        yield message_type, payload
+
+
+def _iter_messages_with_seq(data: bytes) -> Iterator[Tuple[int, int, bytes]]:
+    offset = 0
+    while offset + NLMSG_HEADER.size <= len(data):
+        length, message_type, _flags, seq, _pid = NLMSG_HEADER.unpack_from(data, offset)
+        if length < NLMSG_HEADER.size:
+            # Malformed message.
+            return
+        yield message_type, seq, data[offset + NLMSG_HEADER.size:offset + length]
+        # Messages are aligned to 4 bytes.
+        offset += (length + 3) & ~3
+
+
+def build_get_route_request(destination: str, seq: int) -> bytes:
+    """
+    Builds the RTM_GETROUTE request asking the kernel for the route
+    to the specified IPv4 address.
+    """
+    address = socket.inet_aton(destination)
+    attribute = RTATTR_HEADER.pack(RTATTR_HEADER.size + len(address), RTA_DST) + address
+    route_message = RTMSG.pack(socket.AF_INET, 8 * len(address), 0, 0, 0, 0, 0, 0, 0)
+    payload = route_message + attribute
+    header = NLMSG_HEADER.pack(
+        NLMSG_HEADER.size + len(payload), RTM_GETROUTE, NLM_F_REQUEST, seq, 0
+    )
+    return header + payload
+
+
+def parse_get_route_reply(data: bytes, seq: int) -> bool:
+    """
+    Parses the reply to an RTM_GETROUTE request.
+    :return: True if the kernel found a route or False otherwise (e.g.
+        when the network is unreachable).
+    :raises ValueError: if the reply does not answer the request.
+    """
+    for message_type, message_seq, payload in _iter_messages_with_seq(data):
+        if message_seq != seq:
+            continue
+        if message_type == RTM_NEWROUTE:
+            return True
+        if message_type == NLMSG_ERROR and len(payload) >= NLMSG_ERROR_CODE.size:
+            error_code, = NLMSG_ERROR_CODE.unpack_from(payload)
+            # An error code of 0 is an acknowledgement, not a reply.
+            if error_code != 0:
+                return False
+
+    raise ValueError("Netlink reply does not contain the requested route.")
+
+
+def open_route_socket() -> socket.socket:
+    """Opens a netlink socket to send requests to the kernel routing subsystem."""
+    return socket.socket(socket.AF_NETLINK, socket.SOCK_RAW | socket.SOCK_CLOEXEC, NETLINK_ROUTE)
+
+
+def has_route_to(
+        destination: str,
+        socket_factory: Callable[[], socket.socket] = open_route_socket
+) -> bool:
+    """
+    Asks the kernel whether there is a route to the specified IPv4
+    address, like ``ip route get`` does.
+    :raises OSError: if netlink is not available.
+    """
+    seq = next(_sequence_numbers)
+    with socket_factory() as sock:
+        sock.settimeout(ROUTE_LOOKUP_TIMEOUT_IN_SECONDS)
+        sock.sendto(build_get_route_request(destination, seq), (0, 0))
+        while True:
+            try:
+                return parse_get_route_reply(sock.recv(RECEIVE_BUFFER_SIZE), seq)
+            except ValueError:
+                # Not the reply to this request: keep reading.
+                continue
+
+
+def drain_network_changes(sock: socket.socket) -> bool:
+    """
+    Reads all pending messages from a socket opened with
+    :func:`open_route_monitor_socket`, without blocking.
+    :return: whether any of the messages notified a network change.
+    """
+    network_changed = False
+    while True:
+        try:
+            data = sock.recv(RECEIVE_BUFFER_SIZE)
+        except BlockingIOError:
+            return network_changed
+        except OSError:
+            # ENOBUFS: the socket buffer overflowed, so messages were lost.
+            return True
+
+        if not data:
+            return network_changed
+
+        network_changed = network_changed or any(
+            message_type in NETWORK_CHANGE_MESSAGE_TYPES
+            for message_type, _payload in iter_messages(data)
+        )
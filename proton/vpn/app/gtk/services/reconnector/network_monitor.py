@@ -19,29 +19,87 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
+import socket
 import subprocess
-from concurrent.futures import ThreadPoolExecutor, Future
-from typing import Callable
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Callable, Optional
 
 from gi.repository import GLib
 
 from proton.vpn import logging  # noqa: E402 # pylint: disable=wrong-import-position
-from proton.vpn.app.gtk.utils.glib import run_once, run_periodically
+from proton.vpn.app.gtk.services.reconnector import netlink
+from proton.vpn.app.gtk.utils.executor import AsyncExecutor, TaskPriority
+from proton.vpn.app.gtk.utils.glib import run_after_ms, run_once
 
 logger = logging.getLogger(__name__)
 
 
+# 192.0.2.1 is used because is a valid IP that won't be in use,
+# since it is reserved for documentation purposes:
+# https://www.rfc-editor.org/rfc/rfc5737.html
+CONNECTIVITY_CHECK_ADDRESS = "192.0.2.1"
+
+# While connected to VPN, connections to the Proton VPN API go through
+# the VPN tunnel, so they are used to check that the tunnel is alive.
+TUNNEL_LIVENESS_CHECK_HOST = "vpn-api.proton.me"
+TUNNEL_LIVENESS_CHECK_PORT = 443
+TUNNEL_LIVENESS_CHECK_TIMEOUT_IN_SECONDS = 5
+
+
 def check_for_network_connectivity() -> bool:
     """
     Checks for network connectivity and returns True if connected or False otherwise.
+
+    The kernel is asked for a route to an external address over netlink,
+    falling back to ``ip route get`` when netlink is not available.
     """
-    # 192.0.2.1 is used because is a valid IP that won't be in use,
-    # since it is reserved for documentation purposes:
-    # https://www.rfc-editor.org/rfc/rfc5737.html
-    result = subprocess.run(["ip", "route", "get", "192.0.2.1"], check=False, capture_output=True)
+    try:
+        return netlink.has_route_to(CONNECTIVITY_CHECK_ADDRESS)
+    except OSError as error:
+        logger.debug(f"Netlink route lookup failed, falling back to ip route: {error}")
+
+    result = subprocess.run(
+        ["ip", "route", "get", CONNECTIVITY_CHECK_ADDRESS], check=False, capture_output=True
+    )
     return result.returncode == 0
 
 
+def check_for_tunnel_liveness(
+        timeout: float = TUNNEL_LIVENESS_CHECK_TIMEOUT_IN_SECONDS
+) -> bool:
+    """
+    Checks whether the VPN tunnel is alive, by opening a TCP connection to
+    the Proton VPN API through it. Returns True if the connection could be
+    opened or False otherwise.
+    """
+    try:
+        with socket.create_connection(
+            (TUNNEL_LIVENESS_CHECK_HOST, TUNNEL_LIVENESS_CHECK_PORT), timeout=timeout
+        ):
+            return True
+    except OSError as error:
+        logger.info(
+            f"VPN tunnel liveness check failed: {error}",
+            category="network", event="tunnel_liveness"
+        )
+        return False
+
+
+@dataclass
+class NetworkStateChange:
+    """Network state change detected by the :class:`NetworkMonitor`."""
+    network_up: bool
+    # Monotonic time at which the change was detected.
+    detected_at: float
+    # How long the network had been in the previous state, in seconds.
+    previous_state_duration: Optional[float]
+    # Upper bound of the time elapsed between the change and its detection,
+    # in milliseconds: the change happened after the previous check.
+    max_detection_latency_ms: Optional[float]
+
+
 class NetworkMonitor:
     """
     After being enabled, it calls the callback set on the network_up_callback
@@ -50,6 +108,14 @@ class NetworkMonitor:
     Note that it requires a GLib main loop to be running, as the current
     implementation relies on it to poll for network state changes.
 
+    The polling cadence is adaptive: right after the network state changed
+    (or after ``poll_fast`` was called, e.g. because the VPN connection
+    dropped) the network is polled every ``min_polling_interval_ms``. The
+    interval is then doubled after each poll, up to ``max_polling_interval_ms``
+    while the network is up, or up to ``max_polling_interval_when_down_ms``
+    while it's down, so that reconnection starts soon after connectivity
+    returns.
+
     Usage example:
     .. code-block:: python
         monitor = NetworkMonitor()
@@ -61,24 +127,50 @@ class NetworkMonitor:
         network_up_callback: callable that will be called whenever connectivity
         to the Internet is detected.
     """
+    MIN_POLLING_INTERVAL_IN_MS = 250
+    MAX_POLLING_INTERVAL_IN_MS = 30_000
+    MAX_POLLING_INTERVAL_WHEN_DOWN_IN_MS = 2000
+    POLLING_BACKOFF_FACTOR = 2
 
-    def __init__(self, pool: ThreadPoolExecutor, polling_interval_ms: int = 5000):
-        self._pool = pool
-        self._polling_interval_ms = polling_interval_ms
+    def __init__(
+            self, executor: AsyncExecutor,
+            min_polling_interval_ms: int = MIN_POLLING_INTERVAL_IN_MS,
+            max_polling_interval_ms: int = MAX_POLLING_INTERVAL_IN_MS,
+            max_polling_interval_when_down_ms: int = MAX_POLLING_INTERVAL_WHEN_DOWN_IN_MS
+    ):
+        self._executor = executor
+        self._min_polling_interval_ms = min_polling_interval_ms
+        self._max_polling_interval_ms = max_polling_interval_ms
+        self._max_polling_interval_when_down_ms = min(
+            max_polling_interval_when_down_ms, max_polling_interval_ms
+        )
+        self._polling_interval_ms = min_polling_interval_ms
         self._is_network_up = None
         self._polling_handler_id = None
+        self._last_check_at: Optional[float] = None
+        self._last_state_change_at: Optional[float] = None
+        # Network state check running in the background, if any, and whether
+        # another check was requested meanwhile.
+        self._in_flight_check: Optional[Future] = None
+        self._check_again = False
+        # Bumped when the monitor is disabled, so that the results of checks
+        # started before are dropped.
+        self._generation = 0
+        self.last_state_change: Optional[NetworkStateChange] = None
         self.network_up_callback: Callable = None
 
     def enable(self):
         """
         Enables the network connectivity monitor.
 
-        It runs the `check_network_state_async` method periodically on the GLib main loop.
+        It runs the `check_network_state_async` method on the GLib main
+        loop, right away and then with an adaptive polling interval.
         """
-        self._polling_handler_id = run_periodically(
-            interval_ms=self._polling_interval_ms,
-            function=self.check_network_state_async
-        )
+        if self._polling_handler_id is not None:
+            return
+
+        self._polling_interval_ms = self._min_polling_interval_ms
+        self._polling_handler_id = run_once(self._poll)
 
     def disable(self):
         """Disables the network connectivity monitor."""
@@ -86,19 +178,132 @@ class NetworkMonitor:
             GLib.source_remove(self._polling_handler_id)
             self._polling_handler_id = None
         self._is_network_up = None
+        self._last_check_at = None
+        self._last_state_change_at = None
+        self._generation += 1
+        self._in_flight_check = None
+        self._check_again = False
+
+    def poll_fast(self):
+        """
+        Polls the network state right away, and then at the fastest
+        cadence, backing off afterwards. It should be called when the
+        network state is likely to change soon (e.g. after a VPN drop).
+        """
+        if self._polling_handler_id is None:
+            return
+
+        GLib.source_remove(self._polling_handler_id)
+        self._polling_interval_ms = self._min_polling_interval_ms
+        self._polling_handler_id = run_once(self._poll)
+
+    @property
+    def polling_interval_ms(self) -> int:
+        """Returns the interval until the next poll, in milliseconds."""
+        return self._polling_interval_ms
 
     def check_network_state_async(self) -> Future:
-        """Checks what's the network state."""
-        return self._pool.submit(self._poll_network_state)
+        """
+        Checks what's the network state.
+
+        The check runs in the background but its result is applied on the
+        main thread. Checks don't overlap: if a check is requested while
+        another one is running, it runs once the running one finishes, so
+        that changes notified meanwhile are not missed.
+        :return: A Future object wrapping the running check.
+        """
+        if self._in_flight_check is not None:
+            self._check_again = True
+            return self._in_flight_check
+
+        future = self._executor.submit_with_options(
+            check_for_network_connectivity, priority=TaskPriority.BACKGROUND
+        )
+        self._in_flight_check = future
+        generation = self._generation
+        future.add_done_callback(
+            lambda future: run_once(self._on_network_state_checked, future, generation)
+        )
+        return future
+
+    def check_tunnel_liveness_async(self) -> Future:
+        """
+        Checks whether the VPN tunnel is alive, in the background.
+        :return: A Future object wrapping the result of the check.
+        """
+        return self._executor.submit_with_options(
+            check_for_tunnel_liveness, priority=TaskPriority.BACKGROUND
+        )
+
+    def _poll(self):
+        # The next poll is scheduled before checking the network state,
+        # so that the monitor can be disabled from the check.
+        self._polling_handler_id = run_after_ms(self._poll, delay_ms=self._polling_interval_ms)
+        max_interval_ms = (
+            self._max_polling_interval_ms if self.is_network_up
+            else self._max_polling_interval_when_down_ms
+        )
+        self._polling_interval_ms = min(
+            self._polling_interval_ms * self.POLLING_BACKOFF_FACTOR, max_interval_ms
+        )
+        self.check_network_state_async()
+
+    def _on_network_state_checked(self, future: Future, generation: int):
+        if generation != self._generation:
+            # The monitor was disabled while the check was running.
+            return
+
+        self._in_flight_check = None
+        try:
+            self._update_network_state(future.result())
+        except Exception as error:  # pylint: disable=broad-except
+            logger.warning(
+                f"Unable to check the network state: {error}",
+                category="network", event="check"
+            )
 
-    def _poll_network_state(self):
+        if self._check_again:
+            self._check_again = False
+            self.check_network_state_async()
 
-        network_up = check_for_network_connectivity()
+    def _update_network_state(self, network_up: bool):
+        now = time.monotonic()
+        previous_check_at, self._last_check_at = self._last_check_at, now
+        network_state_changed = network_up != self.is_network_up
         network_just_went_up = not self.is_network_up and network_up
         self._is_network_up = network_up
 
+        if not network_state_changed:
+            return
+
+        state_change = NetworkStateChange(
+            network_up=network_up,
+            detected_at=now,
+            previous_state_duration=(
+                now - self._last_state_change_at if self._last_state_change_at else None
+            ),
+            max_detection_latency_ms=(
+                (now - previous_check_at) * 1000 if previous_check_at else None
+            )
+        )
+        self._last_state_change_at = now
+        self._on_network_state_changed(state_change, network_just_went_up)
+
+    def _on_network_state_changed(self, state_change: NetworkStateChange, network_just_went_up):
+        self.last_state_change = state_change
+        message = f"Network went {'up' if state_change.network_up else 'down'}"
+        if state_change.previous_state_duration is not None:
+            message += f" after {state_change.previous_state_duration:.1f} s"
+        if state_change.max_detection_latency_ms is not None:
+            message += f", detected within {state_change.max_detection_latency_ms:.0f} ms"
+        logger.info(f"{message}.", category="network", event="state_change")
+
+        if state_change.previous_state_duration is not None:
+            # Changes are likely to be followed by other changes.
+            self.poll_fast()
+
         if network_just_went_up and self.network_up_callback:
-            run_once(self.network_up_callback)
+            self.network_up_callback()
 
     @property
     def is_network_up(self) -> bool:
@@ -112,3 +317,95 @@ class NetworkMonitor:
     def is_enabled(self) -> bool:
         """Returns whether the network monitor is enabled or not."""
         return self._polling_handler_id is not None
+
+
+class NetlinkNetworkMonitor(NetworkMonitor):
+    """
+    Network monitor driven by rtnetlink notifications.
+
+    Instead of polling, it subscribes to link, address and route changes
+    on a netlink socket watched by the GLib main loop, and it only checks
+    the network state after the kernel notified a change. Notifications
+    usually come in bursts, so they are coalesced into a single check.
+
+    If netlink is not available, it falls back to polling.
+    """
+    # Delay used to coalesce bursts of network change notifications.
+    CHANGE_COALESCING_DELAY_IN_MS = 100
+
+    def __init__(
+            self, executor: AsyncExecutor,
+            change_coalescing_delay_ms: int = CHANGE_COALESCING_DELAY_IN_MS,
+            **kwargs
+    ):
+        super().__init__(executor, **kwargs)
+        self._change_coalescing_delay_ms = change_coalescing_delay_ms
+        self._socket: Optional[socket.socket] = None
+        self._io_watch_id: Optional[int] = None
+        self._pending_check_id: Optional[int] = None
+
+    def enable(self):
+        """
+        Enables the network connectivity monitor.
+
+        The network state is checked right away and then each time the
+        kernel notifies a network change.
+        """
+        if self.is_enabled:
+            return
+
+        try:
+            self._socket = netlink.open_route_monitor_socket()
+        except OSError as error:
+            logger.warning(
+                f"Unable to monitor network changes with netlink, "
+                f"falling back to polling: {error}",
+                category="network", event="monitor"
+            )
+            super().enable()
+            return
+
+        self._io_watch_id = GLib.unix_fd_add_full(
+            GLib.PRIORITY_DEFAULT, self._socket.fileno(),
+            GLib.IOCondition.IN, self._on_netlink_socket_ready
+        )
+        run_once(self.check_network_state_async)
+
+    def disable(self):
+        """Disables the network connectivity monitor."""
+        if self._io_watch_id is not None:
+            GLib.source_remove(self._io_watch_id)
+            self._io_watch_id = None
+        if self._pending_check_id is not None:
+            GLib.source_remove(self._pending_check_id)
+            self._pending_check_id = None
+        if self._socket:
+            self._socket.close()
+            self._socket = None
+        super().disable()
+
+    def poll_fast(self):
+        """Checks the network state right away."""
+        if self._io_watch_id is None:
+            super().poll_fast()
+            return
+
+        run_once(self.check_network_state_async)
+
+    @property
+    def is_enabled(self) -> bool:
+        """Returns whether the network monitor is enabled or not."""
+        return self._io_watch_id is not None or super().is_enabled
+
+    def _on_netlink_socket_ready(self, _fd, _condition):
+        if netlink.drain_network_changes(self._socket) and self._pending_check_id is None:
+            self._pending_check_id = run_after_ms(
+                self._check_network_state_after_change,
+                delay_ms=self._change_coalescing_delay_ms
+            )
+        # True is returned so that GLib keeps watching the socket.
+        return True
+
+    def _check_network_state_after_change(self):
+        self._pending_check_id = None
+        self.check_network_state_async()
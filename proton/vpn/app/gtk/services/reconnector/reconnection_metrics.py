@@ -0,0 +1,327 @@
+"""
+Reconnection metrics.
+
+Each VPN outage is recorded, from the moment the VPN connection dropped
+until it's reestablished (or given up), together with the reconnection
+attempts it took. The last outages are kept in a local history file.
+
+The history can be dumped as JSON with:
+
+.. code-block:: bash
+    python3 -m proton.vpn.app.gtk.services.reconnector.reconnection_metrics
+
+
+Copyright (c) 2023 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from __future__ import annotations
+
+import collections
+import json
+import math
+import sys
+import time
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass, field
+from typing import Deque, List, Optional, Sequence
+
+from proton.vpn import logging
+
+from proton.vpn.app.gtk.config import RECONNECTION_METRICS_FILE
+from proton.vpn.app.gtk.utils.debounce import DebouncedWriter
+from proton.vpn.app.gtk.utils.executor import AsyncExecutor
+from proton.vpn.app.gtk.utils.files import write_json_atomically
+
+logger = logging.getLogger(__name__)
+
+# What triggered an outage or a reconnection attempt.
+CAUSE_DROP = "drop"
+CAUSE_NETWORK_UP = "network-up"
+CAUSE_UNLOCK = "unlock"
+CAUSE_RESUME = "resume"
+CAUSE_RETRY = "retry"
+
+# How an outage ended.
+OUTCOME_CONNECTED = "connected"
+OUTCOME_DISCONNECTED = "disconnected"
+OUTCOME_FATAL_ERROR = "fatal-error"
+OUTCOME_RECONNECTOR_DISABLED = "reconnector-disabled"
+
+PERCENTILES = (50, 90, 99)
+
+
+@dataclass
+class ReconnectionAttempt:
+    """
+    Reconnection attempt.
+
+    Attributes:
+        scheduled_at: time at which the attempt was scheduled, in seconds since the epoch.
+        delay_ms: delay before the attempt, in milliseconds.
+        cause: what triggered the attempt (e.g. ``network-up``).
+        started_at: time at which the connection was initiated, if it was.
+        server_name: name of the server connected to, if the connection was initiated.
+    """
+    scheduled_at: float
+    delay_ms: float
+    cause: str
+    started_at: Optional[float] = None
+    server_name: Optional[str] = None
+
+
+@dataclass
+class Outage:
+    """
+    Period of time during which the VPN connection was down.
+
+    Attributes:
+        started_at: time at which the VPN connection dropped, in seconds since the epoch.
+        cause: what started the outage (e.g. ``drop``).
+        attempts: reconnection attempts made during the outage.
+        outcome: how the outage ended, or None if it's still ongoing.
+        ended_at: time at which the outage ended, if it did.
+    """
+    started_at: float
+    cause: str
+    attempts: List[ReconnectionAttempt] = field(default_factory=list)
+    outcome: Optional[str] = None
+    ended_at: Optional[float] = None
+
+    @property
+    def time_to_connected(self) -> Optional[float]:
+        """Returns the seconds it took to reconnect, or None if the connection was not restored."""
+        if self.outcome != OUTCOME_CONNECTED:
+            return None
+        return self.ended_at - self.started_at
+
+    def to_dict(self) -> dict:
+        """Converts the outage to a JSON-serializable dict."""
+        return asdict(self)
+
+    @staticmethod
+    def from_dict(data: dict) -> Outage:
+        """Creates the outage from a dict created with ``to_dict``."""
+        return Outage(
+            started_at=data["started_at"],
+            cause=data["cause"],
+            attempts=[ReconnectionAttempt(**attempt) for attempt in data.get("attempts", [])],
+            outcome=data.get("outcome"),
+            ended_at=data.get("ended_at")
+        )
+
+
+def percentile(values: Sequence[float], percent: float) -> Optional[float]:
+    """Returns the percentile of the values using the nearest-rank method."""
+    if not values:
+        return None
+    sorted_values = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(outages: Sequence[Outage]) -> dict:
+    """Returns the percentile summary of the outages."""
+    reconnected = [outage for outage in outages if outage.outcome == OUTCOME_CONNECTED]
+    times_to_connected = [outage.time_to_connected for outage in reconnected]
+    attempts = [len(outage.attempts) for outage in reconnected]
+    return {
+        "outages": len(outages),
+        "outcomes": dict(collections.Counter(outage.outcome for outage in outages)),
+        "causes": dict(collections.Counter(outage.cause for outage in outages)),
+        "time_to_connected_s": {
+            f"p{percent}": percentile(times_to_connected, percent) for percent in PERCENTILES
+        },
+        "attempts": {
+            f"p{percent}": percentile(attempts, percent) for percent in PERCENTILES
+        },
+    }
+
+
+class ReconnectionMetrics:
+    """
+    Records VPN outages and keeps the last ones in a local history file.
+
+    The history is loaded in the background and, like the app configuration
+    (see :class:`AppConfigStore`), it's written to disk in batches. The
+    ``record_*`` methods are expected to be called from the main thread.
+    """
+    MAX_OUTAGES = 200
+
+    def __init__(
+            self,
+            executor: AsyncExecutor,
+            file_path: str = RECONNECTION_METRICS_FILE,
+            max_outages: int = MAX_OUTAGES,
+            write_delay_ms: int = DebouncedWriter.DEFAULT_DELAY_IN_MS
+    ):
+        self._executor = executor
+        self._file_path = file_path
+        self._max_outages = max_outages
+        self._load: Optional[Future] = None
+        self._history: Optional[Deque[Outage]] = None
+        self._current_outage: Optional[Outage] = None
+        # Monotonic time at which the current outage started. Durations are
+        # measured with the monotonic clock, so that they are not affected by
+        # system clock changes.
+        self._current_outage_started_at_monotonic: Optional[float] = None
+        self._writer = DebouncedWriter(
+            executor, self._write, delay_ms=write_delay_ms, name="reconnection metrics"
+        )
+
+    @property
+    def current_outage(self) -> Optional[Outage]:
+        """Returns the ongoing outage, if any."""
+        return self._current_outage
+
+    @property
+    def outages(self) -> List[Outage]:
+        """Returns the recorded outages, from oldest to newest."""
+        return list(self._get_history())
+
+    def preload(self) -> Future:
+        """Loads the history in the background."""
+        if self._load is None:
+            self._load = self._executor.submit(self._read)
+        return self._load
+
+    def get_summary(self) -> dict:
+        """Returns the percentile summary of the recorded outages."""
+        return summarize(self.outages)
+
+    def dump(self) -> dict:
+        """Returns the summary and the recorded outages in a JSON-serializable dict."""
+        return dump(self.outages)
+
+    def record_outage_start(self, cause: str, detected_at: Optional[float] = None):
+        """
+        Records the start of an outage, unless there is one ongoing already.
+
+        :param cause: what started the outage.
+        :param detected_at: monotonic time at which the outage was detected,
+            if not now.
+        """
+        if self._current_outage:
+            return
+        now = time.monotonic()
+        if detected_at is None:
+            detected_at = now
+        self._current_outage_started_at_monotonic = detected_at
+        self._current_outage = Outage(
+            started_at=time.time() - (now - detected_at), cause=cause
+        )
+
+    def record_attempt_scheduled(self, delay_ms: float, cause: str):
+        """Records a reconnection attempt being scheduled."""
+        self.record_outage_start(cause)
+        self._current_outage.attempts.append(ReconnectionAttempt(
+            scheduled_at=self._get_outage_time(), delay_ms=round(delay_ms), cause=cause
+        ))
+
+    def record_attempt_started(self, server_name: str):
+        """Records the connection being initiated by the last attempt scheduled."""
+        if not self._current_outage or not self._current_outage.attempts:
+            return
+        attempt = self._current_outage.attempts[-1]
+        attempt.started_at = self._get_outage_time()
+        attempt.server_name = server_name
+
+    def record_outage_end(self, outcome: str, detected_at: Optional[float] = None):
+        """
+        Records the end of the ongoing outage, if any.
+
+        :param outcome: how the outage ended.
+        :param detected_at: monotonic time at which the end of the outage
+            was detected, if not now.
+        """
+        outage = self._current_outage
+        if not outage:
+            return
+
+        outage.outcome = outcome
+        outage.ended_at = self._get_outage_time(detected_at)
+        self._current_outage = None
+        self._current_outage_started_at_monotonic = None
+        history = self._get_history()
+        history.append(outage)
+        logger.info(
+            f"VPN outage ended ({outcome}) after {outage.ended_at - outage.started_at:.2f} "
+            f"seconds and {len(outage.attempts)} reconnection attempts.",
+            category="app", subcategory="reconnector", event="outage"
+        )
+        self._writer.request_write([recorded.to_dict() for recorded in history])
+
+    def flush(self) -> Future:
+        """Writes pending changes to disk right away."""
+        return self._writer.flush()
+
+    def _get_outage_time(self, monotonic_time: Optional[float] = None) -> float:
+        """
+        Returns the time since the epoch corresponding to the monotonic time
+        (by default, now) during the current outage. The elapsed time is taken
+        from the monotonic clock, so that a system clock change during the
+        outage does not distort its duration.
+        """
+        if monotonic_time is None:
+            monotonic_time = time.monotonic()
+        return self._current_outage.started_at + (
+            monotonic_time - self._current_outage_started_at_monotonic
+        )
+
+    def _get_history(self) -> Deque[Outage]:
+        if self._history is None:
+            load = self.preload()
+            if not load.done():
+                logger.warning("Reconnection metrics were accessed before they were loaded.")
+            self._history = collections.deque(load.result(), maxlen=self._max_outages)
+        return self._history
+
+    def _read(self) -> List[Outage]:
+        return read_history(self._file_path)
+
+    def _write(self, outages: List[dict]):
+        write_json_atomically(self._file_path, {"outages": outages})
+
+
+def read_history(file_path: str = RECONNECTION_METRICS_FILE) -> List[Outage]:
+    """Reads the outages recorded in the history file."""
+    try:
+        with open(file_path, "r", encoding="utf-8") as file:
+            return [Outage.from_dict(outage) for outage in json.load(file)["outages"]]
+    except FileNotFoundError:
+        return []
+    except (OSError, ValueError, KeyError, TypeError) as error:
+        logger.warning(f"Unable to load reconnection metrics: {error}")
+        return []
+
+
+def dump(outages: Sequence[Outage]) -> dict:
+    """Returns the summary and the outages in a JSON-serializable dict."""
+    return {
+        "summary": summarize(outages),
+        "outages": [outage.to_dict() for outage in outages],
+    }
+
+
+def main():
+    """Prints the summary and the recorded outages as JSON."""
+    outages = read_history(sys.argv[1] if len(sys.argv) > 1 else RECONNECTION_METRICS_FILE)
+    json.dump(dump(outages), sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Server the VPN connection is reestablished to.
+
+
+Copyright (c) 2023 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from dataclasses import dataclass
+from typing import Any, Collection, Iterable, Optional
+
+from proton.vpn.session.servers import LogicalServer
+
+
+@dataclass(frozen=True)
+class ReconnectionTarget:
+    """
+    Server to reconnect to, computed ahead of time so that reconnection
+    attempts don't have to look it up.
+
+    Attributes:
+        server_id: id of the logical server of the connection to be reestablished.
+        logical_server: logical server to reconnect to. It's not the one with
+            ``server_id`` when that one is not available anymore.
+        vpn_server: server in the format expected by the VPN connector.
+    """
+    server_id: str
+    logical_server: LogicalServer
+    vpn_server: Any
+
+    @property
+    def is_fallback(self) -> bool:
+        """Returns whether the target is not the server originally connected to."""
+        return self.logical_server.id != self.server_id
+
+
+def find_equivalent_server(
+        servers: Iterable[LogicalServer],
+        server: LogicalServer,
+        excluded_server_ids: Collection[str] = ()
+) -> Optional[LogicalServer]:
+    """
+    Returns the best enabled server with the same exit country and features
+    as the specified one, or None if there is not any.
+
+    Only servers with a tier lower or equal to the one of the specified server
+    are considered, since the user was allowed to connect to it.
+    """
+    features = set(server.features)
+    candidates = (
+        candidate for candidate in servers
+        if candidate.id != server.id
+        and candidate.id not in excluded_server_ids
+        and candidate.enabled
+        and candidate.exit_country == server.exit_country
+        and candidate.tier <= server.tier
+        and set(candidate.features) == features
+    )
+    # The lower the score, the better the server.
+    return min(candidates, key=lambda candidate: candidate.score, default=None)
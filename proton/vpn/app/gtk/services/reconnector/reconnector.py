@@ -19,8 +19,12 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
+import collections
+import math
 import random
-from typing import TYPE_CHECKING
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, List, Optional, Set
 
 from gi.repository import GLib
 
@@ -30,9 +34,18 @@ from proton.vpn.connection.exceptions import VPNConnectionError, AuthenticationE
 from proton.vpn.core.connection import VPNConnectorWrapper
 
 from proton.vpn.app.gtk.services.reconnector.network_monitor import NetworkMonitor
+from proton.vpn.app.gtk.services.reconnector.reconnection_metrics import (
+    ReconnectionMetrics, CAUSE_DROP, CAUSE_NETWORK_UP, CAUSE_RESUME, CAUSE_RETRY,
+    CAUSE_UNLOCK, OUTCOME_CONNECTED, OUTCOME_DISCONNECTED, OUTCOME_FATAL_ERROR,
+    OUTCOME_RECONNECTOR_DISABLED
+)
+from proton.vpn.app.gtk.services.reconnector.reconnection_target import (
+    ReconnectionTarget, find_equivalent_server
+)
 from proton.vpn.app.gtk.services.reconnector.session_monitor import SessionMonitor
 from proton.vpn.app.gtk.services.reconnector.vpn_monitor import VPNMonitor
 from proton.vpn.app.gtk.utils.executor import AsyncExecutor
+from proton.vpn.app.gtk.utils.glib import run_on_main_thread
 
 if TYPE_CHECKING:
     from proton.vpn.app.gtk.services import VPNDataRefresher
@@ -40,6 +53,21 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class ReconnectionDecision:
+    """
+    Decision taken by the reconnector.
+
+    Attributes:
+        timestamp: time at which the decision was taken, in seconds since the epoch.
+        event: kind of decision (e.g. ``schedule`` or ``failover``).
+        message: human-readable description of the decision.
+    """
+    timestamp: float
+    event: str
+    message: str
+
+
 class VPNReconnector:  # pylint: disable=too-many-instance-attributes
     """
     It implements the auto reconnect feature.
@@ -50,7 +78,21 @@ class VPNReconnector:  # pylint: disable=too-many-instance-attributes
     Currently, it requires a GLib MainLoop to be running. In a future version,
     the reconnector will be refactored so that it runs in a separate python
     process and will run its own main loop.
+
+    After a few failed attempts against the same server, or when the server
+    is disabled (e.g. because it's under maintenance), the reconnector fails
+    over to the best equivalent server: one in the same country, with the
+    same features. The delay between attempts is capped, so that the time
+    it takes to reconnect is bounded.
+
+    When the protocol was selected automatically and the connection failed
+    before being established, the reconnector retries with the protocol
+    returned by ``fallback_protocol_getter``, if any.
     """
+    # Number of failed attempts against a server before failing over to another one.
+    FAILED_ATTEMPTS_BEFORE_FAILOVER = 3
+    MAX_RETRY_DELAY_IN_MS = 60 * 1000
+    MAX_RECORDED_DECISIONS = 100
 
     # pylint: disable=too-many-arguments
     def __init__(
@@ -60,7 +102,9 @@ class VPNReconnector:  # pylint: disable=too-many-instance-attributes
             vpn_monitor: VPNMonitor,
             network_monitor: NetworkMonitor,
             session_monitor: SessionMonitor,
-            async_executor: AsyncExecutor
+            async_executor: AsyncExecutor,
+            metrics: Optional[ReconnectionMetrics] = None,
+            fallback_protocol_getter: Optional[Callable[[str], Optional[str]]] = None
     ):
         self._vpn_connector = vpn_connector
         self._vpn_data_refresher = vpn_data_refresher
@@ -68,18 +112,49 @@ class VPNReconnector:  # pylint: disable=too-many-instance-attributes
         self._vpn_monitor = vpn_monitor
         self._vpn_monitor.vpn_drop_callback = self._on_vpn_drop
         self._vpn_monitor.vpn_up_callback = self._on_vpn_up
+        self._vpn_monitor.vpn_disconnected_callback = self._on_vpn_disconnected
 
         self._network_monitor = network_monitor
         self._network_monitor.network_up_callback = self._on_network_up
 
         self._session_monitor = session_monitor or SessionMonitor()
         self._session_monitor.session_unlocked_callback = self._on_session_unlocked
+        self._session_monitor.prepare_for_sleep_callback = self._on_prepare_for_sleep
+        self._session_monitor.resumed_callback = self._on_resumed
 
         self._executor = async_executor
+        # Records VPN outages, if set.
+        self._metrics = metrics
+        # Returns the protocol to retry with after a connection with the given protocol failed.
+        self._get_fallback_protocol = fallback_protocol_getter
 
         self._retry_src_id = None
         self.retry_counter = 0
 
+        # Whether the VPN connection was up when the system went to sleep.
+        self._was_connected_before_sleep = False
+        # Whether the connection should be reestablished once the network is up.
+        self._reconnect_once_network_is_up = False
+
+        # Server to reconnect to, kept up to date with the VPN data.
+        self._reconnection_target: Optional[ReconnectionTarget] = None
+        self._vpn_data_handler_ids: List[int] = []
+        # Reconnection attempts per logical server id, since the connection dropped.
+        self._attempts_per_server = collections.Counter()
+        # Ids of the servers failed over from, since the connection dropped.
+        self._failed_server_ids: Set[str] = set()
+        self._decisions = collections.deque(maxlen=self.MAX_RECORDED_DECISIONS)
+
+    @property
+    def decisions(self) -> List[ReconnectionDecision]:
+        """Returns the last decisions taken, from oldest to newest."""
+        return list(self._decisions)
+
+    @property
+    def reconnection_target(self) -> Optional[ReconnectionTarget]:
+        """Returns the server the current connection would be reestablished to."""
+        return self._reconnection_target
+
     @property
     def is_reconnection_scheduled(self) -> bool:
         """Returns True if there is a pending scheduled reconnection and False otherwise."""
@@ -93,13 +168,27 @@ class VPNReconnector:  # pylint: disable=too-many-instance-attributes
         self._vpn_monitor.enable()
         self._network_monitor.enable()
         self._session_monitor.enable()
+        self._vpn_data_handler_ids = [
+            self._vpn_data_refresher.connect(signal, self._on_new_vpn_data)
+            for signal in ("new-client-config", "new-server-list", "new-server-loads")
+        ]
+        self._update_reconnection_target()
         logger.info("VPN reconnector enabled.")
 
     def disable(self):
         """Disables the auto reconnect feature."""
+        self._was_connected_before_sleep = False
+        self._reconnect_once_network_is_up = False
         self._vpn_monitor.disable()
         self._network_monitor.disable()
         self._session_monitor.disable()
+        for handler_id in self._vpn_data_handler_ids:
+            self._vpn_data_refresher.disconnect(handler_id)
+        self._vpn_data_handler_ids = []
+        self._reconnection_target = None
+        self._reset_failover_state()
+        if self._metrics:
+            self._metrics.record_outage_end(OUTCOME_RECONNECTOR_DISABLED)
         logger.info("VPN reconnector disabled.")
 
     @property
@@ -117,12 +206,13 @@ class VPNReconnector:  # pylint: disable=too-many-instance-attributes
             and not isinstance(self._vpn_connector.current_state.context.event, events.AuthDenied)
         )
 
-    def schedule_reconnection(self) -> bool:
+    def schedule_reconnection(self, cause: str = CAUSE_DROP) -> bool:
         """Schedules a reconnection attempt.
 
         The amount of time elapsed before the reconnection is attempted
         depends on the number of previous failed reconnection attempts.
 
+        :param cause: what triggered the reconnection attempt, see ``reconnection_metrics``.
         :return: True if the reconnection could be scheduled and False otherwise.
         """
         if self._retry_src_id:
@@ -130,9 +220,13 @@ class VPNReconnector:  # pylint: disable=too-many-instance-attributes
             return False
 
         retry_delay = self._calculate_retry_delay_in_milliseconds()
-        logger.info(
+        self._record_decision(
+            "schedule",
             f"Reconnection attempt #{self.retry_counter} scheduled in "
-            f"{retry_delay/1000:.2f} seconds.")
+            f"{retry_delay/1000:.2f} seconds."
+        )
+        if self._metrics:
+            self._metrics.record_attempt_scheduled(retry_delay, cause)
         self._retry_src_id = GLib.timeout_add(retry_delay, self._reconnect)
         return True
 
@@ -165,7 +259,92 @@ class VPNReconnector:  # pylint: disable=too-many-instance-attributes
             logger.debug("VPN reconnection not possible: fatal connection error.")
             return
 
-        self.schedule_reconnection()
+        self.schedule_reconnection(cause=CAUSE_UNLOCK)
+
+    def _on_prepare_for_sleep(self):
+        """Callback called by the session monitor right before the system sleeps."""
+        self._was_connected_before_sleep = isinstance(
+            self._vpn_connector.current_state, states.Connected
+        )
+        logger.info(
+            "System is going to sleep"
+            f"{' while connected to VPN' if self._was_connected_before_sleep else ''}."
+        )
+
+    def _on_resumed(self):
+        """
+        Callback called by the session monitor once the system resumed.
+
+        The VPN tunnel rarely survives a suspension, but the connection drop
+        is only detected once the VPN backend times out. Instead, as soon
+        as the network is up, the connection is reestablished if it dropped
+        or if the tunnel is not alive anymore.
+        """
+        logger.info("System resumed from sleep.")
+        # Refreshes are not run while the system sleeps.
+        self._vpn_data_refresher.refresh_expired_data()
+
+        if not self._was_connected_before_sleep:
+            return
+
+        self._was_connected_before_sleep = False
+        self._reset_retry_counter()
+        self._reconnect_once_network_is_up = True
+        future = self._network_monitor.check_network_state_async()
+        future.add_done_callback(
+            lambda f: run_on_main_thread(self._on_network_state_checked_after_resume, f)
+        )
+
+    def _on_network_state_checked_after_resume(self, future):
+        future.result()
+        if self._network_monitor.is_network_up:
+            self._reconnect_after_resume()
+        else:
+            # The network monitor calls _on_network_up once the network is up.
+            self._network_monitor.poll_fast()
+
+    def _reconnect_after_resume(self):
+        self._reconnect_once_network_is_up = False
+        current_state = self._vpn_connector.current_state
+        if isinstance(current_state, states.Connected):
+            # The connection is still reported as up until the VPN backend
+            # times out, so the tunnel is checked to find out if it survived.
+            future = self._network_monitor.check_tunnel_liveness_async()
+            future.add_done_callback(
+                lambda f: run_on_main_thread(self._on_tunnel_liveness_checked_after_resume, f)
+            )
+            return
+
+        if not self.did_vpn_drop:
+            logger.debug(
+                "VPN reconnection after resume not necessary: "
+                f"connection is {type(current_state).__name__.lower()}."
+            )
+            return
+
+        if not self.is_connection_error_fatal:
+            logger.debug("VPN reconnection after resume not possible: fatal connection error.")
+            return
+
+        self._schedule_reconnection_after_resume()
+
+    def _on_tunnel_liveness_checked_after_resume(self, future):
+        tunnel_alive = future.result()
+        if not isinstance(self._vpn_connector.current_state, states.Connected):
+            # The VPN monitor takes care of connection drops detected meanwhile.
+            return
+
+        if tunnel_alive:
+            logger.info("VPN reconnection after resume not necessary: VPN tunnel is alive.")
+            return
+
+        self._schedule_reconnection_after_resume()
+
+    def _schedule_reconnection_after_resume(self):
+        logger.info("Reconnecting after resume.")
+        if self._metrics:
+            self._metrics.record_outage_start(CAUSE_RESUME)
+        self.schedule_reconnection(cause=CAUSE_RESUME)
 
     def _on_network_up(self):
         """
@@ -176,6 +355,10 @@ class VPNReconnector:  # pylint: disable=too-many-instance-attributes
         logger.info("Network connectivity was detected.")
         self._reset_retry_counter()
 
+        if self._reconnect_once_network_is_up:
+            self._reconnect_after_resume()
+            return
+
         if not self.did_vpn_drop:
             logger.debug("VPN reconnection not necessary: connection didn't drop.")
             return
@@ -184,24 +367,48 @@ class VPNReconnector:  # pylint: disable=too-many-instance-attributes
             logger.debug("VPN reconnection not possible: fatal connection error.")
             return
 
-        self.schedule_reconnection()
+        self.schedule_reconnection(cause=CAUSE_NETWORK_UP)
 
     def _on_vpn_drop(self):
         """Callback called by the VPN monitor when a VPN connection drop was detected."""
         logger.info("VPN connection drop was detected.")
+        if self._metrics:
+            self._metrics.record_outage_start(
+                CAUSE_DROP, detected_at=self._vpn_monitor.last_drop_detected_at
+            )
+        # The network might have gone down as well, so it's polled more often for a while.
+        self._network_monitor.poll_fast()
 
         if not self.is_connection_error_fatal:
             logger.info("VPN reconnection not possible: fatal connection error.")
+            if self._metrics:
+                self._metrics.record_outage_end(OUTCOME_FATAL_ERROR)
             # Raise exception on the next event loop iteration so that the app reacts to it.
-            GLib.idle_add(self._on_reconnection_error)
+            run_on_main_thread(self._on_reconnection_error)
             return
 
-        self.schedule_reconnection()
+        self.schedule_reconnection(cause=CAUSE_DROP)
 
     def _on_vpn_up(self):
         """Callback called by the VPN monitor when the VPN connection is up."""
         logger.debug("VPN connection is up.")
+        self._reconnect_once_network_is_up = False
         self._reset_retry_counter()
+        self._reset_failover_state()
+        self._update_reconnection_target()
+        if self._metrics:
+            self._metrics.record_outage_end(
+                OUTCOME_CONNECTED, detected_at=self._vpn_monitor.last_up_detected_at
+            )
+
+    def _on_vpn_disconnected(self):
+        """Callback called by the VPN monitor when the VPN connection is disconnected."""
+        if self._metrics:
+            self._metrics.record_outage_end(OUTCOME_DISCONNECTED)
+
+    def _on_new_vpn_data(self, *_):
+        """Callback called whenever the client config or the server list change."""
+        self._update_reconnection_target()
 
     def _reconnect(self):
         logger.info(f"Reconnecting (attempt #{self.retry_counter})...")
@@ -210,27 +417,37 @@ class VPNReconnector:  # pylint: disable=too-many-instance-attributes
         if not self._network_monitor.is_network_up:
             logger.info("VPN reconnection not possible: network is down.")
             self._increase_retry_counter()
-            self.schedule_reconnection()
+            self.schedule_reconnection(cause=CAUSE_RETRY)
             return False
 
         if not self._session_monitor.is_session_unlocked:
             logger.info("VPN reconnection not possible: session is locked.")
             self._increase_retry_counter()
-            self.schedule_reconnection()
+            self.schedule_reconnection(cause=CAUSE_RETRY)
             return False
 
-        vpn_server = self._get_vpn_server(connection.server_id)
-        if vpn_server:
+        target = self._get_reconnection_target(connection.server_id)
+        if target and (
+            self._attempts_per_server[target.logical_server.id]
+            >= self.FAILED_ATTEMPTS_BEFORE_FAILOVER
+        ):
+            target = self._fail_over(target)
+
+        if target:
+            self._attempts_per_server[target.logical_server.id] += 1
+            if self._metrics:
+                self._metrics.record_attempt_started(target.logical_server.name)
             future = self._executor.submit(
                 self._vpn_connector.connect,
-                vpn_server,
-                connection.protocol,
+                target.vpn_server,
+                self._get_reconnection_protocol(connection.protocol),
                 connection.backend
             )
-            future.add_done_callback(lambda f: GLib.idle_add(f.result))
+            future.add_done_callback(lambda f: run_on_main_thread(f.result))
             self._increase_retry_counter()
         else:
-            # The server was removed from the server list after the user had connected to it.
+            # The server was removed from the server list after the user had
+            # connected to it, and there is not an equivalent one.
             logger.warning(
                 "VPN Reconnection not possible: logical server not found "
                 f"(id = {connection.server_id})"
@@ -238,22 +455,147 @@ class VPNReconnector:  # pylint: disable=too-many-instance-attributes
 
         return False  # Remove periodic source
 
-    def _get_vpn_server(self, server_id: str):
-        logical_server = self._vpn_data_refresher.server_list.get_by_id(server_id)
+    def _get_reconnection_protocol(self, protocol: str) -> str:
+        fallback_protocol = (
+            self._get_fallback_protocol(protocol) if self._get_fallback_protocol else None
+        )
+        if not fallback_protocol:
+            return protocol
+
+        self._record_decision(
+            "protocol_fallback",
+            f"Connection with {protocol} failed before being established: "
+            f"falling back to {fallback_protocol}."
+        )
+        return fallback_protocol
+
+    def _get_reconnection_target(self, server_id: str) -> Optional[ReconnectionTarget]:
+        if not self._reconnection_target or self._reconnection_target.server_id != server_id:
+            # The target was not computed yet for the current connection.
+            self._update_reconnection_target()
+        return self._reconnection_target
+
+    def _update_reconnection_target(self):
+        """
+        Computes the server the current connection would be reestablished to,
+        so that it's ready by the time a reconnection is attempted.
+
+        When the server connected to is not in the server list anymore, is
+        disabled or was failed over from, an equivalent one is chosen instead.
+        If there is not any, the server connected to is used as last resort.
+        """
+        connection = self._vpn_connector.current_connection
+        if not connection:
+            self._reconnection_target = None
+            return
+
+        server_id = connection.server_id
+        server_list = self._vpn_data_refresher.server_list
+        logical_server = server_list.get_by_id(server_id)
+        previous_target = self._reconnection_target
+        if previous_target and previous_target.server_id != server_id:
+            previous_target = None
+
+        if not self._is_usable(logical_server):
+            fallback_server = self._find_fallback_server(
+                server_list, logical_server, previous_target
+            )
+            if fallback_server:
+                if not previous_target or fallback_server.id != previous_target.logical_server.id:
+                    self._record_decision(
+                        "fallback",
+                        f"Server {server_id} is {self._describe_unusable(logical_server)}: "
+                        f"{fallback_server.name} will be used to reconnect instead."
+                    )
+                logical_server = fallback_server
+
         if not logical_server:
+            self._reconnection_target = None
+            return
+
+        vpn_server = self._vpn_connector.get_vpn_server(
+            logical_server, self._vpn_data_refresher.client_config
+        )
+        self._reconnection_target = ReconnectionTarget(
+            server_id=server_id, logical_server=logical_server, vpn_server=vpn_server
+        )
+
+    def _is_usable(self, logical_server) -> bool:
+        return (
+            logical_server is not None
+            and logical_server.enabled
+            and logical_server.id not in self._failed_server_ids
+        )
+
+    @staticmethod
+    def _describe_unusable(logical_server) -> str:
+        if logical_server is None:
+            return "not in the server list anymore"
+        if not logical_server.enabled:
+            return "disabled"
+        return "failing"
+
+    def _find_fallback_server(self, server_list, logical_server, previous_target):
+        reference_server = logical_server or (
+            previous_target.logical_server if previous_target else None
+        )
+        if not reference_server:
             return None
-        client_config = self._vpn_data_refresher.client_config
 
-        return self._vpn_connector.get_vpn_server(logical_server, client_config)
+        if previous_target and previous_target.is_fallback:
+            # A fallback server chosen before is kept as long as it's usable.
+            previous_fallback_server = server_list.get_by_id(previous_target.logical_server.id)
+            if self._is_usable(previous_fallback_server):
+                return previous_fallback_server
+
+        return find_equivalent_server(server_list, reference_server, self._failed_server_ids)
+
+    def _fail_over(self, target: ReconnectionTarget) -> ReconnectionTarget:
+        """Switches the reconnection target to an equivalent server, if there is any."""
+        failed_server = target.logical_server
+        self._failed_server_ids.add(failed_server.id)
+        self._update_reconnection_target()
+        new_target = self._reconnection_target
+        if not new_target or new_target.logical_server.id == failed_server.id:
+            self._record_decision(
+                "failover",
+                f"{self._attempts_per_server[failed_server.id]} failed attempts against "
+                f"{failed_server.name} but there is not an equivalent server: "
+                "reconnecting to it again."
+            )
+            return new_target or target
+
+        self._record_decision(
+            "failover",
+            f"{self._attempts_per_server[failed_server.id]} failed attempts against "
+            f"{failed_server.name}: failing over to {new_target.logical_server.name}."
+        )
+        return new_target
+
+    def _record_decision(self, event: str, message: str):
+        self._decisions.append(
+            ReconnectionDecision(timestamp=time.time(), event=event, message=message)
+        )
+        logger.info(message, category="app", subcategory="reconnector", event=event)
+
+    def _reset_failover_state(self):
+        self._attempts_per_server.clear()
+        self._failed_server_ids.clear()
 
     def _calculate_retry_delay_in_milliseconds(self) -> int:
         """
         Returns the amount of milliseconds to wait before a VPN connection retry.
 
         The amount of time increases exponentially based on the number of
-        previous attempts.
+        previous attempts, up to ``MAX_RETRY_DELAY_IN_MS``.
         """
-        return 2 ** self.retry_counter * random.uniform(0.9, 1.1) * 1000
+        # The exponent is capped too since the retry counter keeps growing
+        # while the network is down, and huge powers can't be converted to float.
+        max_exponent = math.ceil(math.log2(self.MAX_RETRY_DELAY_IN_MS / 1000)) + 1
+        return min(
+            2 ** min(self.retry_counter, max_exponent) * random.uniform(0.9, 1.1) * 1000,
+            self.MAX_RETRY_DELAY_IN_MS
+        )
 
     def _reset_retry_counter(self):
         if self._retry_src_id:
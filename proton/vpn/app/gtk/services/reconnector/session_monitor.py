@@ -19,19 +19,33 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
-from typing import Callable
-import dbus
-from dbus import SystemBus
-from dbus.mainloop.glib import DBusGMainLoop
-DBusGMainLoop(set_as_default=True)
+from typing import Callable, List, Optional, TYPE_CHECKING
+
+from proton.vpn import logging
+from proton.vpn.app.gtk.utils.lazy import lazy_import
+
+if TYPE_CHECKING:
+    from dbus import SystemBus
+
+# D-Bus is only imported once the session monitor is used.
+dbus = lazy_import("dbus")
+dbus_mainloop_glib = lazy_import("dbus.mainloop.glib")
 
 
 BUS_NAME = "org.freedesktop.login1"
 SEAT_AUTO_PATH = "/org/freedesktop/login1/seat/auto"
+MANAGER_PATH = "/org/freedesktop/login1"
+MANAGER_INTERFACE = "org.freedesktop.login1.Manager"
 SESSION_INTERFACE = "org.freedesktop.login1.Session"
 SEAT_INTERFACE = "org.freedesktop.login1.Seat"
 PROPERTIES_INTERFACE = "org.freedesktop.DBus.Properties"
 UNLOCK_SIGNAL = "Unlock"
+LOCK_SIGNAL = "Lock"
+PROPERTIES_CHANGED_SIGNAL = "PropertiesChanged"
+LOCKED_HINT_PROPERTY = "LockedHint"
+PREPARE_FOR_SLEEP_SIGNAL = "PrepareForSleep"
+
+logger = logging.getLogger(__name__)
 
 
 class SessionMonitor:
@@ -39,55 +53,87 @@ class SessionMonitor:
     After being enabled, it calls the callback set on the
     session_unlocked_callback attribute whenever the user session was unlocked.
 
+    The session lock state is cached: it's initialized asynchronously once
+    the monitor is enabled and then kept up to date with the session
+    ``Lock``/``Unlock`` signals and the ``LockedHint`` property changes,
+    so that checking it never blocks on the system bus.
+
     Attributes:
         session_unlocked_callback: callable that will be called when the user
         session is unlocked.
+        prepare_for_sleep_callback: optional callable that will be called
+        right before the system is suspended or hibernated.
+        resumed_callback: optional callable that will be called once the
+        system resumed from suspension or hibernation.
     """
-    def __init__(self, bus: SystemBus = None, session_object_path: str = None):
+    def __init__(self, bus: "SystemBus" = None, session_object_path: str = None):
         self._bus = bus
         self._session_object_path = session_object_path
-        self._signal_receiver = None
+        self._signal_receivers: List = []
+        self._enabled = False
+        # None while the lock state is unknown.
+        self._session_locked: Optional[bool] = None
         self.session_unlocked_callback: Callable = None
+        self.prepare_for_sleep_callback: Optional[Callable] = None
+        self.resumed_callback: Optional[Callable] = None
 
     def enable(self):
-        """Enables user session monitoring."""
+        """
+        Enables user session monitoring.
+
+        The active session is looked up asynchronously, if it was not
+        specified in the constructor.
+        """
         if not callable(self.session_unlocked_callback):
             raise RuntimeError("Callback was not set")
 
         if not self._bus:
-            self._bus = SystemBus()
-
-        if not self._session_object_path:
+            self._connect_to_bus()
+
+        self._enabled = True
+        if self.prepare_for_sleep_callback or self.resumed_callback:
+            self._signal_receivers.append(self._bus.add_signal_receiver(
+                handler_function=self._on_prepare_for_sleep,
+                signal_name=PREPARE_FOR_SLEEP_SIGNAL,
+                dbus_interface=MANAGER_INTERFACE,
+                bus_name=BUS_NAME,
+                path=MANAGER_PATH,
+            ))
+
+        if self._session_object_path:
+            self._subscribe_to_session()
+        else:
             self._setup()
 
-        self._signal_receiver = self._bus.add_signal_receiver(
-            handler_function=self.session_unlocked_callback,
-            signal_name=UNLOCK_SIGNAL,
-            dbus_interface=SESSION_INTERFACE,
-            bus_name=BUS_NAME,
-            path=self._session_object_path,
-        )
-
     def disable(self):
         """Disables user session monitoring"""
-        if self._signal_receiver:
-            self._signal_receiver.remove()
-            self._signal_receiver = None
+        self._enabled = False
+        for signal_receiver in self._signal_receivers:
+            signal_receiver.remove()
+        self._signal_receivers = []
+        self._session_locked = None
 
     @property
-    def is_session_unlocked(self):
-        """Returns True if the user session is unlocked or False otherwise."""
-        if not self._session_object_path:
-            self._setup()
+    def is_session_unlocked(self) -> bool:
+        """
+        Returns True if the user session is unlocked or False otherwise.
+
+        While the lock state is unknown (e.g. before the monitor was enabled
+        or when there is no active session), the session is assumed to be
+        unlocked.
+        """
+        return not self._session_locked
 
-        active_session = self._bus.get_object(BUS_NAME, self._session_object_path)
-        active_session_properties = dbus.Interface(active_session, PROPERTIES_INTERFACE)
-        return not bool(active_session_properties.Get(SESSION_INTERFACE, "LockedHint"))
+    def _connect_to_bus(self):
+        # The GLib main loop has to be set as default before connecting to the bus.
+        dbus_mainloop_glib.DBusGMainLoop(set_as_default=True)
+        self._bus = dbus.SystemBus()
 
     def _setup(self):
         seat_auto_proxy = self._bus.get_object(
             BUS_NAME,
-            SEAT_AUTO_PATH
+            SEAT_AUTO_PATH,
+            introspect=False
         )
 
         seat_auto_properties_proxy = dbus.Interface(
@@ -95,20 +141,96 @@ class SessionMonitor:
             PROPERTIES_INTERFACE
         )
 
+        seat_auto_properties_proxy.GetAll(
+            SEAT_INTERFACE,
+            reply_handler=self._on_seat_properties,
+            error_handler=self._on_dbus_error
+        )
+
+    def _on_seat_properties(self, seat_properties):
+        if not self._enabled:
+            return
+
         # There should always be session for a seat. If there is no seat then
         # it means that the user is not directly controlling the machine,
         # but rather controlloing it via ssh or some other indirect
         # type of control.
-        seat_properties = seat_auto_properties_proxy.GetAll(SEAT_INTERFACE)
         active_sessions = seat_properties.get("ActiveSession", [])
 
         if not active_sessions:
-            raise RuntimeError("There are no active sessions for this seat")
+            logger.warning("There are no active sessions for this seat.")
+            return
 
         _session_id, self._session_object_path = active_sessions
+        self._subscribe_to_session()
+
+    def _subscribe_to_session(self):
+        for signal_name, handler_function in (
+                (UNLOCK_SIGNAL, self._on_unlock),
+                (LOCK_SIGNAL, self._on_lock)
+        ):
+            self._signal_receivers.append(self._bus.add_signal_receiver(
+                handler_function=handler_function,
+                signal_name=signal_name,
+                dbus_interface=SESSION_INTERFACE,
+                bus_name=BUS_NAME,
+                path=self._session_object_path,
+            ))
+
+        self._signal_receivers.append(self._bus.add_signal_receiver(
+            handler_function=self._on_session_properties_changed,
+            signal_name=PROPERTIES_CHANGED_SIGNAL,
+            dbus_interface=PROPERTIES_INTERFACE,
+            bus_name=BUS_NAME,
+            path=self._session_object_path,
+        ))
+
+        session_proxy = self._bus.get_object(
+            BUS_NAME, self._session_object_path, introspect=False
+        )
+        dbus.Interface(session_proxy, PROPERTIES_INTERFACE).Get(
+            SESSION_INTERFACE, LOCKED_HINT_PROPERTY,
+            reply_handler=self._on_locked_hint,
+            error_handler=self._on_dbus_error
+        )
+
+    def _on_locked_hint(self, locked_hint):
+        if self._enabled and self._session_locked is None:
+            self._session_locked = bool(locked_hint)
+
+    def _on_unlock(self):
+        # The session is considered unlocked as soon as it's asked to be
+        # unlocked, before LockedHint is updated.
+        self._set_session_locked(False)
+
+    def _on_lock(self):
+        self._set_session_locked(True)
+
+    def _on_session_properties_changed(self, interface, changed_properties, _invalidated):
+        if interface == SESSION_INTERFACE and LOCKED_HINT_PROPERTY in changed_properties:
+            self._set_session_locked(bool(changed_properties[LOCKED_HINT_PROPERTY]))
+
+    def _set_session_locked(self, session_locked: bool):
+        if not self._enabled:
+            return
+
+        was_session_locked = self._session_locked
+        self._session_locked = session_locked
+        if was_session_locked is not False and not session_locked:
+            self.session_unlocked_callback()
+
+    def _on_prepare_for_sleep(self, start: bool):
+        # logind emits PrepareForSleep(true) before suspending and
+        # PrepareForSleep(false) once the system resumed.
+        callback = self.prepare_for_sleep_callback if start else self.resumed_callback
+        if self._enabled and callback:
+            callback()
+
+    def _on_dbus_error(self, error: Exception):
+        logger.warning(f"Unable to get the session lock state: {error}")
 
     def set_signal_receiver(self, new_object: object):
         """Sets signal receiver.
         This is mainly used for testing purposes.
         """
-        self._signal_receiver = new_object
+        self._signal_receivers = [new_object]
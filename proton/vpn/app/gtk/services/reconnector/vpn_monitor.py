@@ -19,12 +19,13 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
+import time
 from typing import Callable, Optional
 
-from gi.repository import GLib
 
 from proton.vpn.connection import states
 from proton.vpn.core.connection import VPNConnectorWrapper
+from proton.vpn.app.gtk.utils.glib import run_on_main_thread
 
 
 class VPNMonitor:
@@ -35,12 +36,34 @@ class VPNMonitor:
     Attributes:
         vpn_drop_callback: callable to be called whenever the VPN connection dropped.
         vpn_up_callback: callable to be called whenever the VPN connection is up.
+        vpn_disconnected_callback: callable to be called whenever the VPN
+            connection is disconnected.
     """
 
     def __init__(self, vpn_connector: VPNConnectorWrapper):
         self._vpn_connector = vpn_connector
         self.vpn_drop_callback: Optional[Callable] = None
         self.vpn_up_callback: Optional[Callable] = None
+        self.vpn_disconnected_callback: Optional[Callable] = None
+        self._last_drop_detected_at: Optional[float] = None
+        self._last_up_detected_at: Optional[float] = None
+
+    @property
+    def last_drop_detected_at(self) -> Optional[float]:
+        """
+        Returns the time at which the last VPN connection drop was detected,
+        as given by ``time.monotonic()``. Callbacks run a bit later, on the
+        main thread.
+        """
+        return self._last_drop_detected_at
+
+    @property
+    def last_up_detected_at(self) -> Optional[float]:
+        """
+        Returns the time at which the VPN connection was last detected to be
+        up, as given by ``time.monotonic()``.
+        """
+        return self._last_up_detected_at
 
     def enable(self):
         """Enables VPN connection monitoring."""
@@ -53,8 +76,17 @@ class VPNMonitor:
     def status_update(self, connection_status):
         """This method is called by the VPN connection state machine whenever
         the connection state changes."""
-        if isinstance(connection_status, states.Error) and self.vpn_drop_callback:
-            GLib.idle_add(self.vpn_drop_callback)  # pylint: disable=not-callable
-
-        if isinstance(connection_status, states.Connected) and self.vpn_up_callback:
-            GLib.idle_add(self.vpn_up_callback)  # pylint: disable=not-callable
+        # Callbacks are not coalesced: every transition has to be handled,
+        # in order, even when several happen before the main loop runs them.
+        if isinstance(connection_status, states.Error):
+            self._last_drop_detected_at = time.monotonic()
+            if self.vpn_drop_callback:
+                run_on_main_thread(self.vpn_drop_callback)
+
+        if isinstance(connection_status, states.Connected):
+            self._last_up_detected_at = time.monotonic()
+            if self.vpn_up_callback:
+                run_on_main_thread(self.vpn_up_callback)
+
+        if isinstance(connection_status, states.Disconnected) and self.vpn_disconnected_callback:
+            run_on_main_thread(self.vpn_disconnected_callback)
@@ -18,6 +18,7 @@ along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
 from concurrent.futures import Future
 from datetime import timedelta
+from typing import Optional
 
 from gi.repository import GLib, GObject
 from proton.vpn.core.api import ProtonVPNAPI
@@ -28,8 +29,9 @@ from proton.session.exceptions import (
     ProtonAPINotReachable, ProtonAPINotAvailable,
 )
 
-from proton.vpn.app.gtk.utils.executor import AsyncExecutor
-from proton.vpn.app.gtk.utils.glib import run_after_seconds
+from proton.vpn.app.gtk.services.refresher.metrics import RefresherMetrics, RefreshSample
+from proton.vpn.app.gtk.utils.executor import AsyncExecutor, TaskPriority, TaskScope
+from proton.vpn.app.gtk.utils.glib import run_after_seconds, run_on_main_thread
 
 logger = logging.getLogger(__name__)
 
@@ -41,12 +43,20 @@ class ClientConfigRefresher(GObject.Object):
     def __init__(
             self,
             executor: AsyncExecutor,
-            proton_vpn_api: ProtonVPNAPI
+            proton_vpn_api: ProtonVPNAPI,
+            metrics: RefresherMetrics = None
     ):
         super().__init__()
         self._executor = executor
         self._api = proton_vpn_api
-        self._reload_client_config_source_id: int = None
+        self._metrics = metrics or RefresherMetrics()
+        # In-flight API calls are cancelled when the refresher is disabled.
+        self._task_scope = TaskScope(executor)
+        self._enabled = False
+        # Id of the GLib source scheduling the next refresh, if any.
+        self._reload_client_config_source_id: Optional[int] = None
+        # Client configuration refresh in progress, if any.
+        self._in_flight_refresh: Optional[Future] = None
 
     @GObject.Signal(name="new-client-config", arg_types=(object,))
     def new_client_config(self, client_config: ClientConfig):
@@ -55,7 +65,7 @@ class ClientConfigRefresher(GObject.Object):
     @property
     def enabled(self):
         """Whether the refresher has already been enabled or not."""
-        return self._reload_client_config_source_id is not None
+        return self._enabled
 
     def enable(self):
         """Starts periodically refreshing the client configuration."""
@@ -65,6 +75,7 @@ class ClientConfigRefresher(GObject.Object):
         if not self._api.vpn_session_loaded:
             raise RuntimeError("VPN session was not loaded yet.")
 
+        self._enabled = True
         logger.info("Client config refresher enabled.")
 
         self._schedule_next_client_config_refresh(
@@ -73,25 +84,59 @@ class ClientConfigRefresher(GObject.Object):
 
     def disable(self):
         """Stops refreshing the client configuration."""
+        self._task_scope.cancel()
+        self._in_flight_refresh = None
         self._unschedule_next_refresh()
-        logger.info("Client config refresher disabled.")
+        if self._enabled:
+            self._enabled = False
+            logger.info("Client config refresher disabled.")
+
+    def refresh_if_expired(self):
+        """
+        Refreshes the client configuration straight away if it expired.
+        See :meth:`ServerListRefresher.refresh_if_expired`.
+        """
+        if not self.enabled or self._in_flight_refresh:
+            return
+
+        if self._api.client_config.seconds_until_expiration <= 0:
+            self._unschedule_next_refresh()
+            self._refresh()
 
     def _refresh(self) -> Future:
         """Fetches the new client configuration from the REST API."""
-        future = self._executor.submit(self._api.fetch_client_config)
+        # When called from the scheduled GLib source, the source is removed
+        # once this method returns.
+        self._reload_client_config_source_id = None
+        sample = self._metrics.start_sample("new-client-config")
+        future = self._task_scope.submit_with_options(
+            self._api.fetch_client_config, priority=TaskPriority.BACKGROUND
+        )
+        if not future.done():
+            self._in_flight_refresh = future
+        self._metrics.track_api_call(sample, future, measure_payload_size=True)
         future.add_done_callback(
-            lambda f: GLib.idle_add(
-                self._on_client_config_retrieved, f
+            lambda f: run_on_main_thread(
+                self._on_client_config_retrieved, f, sample
             )
         )
         return future
 
-    def _on_client_config_retrieved(self, future_client_config: Future):
+    def _on_client_config_retrieved(
+            self, future_client_config: Future, sample: RefreshSample
+    ):
+        if self._in_flight_refresh is future_client_config:
+            self._in_flight_refresh = None
+
+        if future_client_config.cancelled():
+            return
+
         next_refresh_delay = ClientConfig.get_refresh_interval_in_seconds()
         try:
             new_client_config = future_client_config.result()
             next_refresh_delay = new_client_config.seconds_until_expiration
-            self.emit("new-client-config", new_client_config)
+            with self._metrics.measure_signal_emit(sample):
+                self.emit("new-client-config", new_client_config)
         except (ProtonAPINotReachable, ProtonAPINotAvailable) as error:
             logger.warning(f"Client config update failed: {error}")
         finally:
@@ -100,6 +145,7 @@ class ClientConfigRefresher(GObject.Object):
             )
 
     def _schedule_next_client_config_refresh(self, delay_in_seconds: float):
+        self._unschedule_next_refresh()
         self._reload_client_config_source_id = run_after_seconds(
             self._refresh,
             delay_seconds=delay_in_seconds
@@ -110,7 +156,7 @@ class ClientConfigRefresher(GObject.Object):
         )
 
     def _unschedule_next_refresh(self):
-        if not self.enabled:
+        if self._reload_client_config_source_id is None:
             return
 
         GLib.source_remove(self._reload_client_config_source_id)
@@ -0,0 +1,222 @@
+"""
+Instrumentation of the VPN data refreshers.
+
+
+Copyright (c) 2023 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from __future__ import annotations
+
+import json
+import statistics
+import time
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import Future
+from dataclasses import dataclass, asdict
+from typing import Deque, Dict, List, Optional
+
+from proton.vpn import logging
+
+from proton.vpn.app.gtk.utils.files import write_json_atomically
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RefreshSample:  # pylint: disable=too-many-instance-attributes
+    """
+    Measurements taken for a single API call made by a refresher.
+
+    Attributes:
+        name: name of the refresh, matching the signal emitted with its result
+        (e.g. ``new-server-list``).
+        timestamp: unix time at which the API call was triggered.
+        api_call_duration: seconds elapsed until the API call result was
+        available, including the HTTP request and the parsing of the response.
+        payload_size: size in bytes of the data returned by the API call,
+        serialized as JSON.
+        signal_emit_duration: seconds spent by the subscribers reacting to
+        the signal emitted with the API call result.
+        time_to_ui_updated: seconds elapsed between the API call result
+        being available and the UI signaling that it was updated with it.
+        error: the error raised by the API call, if any.
+        api_call_end: monotonic time at which the API call result was available.
+    """
+    name: str
+    timestamp: float
+    api_call_duration: Optional[float] = None
+    payload_size: Optional[int] = None
+    signal_emit_duration: Optional[float] = None
+    time_to_ui_updated: Optional[float] = None
+    error: Optional[str] = None
+    api_call_end: Optional[float] = None
+
+    def to_dict(self) -> dict:
+        """Converts the sample to a dict."""
+        return asdict(self)
+
+
+def get_payload_size(result) -> Optional[int]:
+    """
+    Returns the size in bytes of the API call result serialized as JSON,
+    or None if it can't be serialized. Objects returned by the API (e.g. the
+    server list) are serialized with their ``to_dict`` method.
+    """
+    to_dict = getattr(result, "to_dict", None)
+    data = to_dict() if callable(to_dict) else result
+    try:
+        return len(json.dumps(data).encode("utf-8"))
+    except (TypeError, ValueError) as error:
+        logger.debug(f"Unable to measure the API call payload size: {error}")
+        return None
+
+
+class RefresherMetrics:
+    """
+    Keeps a rolling window of :class:`RefreshSample` objects recorded by
+    the refreshers, which can be queried or dumped to a file. The app dumps
+    them to ``REFRESHER_METRICS_FILE`` on quit.
+
+    Usage example:
+
+    .. code-block:: python
+        metrics = RefresherMetrics()
+        sample = metrics.start_sample("new-server-list")
+        future = executor.submit(api.fetch_server_list)
+        metrics.track_api_call(sample, future, measure_payload_size=True)
+        ...
+        with metrics.measure_signal_emit(sample):
+            refresher.emit("new-server-list", future.result())
+    """
+    DEFAULT_MAX_SAMPLES = 100
+
+    def __init__(self, max_samples: int = DEFAULT_MAX_SAMPLES):
+        self._samples: Deque[RefreshSample] = deque(maxlen=max_samples)
+        # Samples waiting for the UI to be updated with their API call result,
+        # indexed by name, so that a signal does not override another one's sample.
+        self._samples_pending_ui_update: Dict[str, RefreshSample] = {}
+
+    def start_sample(self, name: str) -> RefreshSample:
+        """Starts recording a new sample with the specified name."""
+        sample = RefreshSample(name=name, timestamp=time.time())
+        self._samples.append(sample)
+        return sample
+
+    def track_api_call(
+            self, sample: RefreshSample, future: Future,
+            measure_payload_size: bool = False
+    ):
+        """
+        Records the API call duration and the payload size once the future
+        wrapping the API call result is done.
+
+        :param measure_payload_size: whether the size of the API call result
+        should be measured. See :func:`get_payload_size`.
+        """
+        start = time.monotonic()
+
+        def on_api_call_done(future: Future):
+            sample.api_call_end = time.monotonic()
+            sample.api_call_duration = sample.api_call_end - start
+            if future.cancelled():
+                sample.error = "cancelled"
+                return
+            if future.exception():
+                sample.error = repr(future.exception())
+                return
+
+            if measure_payload_size:
+                sample.payload_size = get_payload_size(future.result())
+
+        future.add_done_callback(on_api_call_done)
+
+    @contextmanager
+    def measure_signal_emit(self, sample: RefreshSample):
+        """
+        Context manager measuring how long it takes to emit the signal
+        with the API call result.
+        """
+        # The UI is expected to be updated as a result of this signal.
+        self._samples_pending_ui_update[sample.name] = sample
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            sample.signal_emit_duration = time.monotonic() - start
+            logger.info(
+                f"{sample.name} API call took {sample.api_call_duration or 0:.3f} seconds "
+                f"and its signal was handled in {sample.signal_emit_duration:.3f} seconds."
+            )
+
+    def notify_ui_updated(self):
+        """
+        Called by the UI once it has been updated with the result of the
+        latest API calls.
+        """
+        now = time.monotonic()
+        for name, sample in list(self._samples_pending_ui_update.items()):
+            if sample.api_call_end is None:
+                continue
+
+            del self._samples_pending_ui_update[name]
+            sample.time_to_ui_updated = now - sample.api_call_end
+            logger.info(
+                f"UI updated {sample.time_to_ui_updated:.3f} seconds "
+                f"after the {sample.name} API call finished."
+            )
+
+    @property
+    def samples(self) -> List[RefreshSample]:
+        """Returns the samples currently in the rolling window, oldest first."""
+        return list(self._samples)
+
+    def get_summary(self) -> Dict[str, dict]:
+        """Returns summary statistics of the recorded samples per sample name."""
+        samples_by_name: Dict[str, List[RefreshSample]] = {}
+        for sample in self.samples:
+            samples_by_name.setdefault(sample.name, []).append(sample)
+
+        summary = {}
+        for name, samples in samples_by_name.items():
+            summary[name] = {"count": len(samples)}
+            for attribute in (
+                "api_call_duration", "payload_size",
+                "signal_emit_duration", "time_to_ui_updated"
+            ):
+                values = [
+                    getattr(sample, attribute) for sample in samples
+                    if getattr(sample, attribute) is not None
+                ]
+                if values:
+                    summary[name][attribute] = {
+                        "mean": statistics.mean(values),
+                        "median": statistics.median(values),
+                        "max": max(values)
+                    }
+        return summary
+
+    def dump(self, file_path: str):
+        """Dumps the recorded samples and their summary to a JSON file."""
+        write_json_atomically(
+            file_path,
+            {
+                "samples": [sample.to_dict() for sample in self.samples],
+                "summary": self.get_summary()
+            },
+            indent=2
+        )
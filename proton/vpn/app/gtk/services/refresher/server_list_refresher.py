@@ -18,20 +18,21 @@ along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
 from concurrent.futures import Future
 from datetime import timedelta
-from typing import Callable
+from typing import Callable, Optional
 
 from gi.repository import GLib, GObject
 
 from proton.session.exceptions import (
     ProtonAPINotReachable, ProtonAPINotAvailable,
 )
-from proton.vpn.app.gtk.utils.executor import AsyncExecutor
+from proton.vpn.app.gtk.services.refresher.metrics import RefresherMetrics, RefreshSample
+from proton.vpn.app.gtk.utils.executor import AsyncExecutor, TaskPriority, TaskScope
 
 from proton.vpn import logging
 from proton.vpn.session.servers.logicals import ServerList
 from proton.vpn.core.api import ProtonVPNAPI
 
-from proton.vpn.app.gtk.utils.glib import run_after_seconds
+from proton.vpn.app.gtk.utils.glib import run_after_seconds, run_on_main_thread
 
 logger = logging.getLogger(__name__)
 
@@ -43,12 +44,20 @@ class ServerListRefresher(GObject.Object):
     def __init__(
             self,
             executor: AsyncExecutor,
-            proton_vpn_api: ProtonVPNAPI
+            proton_vpn_api: ProtonVPNAPI,
+            metrics: RefresherMetrics = None
     ):
         super().__init__()
         self._executor = executor
         self._api = proton_vpn_api
-        self._reload_servers_source_id: int = None
+        self._metrics = metrics or RefresherMetrics()
+        # In-flight API calls are cancelled when the refresher is disabled.
+        self._task_scope = TaskScope(executor)
+        self._enabled = False
+        # Id of the GLib source scheduling the next refresh, if any.
+        self._reload_servers_source_id: Optional[int] = None
+        # Server list/loads update in progress, if any.
+        self._in_flight_update: Optional[Future] = None
 
     @GObject.Signal(name="new-server-list", arg_types=(object,))
     def new_server_list(self, server_list: ServerList):
@@ -61,7 +70,7 @@ class ServerListRefresher(GObject.Object):
     @property
     def enabled(self):
         """Whether the refresher has already been enabled or not."""
-        return self._reload_servers_source_id is not None
+        return self._enabled
 
     def enable(self):
         """Starts periodically refreshing the server lists/loads"""
@@ -71,21 +80,28 @@ class ServerListRefresher(GObject.Object):
         if self.enabled:
             return
 
+        self._enabled = True
         logger.info("Server list refresher enabled.")
         self._refresh()
 
     def disable(self):
         """Stops periodically refreshing the server list/loads."""
-        if self._reload_servers_source_id is not None:
-            GLib.source_remove(self._reload_servers_source_id)
-            self._reload_servers_source_id = None
+        self._task_scope.cancel()
+        self._in_flight_update = None
+        self._unschedule_next_server_list_refresh()
+        if self._enabled:
+            self._enabled = False
             logger.info("Server list refresher disabled.")
 
     def _refresh(self):
         """Refreshes the server list/loads if expired, else schedules a future refresh."""
+        # When called from the scheduled GLib source, the source is removed
+        # once this method returns.
+        self._reload_servers_source_id = None
         if self._api.server_list.expired:
             self._trigger_api_call(
-                api_method=self._api.fetch_server_list, signal_to_emit="new-server-list"
+                api_method=self._api.fetch_server_list, signal_to_emit="new-server-list",
+                measure_payload_size=True
             )
         elif self._api.server_list.loads_expired:
             self._trigger_api_call(
@@ -96,29 +112,91 @@ class ServerListRefresher(GObject.Object):
                 delay_in_seconds=self._api.server_list.seconds_until_expiration
             )
 
-    def _trigger_api_call(self, api_method: Callable, signal_to_emit: str) -> Future:
-        future = self._executor.submit(api_method)
+    def refresh_if_expired(self):
+        """
+        Refreshes the server list/loads straight away if they expired.
+
+        Refreshes are scheduled on the GLib monotonic clock, which does not
+        advance while the system is suspended. Therefore, this method should
+        be called after resuming, so that expired data is not used.
+        """
+        if not self.enabled or self._in_flight_update:
+            return
+
+        if self._api.server_list.expired or self._api.server_list.loads_expired:
+            self._unschedule_next_server_list_refresh()
+            self._refresh()
+
+    def update_server_loads(self) -> Future:
+        """
+        Updates the server loads straight away, without waiting for them to expire.
+
+        If the refresher is enabled, the next periodic refresh is rescheduled
+        once the server loads have been updated. If the server list/loads are
+        already being updated, the update in progress is returned instead.
+
+        :return: A Future wrapping the updated server list.
+        """
+        if self._in_flight_update:
+            return self._in_flight_update
+
+        reschedule = self.enabled
+        if reschedule:
+            self._unschedule_next_server_list_refresh()
+
+        return self._trigger_api_call(
+            api_method=self._api.update_server_loads, signal_to_emit="new-server-loads",
+            reschedule=reschedule
+        )
+
+    def _trigger_api_call(
+            self, api_method: Callable, signal_to_emit: str, reschedule: bool = True,
+            measure_payload_size: bool = False
+    ) -> Future:
+        sample = self._metrics.start_sample(signal_to_emit)
+        future = self._task_scope.submit_with_options(
+            api_method, priority=TaskPriority.BACKGROUND
+        )
+        if not future.done():
+            self._in_flight_update = future
+        # The server loads update returns the whole server list, so its size
+        # is not measured, as it would not be the size of the loads.
+        self._metrics.track_api_call(sample, future, measure_payload_size=measure_payload_size)
         future.add_done_callback(
-            lambda future: GLib.idle_add(self._on_api_call_done, future, signal_to_emit)
+            lambda future: run_on_main_thread(
+                self._on_api_call_done, future, signal_to_emit, reschedule, sample
+            )
         )
         return future
 
-    def _on_api_call_done(self, future_server_list: Future, signal_to_emit: str):
+    def _on_api_call_done(
+            self, future_server_list: Future, signal_to_emit: str,
+            reschedule: bool, sample: RefreshSample
+    ):
+        if self._in_flight_update is future_server_list:
+            self._in_flight_update = None
+
+        if future_server_list.cancelled():
+            return
+
         # If the server list/loads fetch fails, the next try will always
         # be done after a server loads refresh delay (currently ~15 min).
         next_refresh_delay = ServerList.get_loads_refresh_interval_in_seconds()
         try:
             new_server_list = future_server_list.result()
             next_refresh_delay = new_server_list.seconds_until_expiration
-            self.emit(signal_to_emit, new_server_list)
+            with self._metrics.measure_signal_emit(sample):
+                self.emit(signal_to_emit, new_server_list)
         except (ProtonAPINotReachable, ProtonAPINotAvailable) as error:
             logger.warning(f"Server list refresh failed: {error}")
         finally:
-            self._schedule_next_server_list_refresh(
-                delay_in_seconds=next_refresh_delay
-            )
+            if reschedule:
+                self._schedule_next_server_list_refresh(
+                    delay_in_seconds=next_refresh_delay
+                )
 
     def _schedule_next_server_list_refresh(self, delay_in_seconds: float):
+        self._unschedule_next_server_list_refresh()
         self._reload_servers_source_id = run_after_seconds(
             self._refresh,
             delay_seconds=delay_in_seconds
@@ -127,3 +205,8 @@ class ServerListRefresher(GObject.Object):
             f"Next server list refresh scheduled in "
             f"{timedelta(seconds=delay_in_seconds)}"
         )
+
+    def _unschedule_next_server_list_refresh(self):
+        if self._reload_servers_source_id is not None:
+            GLib.source_remove(self._reload_servers_source_id)
+            self._reload_servers_source_id = None
@@ -22,9 +22,10 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
+from concurrent.futures import Future
 from typing import Callable, Any, Dict
 
-from gi.repository import GLib, GObject
+from gi.repository import GObject
 
 from proton.vpn import logging
 from proton.vpn.session.client_config import ClientConfig
@@ -32,8 +33,10 @@ from proton.vpn.session.servers.logicals import ServerList
 from proton.vpn.core.api import ProtonVPNAPI
 
 from proton.vpn.app.gtk.services.refresher.client_config_refresher import ClientConfigRefresher
+from proton.vpn.app.gtk.services.refresher.metrics import RefresherMetrics
 from proton.vpn.app.gtk.services.refresher.server_list_refresher import ServerListRefresher
-from proton.vpn.app.gtk.utils.executor import AsyncExecutor
+from proton.vpn.app.gtk.utils.executor import AsyncExecutor, TaskScope
+from proton.vpn.app.gtk.utils.glib import run_on_main_thread
 
 logger = logging.getLogger(__name__)
 
@@ -51,18 +54,23 @@ class VPNDataRefresher(GObject.Object):
         executor: AsyncExecutor,
         proton_vpn_api: ProtonVPNAPI,
         client_config_refresher: ClientConfigRefresher = None,
-        server_list_refresher: ServerListRefresher = None
-    ):
+        server_list_refresher: ServerListRefresher = None,
+        metrics: RefresherMetrics = None
+    ):  # pylint: disable=too-many-arguments
         super().__init__()
         self._executor = executor
         self._api = proton_vpn_api
+        self._metrics = metrics or RefresherMetrics()
+        self._task_scope = TaskScope(executor)
         self._client_config_refresher = client_config_refresher or ClientConfigRefresher(
             executor,
-            proton_vpn_api
+            proton_vpn_api,
+            self._metrics
         )
         self._server_list_refresher = server_list_refresher or ServerListRefresher(
             executor,
-            proton_vpn_api
+            proton_vpn_api,
+            self._metrics
         )
         self._signal_refresher_map = {
             "new-client-config": self._client_config_refresher,
@@ -78,6 +86,14 @@ class VPNDataRefresher(GObject.Object):
         """
         return self._api.server_list
 
+    @property
+    def metrics(self) -> RefresherMetrics:
+        """
+        Returns the metrics recorded by the refreshers, which can be queried
+        or dumped to a file.
+        """
+        return self._metrics
+
     @property
     def client_config(self) -> ClientConfig:
         """Returns the VPN client configuration."""
@@ -120,6 +136,22 @@ class VPNDataRefresher(GObject.Object):
         """Returns whether the necessary data from API has already been retrieved or not."""
         return self._api.vpn_session_loaded
 
+    def update_server_loads(self) -> Future:
+        """
+        Updates the server loads straight away, instead of waiting for the
+        next periodic refresh.
+        :return: A Future wrapping the updated server list.
+        """
+        return self._server_list_refresher.update_server_loads()
+
+    def refresh_expired_data(self):
+        """
+        Refreshes the client configuration and the server list/loads
+        straight away if they expired (e.g. while the system was suspended).
+        """
+        self._client_config_refresher.refresh_if_expired()
+        self._server_list_refresher.refresh_if_expired()
+
     def enable(self):
         """Start retrieving data periodically from Proton's REST API."""
         if self._api.vpn_session_loaded:
@@ -136,6 +168,7 @@ class VPNDataRefresher(GObject.Object):
 
     def disable(self):
         """Stops retrieving data periodically from Proton's REST API."""
+        self._task_scope.cancel()
         self._client_config_refresher.disable()
         self._server_list_refresher.disable()
         logger.info(
@@ -154,14 +187,16 @@ class VPNDataRefresher(GObject.Object):
 
     def _refresh_vpn_session_and_then_enable(self):
         logger.warning("Reloading VPN session...")
-        on_vpn_session_ready_future = self._executor.submit(
+        on_vpn_session_ready_future = self._task_scope.submit(
             self._api.fetch_session_data
         )
 
         def on_vpn_session_ready(future):
+            if future.cancelled():
+                return
             future.result()
             self._enable()
 
         on_vpn_session_ready_future.add_done_callback(
-            lambda f: GLib.idle_add(on_vpn_session_ready, f)
+            lambda f: run_on_main_thread(on_vpn_session_ready, f)
         )
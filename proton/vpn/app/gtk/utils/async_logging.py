@@ -0,0 +1,225 @@
+"""
+Asynchronous logging pipeline.
+
+Log records are put on a queue by the threads logging them and a
+background thread formats them and passes them on to the handlers
+configured by ``proton.vpn.logging``, which write and rotate log files.
+This way, logging from GTK handlers does not block the UI on file I/O.
+
+
+Copyright (c) 2023 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import atexit
+import collections
+import copy
+import logging
+import os
+import queue
+import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import List, Optional
+
+# Environment variable disabling the asynchronous logging pipeline.
+ASYNC_LOGGING_ENV_VAR = "PROTON_VPN_ASYNC_LOGGING"
+
+
+class RingBufferHandler(logging.Handler):
+    """
+    Keeps the last log records in memory, so that they can be attached
+    to diagnostics (e.g. bug reports) without reading log files.
+    """
+    DEFAULT_CAPACITY = 1000
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        super().__init__()
+        self._records = collections.deque(maxlen=capacity)
+
+    def emit(self, record: logging.LogRecord):
+        self._records.append(record)
+
+    @property
+    def records(self) -> List[logging.LogRecord]:
+        """Returns the buffered records, from oldest to newest."""
+        return list(self._records)
+
+    def get_lines(self) -> List[str]:
+        """Returns the buffered records formatted as log lines."""
+        return [self.format(record) for record in self.records]
+
+
+class _FlushRequest:  # pylint: disable=too-few-public-methods
+    """Item put on the queue to wait until the records before it were handled."""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class _LogQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The message is merged with its arguments on the calling thread,
+        # since arguments may be mutated after the call. The rest of the
+        # formatting, done by the default implementation too, is left to
+        # the handlers on the listener thread. Records are copied since they
+        # are also passed on to the handlers of ancestor loggers.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class _LogQueueListener(QueueListener):
+    def handle(self, record):
+        if isinstance(record, _FlushRequest):
+            for handler in self.handlers:
+                handler.flush()
+            record.done.set()
+            return
+
+        super().handle(record)
+
+
+class AsyncLoggingPipeline:
+    """
+    Moves the handlers of a logger to a background thread.
+
+    The handlers attached to the logger are replaced by a handler putting
+    records on a queue, which is drained by a listener thread passing them
+    on to the original handlers. The last records are kept in a ring buffer
+    as well, see :class:`RingBufferHandler`.
+
+    Once started, pending records are flushed on exit and after unhandled
+    exceptions.
+
+    Usage example:
+
+    .. code-block:: python
+        logging.config(filename="vpn-app")
+        pipeline = AsyncLoggingPipeline()
+        pipeline.start()
+        ...
+        pipeline.flush()
+        print(pipeline.ring_buffer.get_lines())
+    """
+    DEFAULT_FLUSH_TIMEOUT_IN_SECONDS = 5
+
+    def __init__(
+            self, logger: Optional[logging.Logger] = None,
+            ring_buffer_capacity: int = RingBufferHandler.DEFAULT_CAPACITY
+    ):
+        self._logger = logger or logging.getLogger()
+        # SimpleQueue does not take any lock when records are put on it.
+        self._queue = queue.SimpleQueue()
+        self._queue_handler = _LogQueueHandler(self._queue)
+        self.ring_buffer = RingBufferHandler(ring_buffer_capacity)
+        self._handlers: List[logging.Handler] = []
+        self._listener: Optional[_LogQueueListener] = None
+        self._previous_excepthook = None
+
+    @staticmethod
+    def is_enabled_in_environment() -> bool:
+        """Returns whether the pipeline was not disabled with an environment variable."""
+        return os.environ.get(ASYNC_LOGGING_ENV_VAR, "").lower() not in ("0", "false", "no")
+
+    @property
+    def is_running(self) -> bool:
+        """Returns whether the listener thread is running or not."""
+        return self._listener is not None
+
+    def start(self):
+        """Moves the logger handlers to the listener thread."""
+        if self.is_running:
+            raise RuntimeError("The logging pipeline is already running.")
+
+        self._handlers = list(self._logger.handlers)
+        # The ring buffer formats records like the first handler (usually the log file).
+        if self._handlers and self._handlers[0].formatter:
+            self.ring_buffer.setFormatter(self._handlers[0].formatter)
+
+        self._listener = _LogQueueListener(
+            self._queue, *self._handlers, self.ring_buffer, respect_handler_level=True
+        )
+        self._listener.start()
+        for handler in self._handlers:
+            self._logger.removeHandler(handler)
+        self._logger.addHandler(self._queue_handler)
+
+        atexit.register(self.stop)
+        self._previous_excepthook = sys.excepthook
+        sys.excepthook = self._flush_on_unhandled_exception
+
+    def stop(self):
+        """Handles pending records and gives the handlers back to the logger."""
+        if not self.is_running:
+            return
+
+        atexit.unregister(self.stop)
+        # pylint: disable=comparison-with-callable
+        if sys.excepthook == self._flush_on_unhandled_exception:
+            sys.excepthook = self._previous_excepthook
+        self._previous_excepthook = None
+
+        self._logger.removeHandler(self._queue_handler)
+        for handler in self._handlers:
+            self._logger.addHandler(handler)
+        # Records still on the queue are handled before the listener stops.
+        self._listener.stop()
+        self._listener = None
+
+    def flush(self, timeout: float = DEFAULT_FLUSH_TIMEOUT_IN_SECONDS) -> bool:
+        """
+        Waits until the records logged so far were written.
+        :return: whether the records were written before the timeout.
+        """
+        if not self.is_running:
+            return True
+
+        flush_request = _FlushRequest()
+        self._queue.put(flush_request)
+        return flush_request.done.wait(timeout)
+
+    def _flush_on_unhandled_exception(self, exc_type, exc_value, exc_traceback):
+        try:
+            self._previous_excepthook(exc_type, exc_value, exc_traceback)
+        finally:
+            self.flush()
+
+
+_pipeline: Optional[AsyncLoggingPipeline] = None
+
+
+def enable(ring_buffer_capacity: int = RingBufferHandler.DEFAULT_CAPACITY) -> AsyncLoggingPipeline:
+    """
+    Starts the asynchronous logging pipeline for the root logger, which is
+    expected to have been configured already.
+    """
+    global _pipeline  # pylint: disable=global-statement
+    if _pipeline is None:
+        _pipeline = AsyncLoggingPipeline(ring_buffer_capacity=ring_buffer_capacity)
+        _pipeline.start()
+    return _pipeline
+
+
+def get_pipeline() -> Optional[AsyncLoggingPipeline]:
+    """Returns the running logging pipeline, if any."""
+    return _pipeline
+
+
+def flush(timeout: float = AsyncLoggingPipeline.DEFAULT_FLUSH_TIMEOUT_IN_SECONDS) -> bool:
+    """Waits until the records logged so far were written, if the pipeline is running."""
+    return _pipeline.flush(timeout) if _pipeline else True
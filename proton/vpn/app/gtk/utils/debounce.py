@@ -0,0 +1,155 @@
+"""
+Debouncing of writes to disk.
+
+
+Copyright (c) 2023 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from concurrent.futures import Future
+from threading import Lock
+from typing import Callable, Optional
+
+from gi.repository import GLib
+
+from proton.vpn import logging
+
+from proton.vpn.app.gtk.utils.executor import AsyncExecutor, TaskPriority
+from proton.vpn.app.gtk.utils.glib import run_after_ms
+
+logger = logging.getLogger(__name__)
+
+
+class DebouncedWriter:
+    """
+    Coalesces bursts of write requests into a single write, which is run
+    on the executor once no new write has been requested for a while.
+
+    Write requests are expected to be made from the main thread. Each write
+    is passed the arguments of the latest write request, and writes never
+    run concurrently. Writes are numbered so that an older write never
+    runs after a newer one, which would overwrite newer data.
+
+    Usage example:
+
+    .. code-block:: python
+        writer = DebouncedWriter(executor, api.save_settings, name="settings")
+        writer.request_write(settings)  # The write is scheduled.
+        writer.request_write(settings)  # The write is rescheduled.
+        ...
+        writer.flush().result()  # On quit, the pending write is run right away.
+    """
+    DEFAULT_DELAY_IN_MS = 500
+
+    def __init__(
+            self, executor: AsyncExecutor, write: Callable,
+            delay_ms: int = DEFAULT_DELAY_IN_MS, name: str = "data"
+    ):
+        self._executor = executor
+        self._write = write
+        self._delay_ms = delay_ms
+        self._name = name
+        self._source_id: Optional[int] = None
+        self._pending_future: Optional[Future] = None
+        self._pending_args: tuple = ()
+        self._write_lock = Lock()
+        # Sequence number of the last submitted write and of the last one run.
+        self._sequence_number = 0
+        self._written_sequence_number = 0
+
+    @property
+    def has_pending_write(self) -> bool:
+        """Returns whether there is a write waiting to be run or not."""
+        return self._pending_future is not None
+
+    def request_write(self, *args) -> Future:
+        """
+        Requests a write with the specified arguments, replacing any write
+        that is still pending.
+        :returns: a future resolving once the data is written.
+        """
+        if self._pending_future is None:
+            self._pending_future = Future()
+        self._pending_args = args
+
+        if self._source_id is not None:
+            GLib.source_remove(self._source_id)
+        self._source_id = run_after_ms(self._run_pending_write, delay_ms=self._delay_ms)
+
+        return self._pending_future
+
+    def flush(self) -> Future:
+        """
+        Runs the pending write, if any, without waiting for the delay.
+        :returns: a future resolving once the data is written.
+        """
+        if not self.has_pending_write:
+            future = Future()
+            future.set_result(None)
+            return future
+
+        if self._source_id is not None:
+            GLib.source_remove(self._source_id)
+
+        return self._run_pending_write()
+
+    def cancel(self):
+        """Discards the pending write, if any. Writes already running are not affected."""
+        if not self.has_pending_write:
+            return
+
+        if self._source_id is not None:
+            GLib.source_remove(self._source_id)
+            self._source_id = None
+
+        future, self._pending_future = self._pending_future, None
+        self._pending_args = ()
+        future.cancel()
+
+    def _run_pending_write(self) -> Future:
+        self._source_id = None
+        future, self._pending_future = self._pending_future, None
+        args, self._pending_args = self._pending_args, ()
+        self._sequence_number += 1
+
+        write_future = self._executor.submit_with_options(
+            self._write_in_order, (self._sequence_number, args),
+            priority=TaskPriority.BACKGROUND
+        )
+        write_future.add_done_callback(
+            lambda write_future: self._on_write_done(write_future, future)
+        )
+        return future
+
+    def _write_in_order(self, sequence_number: int, args: tuple):
+        with self._write_lock:
+            # Worker threads may acquire the lock in any order. Since each
+            # write has the latest data when it's submitted, a write is
+            # skipped once a newer one has already run.
+            if sequence_number < self._written_sequence_number:
+                logger.debug(f"Skipping outdated {self._name} write.")
+                return
+            self._write(*args)
+            self._written_sequence_number = sequence_number
+
+    def _on_write_done(self, write_future: Future, future: Future):
+        if write_future.cancelled():
+            future.cancel()
+        elif write_future.exception():
+            logger.error(f"Unable to write {self._name}: {write_future.exception()}")
+            future.set_exception(write_future.exception())
+        else:
+            future.set_result(write_future.result())
@@ -16,18 +16,321 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
+from __future__ import annotations
+
 import asyncio
 import concurrent
 import functools
 import inspect
-from concurrent.futures import ThreadPoolExecutor
-from threading import Thread
-from typing import Optional, Coroutine, Callable, Union
+import os
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from enum import Enum, IntEnum
+from threading import Condition, Lock, Thread, get_ident, local
+from typing import Optional, Coroutine, Callable, Union, Dict, Deque, List, Tuple
 
 from proton.vpn import logging
 
 logger = logging.getLogger(__name__)
 
+# Environment variable allowing to select the event loop mode, e.g. for benchmarking.
+EVENT_LOOP_MODE_ENV_VAR = "PROTON_VPN_EVENT_LOOP_MODE"
+
+
+class TaskPriority(IntEnum):
+    """
+    Priority classes for the blocking callables submitted to the executor.
+
+    Lower values have higher priority.
+    """
+    # User-initiated actions (e.g. login, connect, disconnect).
+    INTERACTIVE = 0
+    # Work the user is not waiting for (e.g. refreshes, network polling, settings saves).
+    BACKGROUND = 1
+    # Long-running work (e.g. log collection).
+    BULK = 2
+
+
+class CancellationToken:
+    """
+    Thread-safe token used to request the cancellation of tasks.
+
+    Cancelling the token cancels the futures of the tasks submitted with it
+    to :class:`AsyncExecutor`. Coroutines are cancelled straight away,
+    blocking callables are only cancelled if they didn't start yet. Once
+    started, blocking callables have to check the token cooperatively:
+
+    .. code-block:: python
+        def blocking_func():
+            token = get_current_cancellation_token()
+            for chunk in chunks:
+                token.raise_if_cancelled()
+                process(chunk)
+
+    :param parent: optional token which, when cancelled, cancels this one too.
+    """
+    def __init__(self, parent: Optional[CancellationToken] = None):
+        self._lock = Lock()
+        self._cancelled = False
+        self._callbacks: List[Callable[[], None]] = []
+        if parent:
+            parent.add_callback(self.cancel)
+
+    @property
+    def is_cancelled(self) -> bool:
+        """Returns True if the token was cancelled and False otherwise."""
+        return self._cancelled
+
+    def cancel(self):
+        """Cancels the token, calling all the registered callbacks."""
+        with self._lock:
+            if self._cancelled:
+                return
+            self._cancelled = True
+            callbacks, self._callbacks = self._callbacks, []
+
+        for callback in callbacks:
+            callback()
+
+    def raise_if_cancelled(self):
+        """Raises CancelledError if the token was cancelled."""
+        if self._cancelled:
+            raise concurrent.futures.CancelledError()
+
+    def add_callback(self, callback: Callable[[], None]):
+        """
+        Adds a callback to be called when the token is cancelled. If the token
+        was already cancelled then the callback is called straight away.
+        """
+        with self._lock:
+            if not self._cancelled:
+                self._callbacks.append(callback)
+                return
+
+        callback()
+
+    def remove_callback(self, callback: Callable[[], None]):
+        """Removes a callback previously added with ``add_callback``."""
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+
+_current_task = local()
+
+
+def get_current_cancellation_token() -> CancellationToken:
+    """
+    Returns the cancellation token of the blocking callable being run
+    on the current worker thread. If the callable was not submitted with a
+    cancellation token then a token that is never cancelled is returned.
+    """
+    return getattr(_current_task, "cancellation_token", None) or CancellationToken()
+
+
+def chain_future(source: Future, target: Future):
+    """Resolves the target future once the source future is done, with the same outcome."""
+    def on_source_done(source: Future):
+        if source.cancelled():
+            target.cancel()
+        elif source.exception():
+            target.set_exception(source.exception())
+        else:
+            target.set_result(source.result())
+
+    source.add_done_callback(on_source_done)
+
+
+_WorkItem = Tuple[Future, Callable, tuple, dict, Optional[CancellationToken]]
+
+
+class PriorityThreadPoolExecutor(ThreadPoolExecutor):
+    """
+    Thread pool running pending tasks by priority.
+
+    It inherits from ThreadPoolExecutor because that's required to be able to
+    use it as the default executor of an asyncio loop, but it replaces
+    the way tasks are scheduled.
+
+    Each priority class has its own worker budget: tasks of a given priority
+    class never take more than a limited amount of workers. On top of that,
+    background and bulk tasks share a budget which excludes the workers
+    reserved for interactive tasks, so there are always workers available to
+    start interactive tasks straight away, even while long-running
+    background tasks are in progress.
+    """
+    # Number of workers that background and bulk tasks can never take.
+    RESERVED_INTERACTIVE_WORKERS = 2
+
+    def __init__(self, max_workers: Optional[int] = None, thread_name_prefix: str = ""):
+        if max_workers is None:
+            # Same default as in concurrent.futures.ThreadPoolExecutor.
+            max_workers = min(32, (os.cpu_count() or 1) + 4)
+        if max_workers <= self.RESERVED_INTERACTIVE_WORKERS:
+            raise ValueError(
+                f"max_workers must be greater than {self.RESERVED_INTERACTIVE_WORKERS}."
+            )
+
+        super().__init__(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        non_reserved_workers = max_workers - self.RESERVED_INTERACTIVE_WORKERS
+        self._worker_budgets: Dict[TaskPriority, int] = {
+            TaskPriority.INTERACTIVE: max_workers,
+            TaskPriority.BACKGROUND: non_reserved_workers,
+            TaskPriority.BULK: max(1, non_reserved_workers // 2),
+        }
+        # Budget shared by all the priority classes other than interactive.
+        self._non_interactive_budget = non_reserved_workers
+        self._pending: Dict[TaskPriority, Deque[_WorkItem]] = {
+            priority: deque() for priority in TaskPriority
+        }
+        self._running: Dict[TaskPriority, int] = {priority: 0 for priority in TaskPriority}
+        self._worker_threads: List[Thread] = []
+        self._idle_workers = 0
+        self._condition = Condition()
+        self._is_shutdown = False
+
+    def submit(self, fn: Callable, /, *args, **kwargs) -> Future:
+        """
+        Schedules the callable to be run with interactive priority.
+
+        All arguments are passed to the callable. To set the priority,
+        use ``submit_with_options`` instead.
+        :returns: a Future wrapping the result of the callable.
+        """
+        return self.submit_with_options(fn, args, kwargs)
+
+    def submit_with_options(
+            self, fn: Callable, args: tuple = (), kwargs: Optional[dict] = None, *,
+            priority: TaskPriority = TaskPriority.INTERACTIVE,
+            cancellation_token: Optional[CancellationToken] = None
+    ) -> Future:
+        """
+        Schedules the callable to be run with the specified priority.
+
+        :param args: positional arguments to be passed to the callable.
+        :param kwargs: keyword arguments to be passed to the callable.
+        :param cancellation_token: token made available to the callable
+        through :func:`get_current_cancellation_token`. The callable is not
+        run if the token was cancelled before it started.
+        :returns: a Future wrapping the result of the callable.
+        """
+        with self._condition:
+            if self._is_shutdown:
+                raise RuntimeError("Cannot schedule new futures after shutdown.")
+
+            future = Future()
+            self._pending[priority].append(
+                (future, fn, args, kwargs or {}, cancellation_token)
+            )
+            self._spawn_worker_if_needed()
+            self._condition.notify_all()
+            return future
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False):
+        """
+        Stops accepting new tasks and, if ``wait`` is True, waits for the
+        pending ones to finish.
+        """
+        with self._condition:
+            self._is_shutdown = True
+            if cancel_futures:
+                for pending in self._pending.values():
+                    while pending:
+                        future, *_ = pending.popleft()
+                        future.cancel()
+            self._condition.notify_all()
+
+        if wait:
+            for thread in self._worker_threads:
+                thread.join()
+
+    def _spawn_worker_if_needed(self):
+        pending_count = sum(len(pending) for pending in self._pending.values())
+        if (
+            pending_count > self._idle_workers
+            and len(self._worker_threads) < self._max_workers
+        ):
+            thread = Thread(
+                target=self._work, daemon=True,
+                name=f"{self._thread_name_prefix}_{len(self._worker_threads)}"
+            )
+            thread.start()
+            self._worker_threads.append(thread)
+
+    def _has_worker_budget(self, priority: TaskPriority) -> bool:
+        if self._running[priority] >= self._worker_budgets[priority]:
+            return False
+        if priority is TaskPriority.INTERACTIVE:
+            return True
+        running_non_interactive = sum(
+            running for running_priority, running in self._running.items()
+            if running_priority is not TaskPriority.INTERACTIVE
+        )
+        return running_non_interactive < self._non_interactive_budget
+
+    def _pop_next_work_item(self) -> Optional[Tuple[TaskPriority, _WorkItem]]:
+        for priority in TaskPriority:
+            pending = self._pending[priority]
+            while pending and self._has_worker_budget(priority):
+                work_item = pending.popleft()
+                future, *_, cancellation_token = work_item
+                if cancellation_token and cancellation_token.is_cancelled:
+                    future.cancel()
+                if future.set_running_or_notify_cancel():
+                    self._running[priority] += 1
+                    return priority, work_item
+        return None
+
+    def _has_pending_work(self) -> bool:
+        return any(self._pending.values())
+
+    def _work(self):
+        while True:
+            with self._condition:
+                next_work_item = self._pop_next_work_item()
+                while next_work_item is None:
+                    if self._is_shutdown and not self._has_pending_work():
+                        return
+                    self._idle_workers += 1
+                    self._condition.wait()
+                    self._idle_workers -= 1
+                    next_work_item = self._pop_next_work_item()
+
+            priority, (future, fn, args, kwargs, cancellation_token) = next_work_item
+            _current_task.cancellation_token = cancellation_token
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as exc:  # pylint: disable=broad-except
+                future.set_exception(exc)
+            finally:
+                _current_task.cancellation_token = None
+                del future, fn, args, kwargs, cancellation_token
+                with self._condition:
+                    self._running[priority] -= 1
+                    self._condition.notify_all()
+
+
+class EventLoopMode(Enum):
+    """
+    How the asyncio loop of the :class:`AsyncExecutor` is driven.
+
+    THREAD: the asyncio loop runs on a thread of its own.
+    GLIB: the asyncio loop is driven by the GLib main loop, so coroutines
+    run on the same thread as GTK.
+    """
+    THREAD = "thread"
+    GLIB = "glib"
+
+    @classmethod
+    def from_environment(cls) -> EventLoopMode:
+        """Returns the mode set in the environment, defaulting to THREAD."""
+        mode = os.environ.get(EVENT_LOOP_MODE_ENV_VAR, cls.THREAD.value)
+        try:
+            return cls(mode.lower())
+        except ValueError:
+            logger.warning(f"Unknown event loop mode: {mode}.")
+            return cls.THREAD
+
 
 class AsyncExecutor:
     """
@@ -54,60 +357,118 @@ class AsyncExecutor:
             assert future1.result() == "async func done"
             assert future2.result() == "regular func done"
 
+    The async executor owns a single thread pool, used both to run the
+    blocking functions passed to ``submit`` and as the default executor of
+    the asyncio loop (e.g. for ``loop.run_in_executor``). The pool is shut
+    down when the async executor is stopped.
+
+    By default, the asyncio loop runs on a thread of its own. When using
+    ``EventLoopMode.GLIB``, the asyncio loop is driven by the GLib main loop
+    instead, and blocking functions still run on the thread pool. In this
+    mode, blocking on the result of a coroutine from the GLib main loop thread
+    would prevent the coroutine from running, so ``run_until_complete``
+    should be used instead.
     """
+    # The app is I/O bound and only runs a handful of blocking tasks at the
+    # same time, so there is no need for the default pool size, which grows
+    # with the number of CPUs.
+    DEFAULT_MAX_WORKERS = 8
+    THREAD_NAME_PREFIX = "protonvpn-worker"
 
     def __init__(
             self, loop: Optional[asyncio.AbstractEventLoop] = None,
-            executor: Optional[ThreadPoolExecutor] = None
+            executor: Optional[PriorityThreadPoolExecutor] = None,
+            max_workers: int = DEFAULT_MAX_WORKERS,
+            loop_mode: EventLoopMode = EventLoopMode.THREAD
     ):
         self._thread: Optional[Thread] = None
-        self._executor = executor or ThreadPoolExecutor()
-        self._loop = loop or asyncio.new_event_loop()
+        self._executor = executor or PriorityThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=self.THREAD_NAME_PREFIX
+        )
+        self._loop_mode = loop_mode
+        self._loop = loop or self._new_event_loop(loop_mode)
+        # Identifier of the thread driving the asyncio loop in GLib mode.
+        self._loop_thread_id: Optional[int] = None
+
+    @staticmethod
+    def _new_event_loop(loop_mode: EventLoopMode) -> asyncio.AbstractEventLoop:
+        if loop_mode is EventLoopMode.GLIB:
+            # Imported here so that GLib is only required in GLib mode.
+            from proton.vpn.app.gtk.utils.glib_asyncio import \
+                GLibEventLoop  # pylint: disable=import-outside-toplevel
+            return GLibEventLoop()
+
+        return asyncio.new_event_loop()
+
+    @property
+    def loop_mode(self) -> EventLoopMode:
+        """Returns how the asyncio loop is driven."""
+        return self._loop_mode
 
     def start(self):
         """
         Starts the async executor.
 
-        It starts a thread that runs the asyncio loop.
+        In thread mode, it starts a thread that runs the asyncio loop. In GLib
+        mode, it attaches the asyncio loop to the GLib main loop.
         """
         if self.is_running:
             raise RuntimeError("The executor is already running.")
 
-        self._thread = Thread(target=self._run_asyncio_loop_forever, daemon=True)
+        if self._loop_mode is EventLoopMode.GLIB:
+            self._loop.set_default_executor(self._executor)
+            self._loop.attach()
+            self._loop_thread_id = get_ident()
+            return
+
+        self._thread = Thread(
+            target=self._run_asyncio_loop_forever, daemon=True, name="protonvpn-asyncio-loop"
+        )
         self._thread.start()
 
     @property
     def is_running(self) -> bool:
         """Returns True if the async executor has already been started and False otherwise."""
-        return self._thread is not None
+        return self._thread is not None or self._loop_thread_id is not None
 
     def _run_asyncio_loop_forever(self):
-        self._executor = ThreadPoolExecutor()
         self._loop.set_default_executor(self._executor)
         asyncio.set_event_loop(self._loop)
         try:
             self._loop.run_forever()
         finally:
-            # Currently recommended way of shutting down the loop:
-            # https://docs.python.org/3/library/asyncio-eventloop.html#asyncio.loop.close
-            self._loop.run_until_complete(self._loop.shutdown_asyncgens())
-            self._loop.run_until_complete(self._loop.shutdown_default_executor())
-            self._loop.close()
+            self._close_loop()
+
+    def _close_loop(self):
+        # Currently recommended way of shutting down the loop:
+        # https://docs.python.org/3/library/asyncio-eventloop.html#asyncio.loop.close
+        self._loop.run_until_complete(self._loop.shutdown_asyncgens())
+        self._loop.run_until_complete(self._loop.shutdown_default_executor())
+        self._loop.close()
 
     def stop(self):
         """
         Stops the async executor.
 
-        It schedules a call to stop the asyncio loop and waits for the thread
-        running it to stop.
+        In thread mode, it schedules a call to stop the asyncio loop and waits
+        for the thread running it to stop. In GLib mode, it detaches the
+        asyncio loop from the GLib main loop and closes it.
         """
         if not self.is_running:
             logger.warning("The executor has already been stopped.")
             return
 
-        self._loop.call_soon_threadsafe(self._loop.stop)
-        self._thread.join()
-        self._thread = None
+        if self._loop_mode is EventLoopMode.GLIB:
+            self._loop.detach()
+            self._close_loop()
+            self._loop_thread_id = None
+        else:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
+        # The pool should already have been shut down with the loop, as it's
+        # the loop's default executor. This is a no-op in that case.
+        self._executor.shutdown()
 
     # pylint: disable=invalid-name
     def submit(self, fn: Union[Coroutine, Callable], *args, **kwargs) -> concurrent.futures.Future:
@@ -115,13 +476,116 @@ class AsyncExecutor:
         Submits a coroutine function or a callable to be run on the async executor
         in a thread-safe manner and non-blocking manner.
 
+        All arguments are passed to the coroutine function/callable. To set
+        a priority, a deadline or a cancellation token, use
+        ``submit_with_options`` instead.
+        :returns: a Future that can be waited for in a non-asyncio manner (or not).
+        """
+        return self.submit_with_options(fn, args, kwargs)
+
+    def submit_with_options(  # pylint: disable=too-many-arguments
+            self, fn: Union[Coroutine, Callable],
+            args: tuple = (), kwargs: Optional[dict] = None, *,
+            priority: TaskPriority = TaskPriority.INTERACTIVE,
+            timeout: Optional[float] = None,
+            cancellation_token: Optional[CancellationToken] = None
+    ) -> concurrent.futures.Future:
+        """
+        Submits a coroutine function or a callable, like ``submit``, with
+        the specified options.
+
+        :param args: positional arguments to be passed to ``fn``.
+        :param kwargs: keyword arguments to be passed to ``fn``.
+        :param priority: priority class of the callable. User-initiated actions
+        should use the default interactive priority, so that they don't wait
+        behind background work. Coroutine functions run on the asyncio loop,
+        so the priority does not apply to them.
+        :param timeout: optional deadline, in seconds. Coroutines still running
+        after the deadline are cancelled and their future raises TimeoutError.
+        Blocking callables get their cancellation token cancelled instead.
+        :param cancellation_token: optional token to cancel the submitted task.
+        See :class:`CancellationToken`.
         :returns: a Future that can be waited for in a non-asyncio manner (or not).
         """
+        kwargs = kwargs or {}
         if inspect.iscoroutinefunction(fn):
             coroutine = fn(*args, **kwargs)
-            return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+            if timeout is not None:
+                coroutine = asyncio.wait_for(coroutine, timeout)
+            future = asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+        else:
+            parent_token = cancellation_token
+            if timeout is not None:
+                cancellation_token = CancellationToken(parent=parent_token)
+            future = self._executor.submit_with_options(
+                fn, args, kwargs, priority=priority, cancellation_token=cancellation_token
+            )
+            if timeout is not None:
+                self._cancel_after_timeout(future, cancellation_token, timeout)
+            if parent_token and parent_token is not cancellation_token:
+                future.add_done_callback(
+                    lambda _: parent_token.remove_callback(cancellation_token.cancel)
+                )
+
+        if cancellation_token:
+            cancellation_token.add_callback(future.cancel)
+            future.add_done_callback(
+                lambda _: cancellation_token.remove_callback(future.cancel)
+            )
+
+        return future
+
+    def _cancel_after_timeout(
+            self, future: Future, cancellation_token: CancellationToken, timeout: float
+    ):
+        """
+        Cancels the token after the timeout, unless the future is done before.
+
+        The timer is scheduled on the asyncio loop, so the handle is only
+        available once the loop ran the scheduling callback.
+        """
+        lock = Lock()
+        timer_handle: Optional[asyncio.TimerHandle] = None
+
+        def schedule_timer():
+            nonlocal timer_handle
+            with lock:
+                if not future.done():
+                    timer_handle = self._loop.call_later(timeout, cancellation_token.cancel)
 
-        return self._executor.submit(fn, *args, **kwargs)
+        def cancel_timer(_future: Future):
+            with lock:
+                if timer_handle:
+                    self._loop.call_soon_threadsafe(timer_handle.cancel)
+
+        self._loop.call_soon_threadsafe(schedule_timer)
+        future.add_done_callback(cancel_timer)
+
+    def run_until_complete(self, fn: Union[Coroutine, Callable], *args, **kwargs):
+        """
+        Submits a coroutine function or a callable and blocks until its result
+        is available, which is returned.
+
+        In GLib mode, if called from the thread driving the asyncio loop, the
+        GLib main loop keeps being iterated while waiting, so that the
+        asyncio loop can run the coroutine.
+        :raises RuntimeError: if called from a coroutine or callback run by
+            the asyncio loop, which would otherwise wait for itself forever.
+        """
+        if self._is_called_from_running_loop():
+            raise RuntimeError(
+                "run_until_complete cannot be called from the asyncio loop of the executor."
+            )
+
+        future = self.submit(fn, *args, **kwargs)
+        if inspect.iscoroutinefunction(fn) and self._loop_thread_id == get_ident():
+            self._loop.run_until_future_done(future)
+        return future.result()
+
+    def _is_called_from_running_loop(self) -> bool:
+        if self._loop_mode is EventLoopMode.GLIB:
+            return self._loop_thread_id == get_ident() and self._loop.is_running()
+        return self._thread is not None and self._thread.ident == get_ident()
 
     async def _blocking_function_to_coroutine(self, fn, *args, **kwargs):
         fn_wrapper = functools.partial(fn, *args, **kwargs)
@@ -133,3 +597,61 @@ class AsyncExecutor:
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.stop()
+
+
+class TaskScope:
+    """
+    Groups tasks so that they can all be cancelled at once, for example
+    when the widget that started them is unrealized.
+
+    It exposes the same ``submit`` and ``submit_with_options`` methods as
+    :class:`AsyncExecutor`, so it can be passed wherever an executor is expected.
+
+    Usage example:
+
+    .. code-block:: python
+        task_scope = TaskScope(controller.executor)
+        widget.connect("unrealize", lambda *_: task_scope.cancel())
+        future = task_scope.submit(blocking_func)
+        other_future = task_scope.track(controller.login(username, password))
+    """
+    def __init__(self, executor: AsyncExecutor):
+        self._executor = executor
+        self._cancellation_token = CancellationToken()
+
+    def submit(self, fn: Union[Coroutine, Callable], *args, **kwargs) -> Future:
+        """Submits a task to the executor, within this scope."""
+        return self.submit_with_options(fn, args, kwargs)
+
+    def submit_with_options(
+            self, fn: Union[Coroutine, Callable],
+            args: tuple = (), kwargs: Optional[dict] = None, *,
+            priority: TaskPriority = TaskPriority.INTERACTIVE,
+            timeout: Optional[float] = None
+    ) -> Future:
+        """
+        Submits a task to the executor, within this scope, with the
+        specified options. See :meth:`AsyncExecutor.submit_with_options`.
+        """
+        return self.track(self._executor.submit_with_options(
+            fn, args, kwargs, priority=priority, timeout=timeout,
+            cancellation_token=self._cancellation_token
+        ))
+
+    def track(self, future: Future) -> Future:
+        """
+        Adds a future obtained somewhere else to this scope, so that it's
+        cancelled together with the rest of tasks in the scope.
+        """
+        cancellation_token = self._cancellation_token
+        cancellation_token.add_callback(future.cancel)
+        future.add_done_callback(lambda _: cancellation_token.remove_callback(future.cancel))
+        return future
+
+    def cancel(self):
+        """
+        Cancels all tasks in this scope. The scope can still be used afterwards
+        to submit new tasks.
+        """
+        self._cancellation_token.cancel()
+        self._cancellation_token = CancellationToken()
@@ -0,0 +1,51 @@
+"""
+File utilities.
+
+
+Copyright (c) 2023 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import json
+import os
+import tempfile
+from typing import Any, Optional
+
+
+def write_json_atomically(file_path: str, data: Any, indent: Optional[int] = None):
+    """
+    Writes the data as JSON to the specified file, creating its directory
+    if needed.
+
+    The data is written to a temporary file in the same directory first,
+    which is synced to disk and then renamed over the specified file, so that
+    the file is never left half-written, not even after a crash.
+    :raises OSError: if the file could not be written.
+    """
+    directory = os.path.dirname(file_path) or "."
+    os.makedirs(directory, exist_ok=True)
+    file_descriptor, tmp_file_path = tempfile.mkstemp(
+        dir=directory, prefix=f"{os.path.basename(file_path)}.", suffix=".tmp"
+    )
+    try:
+        with open(file_descriptor, "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=indent)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_file_path, file_path)
+    except BaseException:
+        os.unlink(tmp_file_path)
+        raise
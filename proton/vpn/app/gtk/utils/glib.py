@@ -19,7 +19,11 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
-from typing import Callable
+import sys
+import time
+from collections import OrderedDict, deque
+from threading import Lock
+from typing import Callable, Deque, Hashable, Optional
 
 from gi.repository import GLib
 
@@ -83,3 +87,116 @@ def run_after_seconds(function, *args, delay_seconds: int, **kwargs) -> int:
     See :func:`run_after_ms`.
     """
     return run_after_ms(function, *args, delay_ms=delay_seconds*1000, **kwargs)
+
+
+class MainThreadDispatcher:
+    """
+    Runs callbacks on the GLib main loop, in a thread-safe manner.
+
+    Instead of adding a new idle source per callback, as ``GLib.idle_add``
+    does, all callbacks dispatched until the main loop becomes idle are
+    run in batch from a single idle source.
+
+    Callbacks can be dispatched with a key. When a callback is dispatched
+    with a key which is already pending, the pending callback is replaced
+    by the new one, keeping its position in the queue. This way, when
+    a subscriber receives a burst of connection state updates, only the
+    latest one is applied.
+
+    Usage example:
+
+    .. code-block:: python
+        dispatcher = MainThreadDispatcher()
+        dispatcher.dispatch(widget.update, state, key=(widget, "connection-state"))
+    """
+    LATENCY_SAMPLES = 100
+
+    def __init__(self, priority: int = GLib.PRIORITY_DEFAULT_IDLE):
+        self._priority = priority
+        self._lock = Lock()
+        # Pending callbacks indexed by key.
+        self._queue: OrderedDict = OrderedDict()
+        self._source_id: Optional[int] = None
+        self._latencies: Deque[float] = deque(maxlen=self.LATENCY_SAMPLES)
+        self._max_queue_depth = 0
+        self._dispatched_count = 0
+        self._coalesced_count = 0
+
+    def dispatch(self, function: Callable, *args, key: Optional[Hashable] = None, **kwargs):
+        """
+        Schedules the function to be called on the main loop.
+
+        :param function: function to be called.
+        :param *args: arguments to be passed to the function.
+        :param key: optional key used to coalesce callbacks. Only the last
+        callback dispatched with a given key is run.
+        :param **kwargs: keyword arguments to be passed to the function.
+        """
+        with self._lock:
+            self._dispatched_count += 1
+            if key is None:
+                key = object()
+            pending_callback = self._queue.get(key)
+            if pending_callback:
+                self._coalesced_count += 1
+                # Keep the original enqueue time so that the latency is not underestimated.
+                enqueue_time = pending_callback[3]
+            else:
+                enqueue_time = time.monotonic()
+            self._queue[key] = (function, args, kwargs, enqueue_time)
+            self._max_queue_depth = max(self._max_queue_depth, len(self._queue))
+
+            if self._source_id is None:
+                self._source_id = GLib.idle_add(self._run_pending, priority=self._priority)
+
+    @property
+    def queue_depth(self) -> int:
+        """Returns the amount of callbacks waiting to be run."""
+        return len(self._queue)
+
+    def get_stats(self) -> dict:
+        """
+        Returns the dispatcher metrics: current and maximum queue depth,
+        number of dispatched and coalesced callbacks and the latency, in
+        seconds, between a callback being dispatched and being run.
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+            return {
+                "queue_depth": len(self._queue),
+                "max_queue_depth": self._max_queue_depth,
+                "dispatched": self._dispatched_count,
+                "coalesced": self._coalesced_count,
+                "latency_median": latencies[len(latencies) // 2] if latencies else None,
+                "latency_max": latencies[-1] if latencies else None,
+            }
+
+    def _run_pending(self):
+        with self._lock:
+            queue, self._queue = self._queue, OrderedDict()
+            self._source_id = None
+
+        now = time.monotonic()
+        for function, args, kwargs, enqueue_time in queue.values():
+            self._latencies.append(now - enqueue_time)
+            try:
+                function(*args, **kwargs)
+            except Exception:  # pylint: disable=broad-except
+                # The exception is passed on to the exception hook, as GLib
+                # would do, without preventing the rest of callbacks from running.
+                sys.excepthook(*sys.exc_info())
+
+        # Returning a falsy value is required so that GLib removes the idle source.
+        return False
+
+
+main_thread_dispatcher = MainThreadDispatcher()
+
+
+def run_on_main_thread(function: Callable, *args, key: Optional[Hashable] = None, **kwargs):
+    """
+    Runs the function on the GLib main loop, from any thread.
+
+    See :class:`MainThreadDispatcher`.
+    """
+    main_thread_dispatcher.dispatch(function, *args, key=key, **kwargs)
@@ -0,0 +1,160 @@
+"""
+asyncio integration with the GLib main loop.
+
+
+Copyright (c) 2023 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+import math
+import threading
+from concurrent.futures import Future
+from typing import Optional
+
+from gi.repository import GLib
+
+
+def _do_nothing():
+    pass
+
+
+# pylint: disable=protected-access
+class GLibEventLoop(asyncio.SelectorEventLoop):
+    """
+    asyncio event loop driven by the default GLib main context, instead
+    of by a thread of its own.
+
+    Once attached, the loop runs one iteration whenever:
+     - any of the file descriptors watched by its selector is ready, which
+       includes the self-pipe used by ``call_soon_threadsafe``,
+     - its next timer is due or
+     - it has callbacks ready to be run.
+
+    Since coroutines run on the same thread as GTK, their results can be
+    passed on to the UI without hopping threads.
+
+    Usage example:
+
+    .. code-block:: python
+        loop = GLibEventLoop()
+        loop.attach()
+        asyncio.run_coroutine_threadsafe(coroutine(), loop)
+        Gtk.main()
+        loop.detach()
+    """
+    def __init__(self):
+        super().__init__()
+        self._io_source_id: Optional[int] = None
+        self._timeout_source_id: Optional[int] = None
+
+    @property
+    def is_attached(self) -> bool:
+        """Returns whether the loop is attached to the GLib main context or not."""
+        return self._io_source_id is not None
+
+    def attach(self):
+        """Attaches the loop to the default GLib main context."""
+        if self.is_attached:
+            raise RuntimeError("The event loop is already attached.")
+
+        asyncio.set_event_loop(self)
+        self._io_source_id = GLib.unix_fd_add_full(
+            GLib.PRIORITY_DEFAULT, self._selector.fileno(),
+            GLib.IOCondition.IN, self._on_selector_ready
+        )
+        self._schedule_next_iteration()
+
+    def detach(self):
+        """Detaches the loop from the default GLib main context."""
+        if not self.is_attached:
+            return
+
+        GLib.source_remove(self._io_source_id)
+        self._io_source_id = None
+        self._remove_timeout_source()
+
+    def run_until_future_done(self, future: Future):
+        """
+        Iterates the GLib main context until the future is done.
+
+        It should only be used to wait for the result of a coroutine from
+        the thread owning the GLib main context, as blocking on it would
+        prevent the loop from running the coroutine.
+        :raises RuntimeError: if called while the loop is running, e.g. from
+            a coroutine or a callback run by the loop, since the loop can't
+            run again until they return.
+        """
+        if self.is_running():
+            raise RuntimeError(
+                "Cannot wait for a future from a coroutine or callback run by the same loop."
+            )
+
+        context = GLib.MainContext.default()
+        while not future.done():
+            context.iteration(True)
+
+    def _on_selector_ready(self, _fd, _condition):
+        self._run_iteration()
+        # True is returned so that GLib keeps watching the selector.
+        return True
+
+    def _on_timeout(self):
+        self._timeout_source_id = None
+        self._run_iteration()
+        # Returning a falsy value is required so that GLib removes the source.
+        return False
+
+    def _run_iteration(self):
+        if self.is_running() or self.is_closed():
+            # Nested GLib main context iteration while the loop was running.
+            return
+
+        # A single iteration is run, with the loop set as the running loop
+        # as run_forever would do, without starting and stopping the loop.
+        previous_running_loop = asyncio.events._get_running_loop()
+        self._thread_id = threading.get_ident()
+        asyncio.events._set_running_loop(self)
+        try:
+            if not self._ready:
+                # The selector is only polled: GLib already waited for it to
+                # be ready, or for the next timer to be due.
+                self.call_soon(_do_nothing)
+            self._run_once()
+        finally:
+            asyncio.events._set_running_loop(previous_running_loop)
+            self._thread_id = None
+        self._schedule_next_iteration()
+
+    def _schedule_next_iteration(self):
+        self._remove_timeout_source()
+        if not self.is_attached:
+            return
+
+        if self._ready:
+            delay_ms = 0
+        elif self._scheduled:
+            delay_ms = math.ceil(max(0, self._scheduled[0].when() - self.time()) * 1000)
+        else:
+            # The loop will be woken up by its selector.
+            return
+
+        self._timeout_source_id = GLib.timeout_add(delay_ms, self._on_timeout)
+
+    def _remove_timeout_source(self):
+        if self._timeout_source_id is not None:
+            GLib.source_remove(self._timeout_source_id)
+            self._timeout_source_id = None
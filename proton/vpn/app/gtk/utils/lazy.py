@@ -0,0 +1,83 @@
+"""
+Lazy loading of modules.
+
+
+Copyright (c) 2023 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import importlib
+from typing import Any, Optional
+
+
+class LazyImport:
+    """
+    Proxy to a module, or to an attribute of a module, which is only
+    imported the first time the proxy is used.
+
+    It's meant to defer the import of modules which are rarely used
+    (e.g. dialogs) or expensive to import, so that they don't slow down
+    the app startup. Since the proxy is assigned to a module attribute,
+    it can still be patched in tests as if it had been imported eagerly.
+
+    Usage example:
+
+    .. code-block:: python
+        AboutDialog = lazy_import(
+            "proton.vpn.app.gtk.widgets.headerbar.menu.about_dialog", "AboutDialog"
+        )
+        dbus = lazy_import("dbus")
+
+        about_dialog = AboutDialog()  # The module is imported at this point.
+    """
+    def __init__(self, module_name: str, attribute_name: Optional[str] = None):
+        self._module_name = module_name
+        self._attribute_name = attribute_name
+        self._object = None
+
+    def load(self) -> Any:
+        """Imports the module, if it was not imported yet, and returns the proxied object."""
+        if self._object is None:
+            module = importlib.import_module(self._module_name)
+            self._object = (
+                getattr(module, self._attribute_name) if self._attribute_name else module
+            )
+        return self._object
+
+    @property
+    def is_loaded(self) -> bool:
+        """Returns whether the module was already imported by the proxy or not."""
+        return self._object is not None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.load(), name)
+
+    def __call__(self, *args, **kwargs) -> Any:
+        return self.load()(*args, **kwargs)
+
+    def __repr__(self):
+        target = self._module_name
+        if self._attribute_name:
+            target = f"{target}.{self._attribute_name}"
+        return f"<LazyImport {target} loaded={self.is_loaded}>"
+
+
+def lazy_import(module_name: str, attribute_name: Optional[str] = None) -> LazyImport:
+    """
+    Returns a proxy to the module, or to the module attribute, which is
+    imported the first time it's used. See :class:`LazyImport`.
+    """
+    return LazyImport(module_name, attribute_name)
@@ -0,0 +1,240 @@
+"""
+Startup timeline profiler.
+
+It's enabled either with the ``--profile-startup[=PATH]`` command line
+option or with the ``PROTON_VPN_PROFILE_STARTUP[=PATH]`` environment
+variable, and it writes the startup timeline to a JSON file using the
+Chrome trace event format, which can be loaded in chrome://tracing or
+https://ui.perfetto.dev.
+
+
+Copyright (c) 2023 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import builtins
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Mapping, Optional, Sequence
+
+PROFILE_STARTUP_OPTION = "--profile-startup"
+PROFILE_STARTUP_ENV_VAR = "PROTON_VPN_PROFILE_STARTUP"
+DEFAULT_TRACE_FILE_PATH = os.path.join(tempfile.gettempdir(), "protonvpn-startup-trace.json")
+
+
+class StartupProfiler:
+    """
+    Records the startup timeline of the app.
+
+    Phases are recorded as complete trace events and milestones as instant
+    trace events. Once enabled, the time spent importing each module is
+    recorded as well.
+
+    All methods are no-ops while the profiler is not enabled, so that the
+    instrumentation can be left in place.
+
+    Usage example:
+
+    .. code-block:: python
+        startup_profiler.enable("/tmp/trace.json")
+        with startup_profiler.phase("Controller.get"):
+            controller = Controller.get(executor)
+        startup_profiler.mark("vpn-widget-ready")
+        startup_profiler.finish()
+    """
+    def __init__(self):
+        self._trace_file_path: Optional[str] = None
+        self._start_time: Optional[float] = None
+        self._events: List[dict] = []
+        self._import_time_per_top_level_module: Dict[str, float] = {}
+        self._import_depth = threading.local()
+        self._original_import = None
+        self._import_hook = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_enabled(self) -> bool:
+        """Returns whether the profiler is recording or not."""
+        return self._trace_file_path is not None
+
+    def enable(self, trace_file_path: str = DEFAULT_TRACE_FILE_PATH):
+        """Starts recording the startup timeline."""
+        if self.is_enabled:
+            return
+
+        self._trace_file_path = trace_file_path
+        self._start_time = time.perf_counter()
+        self._install_import_hook()
+        self.mark("profiler-enabled")
+
+    def enable_if_requested(
+            self, argv: Sequence[str], environ: Mapping[str, str] = os.environ
+    ) -> bool:
+        """
+        Enables the profiler if it was requested either on the command line
+        or with the environment variable. Returns whether it was enabled.
+        """
+        trace_file_path = get_trace_file_path(argv, environ)
+        if trace_file_path:
+            self.enable(trace_file_path)
+        return self.is_enabled
+
+    @contextmanager
+    def phase(self, name: str):
+        """Context manager recording the duration of a startup phase."""
+        if not self.is_enabled:
+            yield
+            return
+
+        start = self._now_in_us()
+        try:
+            yield
+        finally:
+            self._add_event({
+                "name": name, "cat": "startup", "ph": "X",
+                "ts": start, "dur": self._now_in_us() - start
+            })
+
+    def mark(self, name: str):
+        """Records a startup milestone."""
+        if not self.is_enabled:
+            return
+
+        self._add_event({
+            "name": name, "cat": "startup", "ph": "i", "s": "p", "ts": self._now_in_us()
+        })
+
+    def finish(self) -> Optional[str]:
+        """
+        Stops recording and writes the trace file. It returns the trace
+        file path, or None if the profiler was not enabled.
+        """
+        if not self.is_enabled:
+            return None
+
+        self.mark("startup-finished")
+        self._uninstall_import_hook()
+        trace_file_path = self._trace_file_path
+        with open(trace_file_path, "w", encoding="utf-8") as file:
+            json.dump(self.to_trace(), file)
+
+        self._trace_file_path = None
+        return trace_file_path
+
+    def to_trace(self) -> dict:
+        """Returns the recorded timeline in the Chrome trace event format."""
+        with self._lock:
+            return {
+                "traceEvents": list(self._events),
+                "displayTimeUnit": "ms",
+                "otherData": {
+                    "import_time_per_top_level_module_ms": {
+                        module: round(duration_in_us / 1000, 3)
+                        for module, duration_in_us in sorted(
+                            self._import_time_per_top_level_module.items(),
+                            key=lambda item: item[1], reverse=True
+                        )
+                    }
+                }
+            }
+
+    def _install_import_hook(self):
+        self._original_import = builtins.__import__
+        self._import_hook = self._timed_import
+        builtins.__import__ = self._import_hook
+
+    def _uninstall_import_hook(self):
+        if self._import_hook and builtins.__import__ is self._import_hook:
+            builtins.__import__ = self._original_import
+        self._original_import = None
+        self._import_hook = None
+
+    # pylint: disable=redefined-builtin
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original_import = self._original_import or builtins.__import__
+        if level == 0 and not fromlist and name in sys.modules:
+            # Already imported: nothing worth recording.
+            return original_import(name, globals, locals, fromlist, level)
+
+        depth = getattr(self._import_depth, "value", 0)
+        self._import_depth.value = depth + 1
+        modules_count = len(sys.modules)
+        start = self._now_in_us()
+        try:
+            return original_import(name, globals, locals, fromlist, level)
+        finally:
+            self._import_depth.value = depth
+            if len(sys.modules) > modules_count:
+                duration = self._now_in_us() - start
+                self._add_event({
+                    "name": f"import {'.' * level}{name}", "cat": "import", "ph": "X",
+                    "ts": start, "dur": duration
+                })
+                if depth == 0 and level == 0:
+                    # Only outermost imports are accounted, to avoid counting nested ones twice.
+                    top_level_module = name.split(".")[0]
+                    with self._lock:
+                        self._import_time_per_top_level_module[top_level_module] = (
+                            self._import_time_per_top_level_module.get(top_level_module, 0)
+                            + duration
+                        )
+
+    def _add_event(self, event: dict):
+        event["pid"] = os.getpid()
+        event["tid"] = threading.get_ident()
+        with self._lock:
+            self._events.append(event)
+
+    def _now_in_us(self) -> float:
+        return (time.perf_counter() - self._start_time) * 1_000_000
+
+
+def get_trace_file_path(argv: Sequence[str], environ: Mapping[str, str]) -> Optional[str]:
+    """
+    Returns the trace file path if startup profiling was requested, either
+    on the command line or with the environment variable, or None otherwise.
+    """
+    for arg in argv[1:]:
+        if arg == PROFILE_STARTUP_OPTION:
+            return DEFAULT_TRACE_FILE_PATH
+        if arg.startswith(f"{PROFILE_STARTUP_OPTION}="):
+            return arg.split("=", 1)[1] or DEFAULT_TRACE_FILE_PATH
+
+    value = environ.get(PROFILE_STARTUP_ENV_VAR)
+    if not value or value.lower() in ("0", "false", "no"):
+        return None
+    if value.lower() in ("1", "true", "yes"):
+        return DEFAULT_TRACE_FILE_PATH
+    return value
+
+
+def remove_profile_startup_option(argv: Sequence[str]) -> List[str]:
+    """
+    Returns the command line arguments without the profiler option, which
+    is unknown to Gtk.Application.
+    """
+    return [
+        arg for arg in argv
+        if arg != PROFILE_STARTUP_OPTION and not arg.startswith(f"{PROFILE_STARTUP_OPTION}=")
+    ]
+
+
+startup_profiler = StartupProfiler()
@@ -0,0 +1,211 @@
+"""
+Event loop lag watchdog.
+
+
+Copyright (c) 2023 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+import bisect
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Dict, List, Optional
+
+from gi.repository import GLib
+
+from proton.vpn import logging
+
+from proton.vpn.app.gtk.utils.executor import AsyncExecutor
+
+logger = logging.getLogger(__name__)
+
+# Environment variable enabling the watchdog.
+WATCHDOG_ENV_VAR = "PROTON_VPN_LAG_WATCHDOG"
+
+
+class StallHistogram:
+    """Histogram of stall durations, in milliseconds."""
+    BUCKETS_MS = (100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self):
+        # The last bucket counts the stalls longer than the longest bucket limit.
+        self._counts = [0] * (len(self.BUCKETS_MS) + 1)
+
+    def add(self, duration_ms: float):
+        """Adds a stall duration to the histogram."""
+        self._counts[bisect.bisect_left(self.BUCKETS_MS, duration_ms)] += 1
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        """Returns the stall count per bucket, indexed by the bucket label."""
+        labels = [f"<={limit}ms" for limit in self.BUCKETS_MS]
+        labels.append(f">{self.BUCKETS_MS[-1]}ms")
+        return dict(zip(labels, self._counts))
+
+    def __str__(self):
+        return ", ".join(f"{label}: {count}" for label, count in self.counts.items() if count)
+
+
+class MonitoredLoop:
+    """State of one of the event loops monitored by :class:`LagWatchdog`."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.thread_id: Optional[int] = None
+        self.last_heartbeat: Optional[float] = None
+        self.stall_reported = False
+        self.histogram = StallHistogram()
+
+    def heartbeat(self, interval: float) -> Optional[float]:
+        """
+        Records a heartbeat, returning the scheduling lag (in seconds)
+        since the previous one.
+        """
+        now = time.monotonic()
+        self.thread_id = threading.get_ident()
+        lag = None
+        if self.last_heartbeat is not None:
+            lag = max(0.0, now - self.last_heartbeat - interval)
+        self.last_heartbeat = now
+        self.stall_reported = False
+        return lag
+
+
+class LagWatchdog:
+    """
+    Measures the scheduling lag of the GLib main loop and of the asyncio
+    loop run by the :class:`AsyncExecutor`.
+
+    Each loop runs a heartbeat: a high-priority GLib timeout in the case
+    of the GLib main loop and a coroutine in the case of the asyncio loop.
+    A watcher thread checks the heartbeats and, when one of them is late
+    by more than the threshold, it logs the stack of the thread running
+    the stalled loop, while the stall is still happening. The stall
+    duration is logged once the loop recovers, together with the histogram
+    of stall durations.
+
+    The heartbeats are cheap enough for the watchdog to be left enabled.
+    """
+    DEFAULT_INTERVAL_IN_MS = 250
+    DEFAULT_THRESHOLD_IN_MS = 500
+
+    def __init__(
+            self, executor: Optional[AsyncExecutor] = None,
+            interval_ms: int = DEFAULT_INTERVAL_IN_MS,
+            threshold_ms: int = DEFAULT_THRESHOLD_IN_MS
+    ):
+        self._executor = executor
+        self._interval = interval_ms / 1000
+        self._threshold = threshold_ms / 1000
+        self.glib_loop = MonitoredLoop("GLib main")
+        self.asyncio_loop = MonitoredLoop("asyncio")
+        self._glib_source_id: Optional[int] = None
+        self._asyncio_heartbeat_future = None
+        self._watcher_thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    @staticmethod
+    def is_enabled_in_environment() -> bool:
+        """Returns whether the watchdog was enabled with an environment variable."""
+        return os.environ.get(WATCHDOG_ENV_VAR, "").lower() in ("1", "true", "yes")
+
+    @property
+    def monitored_loops(self) -> List[MonitoredLoop]:
+        """Returns the loops being monitored."""
+        loops = [self.glib_loop]
+        if self._executor:
+            loops.append(self.asyncio_loop)
+        return loops
+
+    def start(self):
+        """Starts the heartbeats and the watcher thread."""
+        if self._watcher_thread:
+            raise RuntimeError("The watchdog is already running.")
+
+        self._stop_event.clear()
+        self._glib_source_id = GLib.timeout_add(
+            int(self._interval * 1000), self._on_glib_heartbeat, priority=GLib.PRIORITY_HIGH
+        )
+        if self._executor:
+            self._asyncio_heartbeat_future = self._executor.submit(self._run_asyncio_heartbeat)
+        self._watcher_thread = threading.Thread(
+            target=self._watch, daemon=True, name="protonvpn-watchdog"
+        )
+        self._watcher_thread.start()
+
+    def stop(self):
+        """Stops the heartbeats and the watcher thread."""
+        if not self._watcher_thread:
+            return
+
+        GLib.source_remove(self._glib_source_id)
+        self._glib_source_id = None
+        if self._asyncio_heartbeat_future:
+            self._asyncio_heartbeat_future.cancel()
+            self._asyncio_heartbeat_future = None
+        self._stop_event.set()
+        self._watcher_thread.join()
+        self._watcher_thread = None
+
+    def _on_glib_heartbeat(self):
+        self._on_heartbeat(self.glib_loop)
+        # True is returned so that GLib keeps running the heartbeat.
+        return True
+
+    async def _run_asyncio_heartbeat(self):
+        while True:
+            self._on_heartbeat(self.asyncio_loop)
+            await asyncio.sleep(self._interval)
+
+    def _on_heartbeat(self, loop: MonitoredLoop):
+        lag = loop.heartbeat(self._interval)
+        if lag is None or lag <= self._threshold:
+            return
+
+        loop.histogram.add(lag * 1000)
+        logger.warning(
+            f"{loop.name} loop was stalled for {lag * 1000:.0f} ms. "
+            f"Stall histogram: {loop.histogram}.",
+            category="app", event="stall"
+        )
+
+    def _watch(self):
+        while not self._stop_event.wait(self._interval):
+            now = time.monotonic()
+            for loop in self.monitored_loops:
+                if loop.last_heartbeat is None or loop.stall_reported:
+                    continue
+                if now - loop.last_heartbeat - self._interval > self._threshold:
+                    loop.stall_reported = True
+                    self._report_stall(loop)
+
+    def _report_stall(self, loop: MonitoredLoop):
+        # pylint: disable=protected-access
+        frame = sys._current_frames().get(loop.thread_id)
+        if not frame:
+            return
+
+        handler = f"{frame.f_code.co_name} ({frame.f_code.co_filename}:{frame.f_lineno})"
+        stack = "".join(traceback.format_stack(frame))
+        logger.warning(
+            f"{loop.name} loop stalled for more than {self._threshold * 1000:.0f} ms "
+            f"in {handler}:\n{stack}",
+            category="app", event="stall"
+        )
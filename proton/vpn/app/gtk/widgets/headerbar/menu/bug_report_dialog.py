@@ -22,20 +22,24 @@ along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 from __future__ import annotations
 
 import io
+import os
 import re
 import subprocess
 from tempfile import NamedTemporaryFile
-from concurrent.futures import Future
+from concurrent.futures import CancelledError, Future
 
-from typing import TYPE_CHECKING, List
-from gi.repository import Gtk, GLib
+from typing import TYPE_CHECKING, List, Union
+from gi.repository import Gtk
 
 from proton.session.exceptions import ProtonAPINotReachable, ProtonAPIError
 from proton.vpn.session import BugReportForm
 from proton.vpn.app.gtk import __version__
 from proton.vpn import logging
-from proton.vpn.app.gtk.utils.executor import AsyncExecutor
+from proton.vpn.app.gtk.utils.executor import (
+    AsyncExecutor, TaskPriority, TaskScope, get_current_cancellation_token
+)
 from proton.vpn.app.gtk.widgets.main.notification_bar import NotificationBar
+from proton.vpn.app.gtk.utils.glib import run_on_main_thread
 
 if TYPE_CHECKING:
     from proton.vpn.app.gtk.controller import Controller
@@ -72,9 +76,9 @@ class BugReportDialog(Gtk.Dialog):  # pylint: disable=too-many-instance-attribut
         self._controller = controller
         self._main_window = main_window
         self.notification_bar = notification_bar or NotificationBar()
-        self._log_collector = log_collector or LogCollector(
-            self._controller.executor
-        )
+        # Log collection is cancelled if the dialog is closed before it finishes.
+        self._task_scope = TaskScope(self._controller.executor)
+        self._log_collector = log_collector or LogCollector(self._task_scope)
 
         self.set_title("Report an Issue")
         self.set_default_size(BugReportDialog.WIDTH, BugReportDialog.HEIGHT)
@@ -86,6 +90,7 @@ class BugReportDialog(Gtk.Dialog):  # pylint: disable=too-many-instance-attribut
         submit_button.get_style_context().add_class("primary")
 
         self.connect("response", self._on_response)
+        self.connect("unrealize", lambda _: self._task_scope.cancel())
         self.connect("realize", lambda _: self.show_all())  # pylint: disable=no-member
 
         self._generate_fields()
@@ -105,6 +110,7 @@ class BugReportDialog(Gtk.Dialog):  # pylint: disable=too-many-instance-attribut
         all the available data.
         """
         if response != Gtk.ResponseType.OK:
+            self._task_scope.cancel()
             self.close()
             return
 
@@ -113,13 +119,14 @@ class BugReportDialog(Gtk.Dialog):  # pylint: disable=too-many-instance-attribut
         self.notification_bar.show_info_message(self.BUG_REPORT_SENDING_MESSAGE, 60000)
         if self.send_logs_checkbox.get_active():
             logs_future = self._log_collector.get_logs()
-            logs_future.add_done_callback(
-                lambda _logs_future: GLib.idle_add(
-                    self._submit_bug_report, _logs_future.result()
-                )
-            )
+
+            def on_logs_collected(_logs_future: Future):
+                if not _logs_future.cancelled():
+                    run_on_main_thread(self._submit_bug_report, _logs_future.result())
+
+            logs_future.add_done_callback(on_logs_collected)
         else:
-            GLib.idle_add(self._submit_bug_report, [])
+            run_on_main_thread(self._submit_bug_report, [])
 
         # Prevent that the window closes before receiving the API response,
         # as by default Gtk.Dialog closes after the response signal is emitted.
@@ -143,7 +150,7 @@ class BugReportDialog(Gtk.Dialog):  # pylint: disable=too-many-instance-attribut
         self._disable_form()
         future = self._controller.submit_bug_report(report_form)
         future.add_done_callback(
-            lambda future: GLib.idle_add(
+            lambda future: run_on_main_thread(
                 self._on_report_submission_result,
                 future, report_form
             )
@@ -301,7 +308,7 @@ class BugReportDialog(Gtk.Dialog):  # pylint: disable=too-many-instance-attribut
 class LogCollector:  # pylint: disable=too-few-public-methods
     """Collects all necessary logs needed for the report tool."""
 
-    def __init__(self, executor: AsyncExecutor):
+    def __init__(self, executor: Union[AsyncExecutor, TaskScope]):
         self._executor = executor
 
     def get_logs(self) -> Future:
@@ -313,9 +320,15 @@ class LogCollector:  # pylint: disable=too-few-public-methods
 
         app_log = self._get_app_log()
         nm_log_future = self._generate_network_manager_log()
-        nm_log_future.add_done_callback(
-            lambda f: logs_future.set_result([app_log, f.result()])
-        )
+
+        def on_network_manager_log_generated(future: Future):
+            try:
+                logs_future.set_result([app_log, future.result()])
+            except CancelledError:
+                app_log.close()
+                logs_future.cancel()
+
+        nm_log_future.add_done_callback(on_network_manager_log_generated)
 
         return logs_future
 
@@ -338,10 +351,20 @@ class LogCollector:  # pylint: disable=too-few-public-methods
                     "journalctl", "-u", "NetworkManager", "--no-pager",
                     "--utc", "--since=-1d", "--no-hostname"
                 ]
-                process = subprocess.run(args, stdout=temp_file, check=False)
+                with subprocess.Popen(args, stdout=temp_file) as process:
+                    # Stop collecting logs as soon as the task is cancelled.
+                    cancellation_token = get_current_cancellation_token()
+                    cancellation_token.add_callback(process.terminate)
+                    process.wait()
+                    cancellation_token.remove_callback(process.terminate)
+
+                if cancellation_token.is_cancelled:
+                    os.remove(temp_file.name)
+                    cancellation_token.raise_if_cancelled()
+
                 if process.returncode == 0:
                     return open(temp_file.name, "rb")
 
                 raise RuntimeError("Network Manager logs could not be generated.")
 
-        return self._executor.submit(run_subprocess)
+        return self._executor.submit_with_options(run_subprocess, priority=TaskPriority.BULK)
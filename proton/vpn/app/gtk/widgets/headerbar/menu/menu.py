@@ -22,16 +22,14 @@ along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 from typing import TYPE_CHECKING
 from concurrent.futures import Future
 
-from gi.repository import Gio, GLib, GObject
+from gi.repository import Gio, GObject
 from proton.vpn.app.gtk import Gtk
 
-from proton.vpn.app.gtk.widgets.headerbar.menu.bug_report_dialog import BugReportDialog
-from proton.vpn.app.gtk.widgets.headerbar.menu.about_dialog import AboutDialog
 from proton.vpn.app.gtk.widgets.main.confirmation_dialog import ConfirmationDialog
 from proton.vpn.app.gtk.controller import Controller
 from proton.vpn.app.gtk.widgets.main.loading_widget import OverlayWidget, DefaultLoadingWidget
-from proton.vpn.app.gtk.widgets.headerbar.menu.settings import SettingsWindow
-from proton.vpn.app.gtk.widgets.headerbar.menu.release_notes_dialog import ReleaseNotesDialog
+from proton.vpn.app.gtk.utils.glib import run_on_main_thread
+from proton.vpn.app.gtk.utils.lazy import lazy_import
 from proton.vpn.connection.enum import KillSwitchSetting as KillSwitchSettingEnum
 
 from proton.session.exceptions import ProtonAPINotReachable
@@ -42,6 +40,20 @@ logger = logging.getLogger(__name__)
 if TYPE_CHECKING:
     from proton.vpn.app.gtk.app import MainWindow
 
+# Dialogs are only imported the first time they are opened.
+BugReportDialog = lazy_import(
+    "proton.vpn.app.gtk.widgets.headerbar.menu.bug_report_dialog", "BugReportDialog"
+)
+AboutDialog = lazy_import(
+    "proton.vpn.app.gtk.widgets.headerbar.menu.about_dialog", "AboutDialog"
+)
+SettingsWindow = lazy_import(
+    "proton.vpn.app.gtk.widgets.headerbar.menu.settings", "SettingsWindow"
+)
+ReleaseNotesDialog = lazy_import(
+    "proton.vpn.app.gtk.widgets.headerbar.menu.release_notes_dialog", "ReleaseNotesDialog"
+)
+
 
 class Menu(Gio.Menu):  # pylint: disable=too-many-instance-attributes
     """App menu shown in the header bar."""
@@ -201,7 +213,7 @@ class Menu(Gio.Menu):  # pylint: disable=too-many-instance-attributes
             if kill_switch_state > KillSwitchSettingEnum.OFF:
                 future = self._controller.disable_killswitch()
                 future.add_done_callback(
-                    lambda f: GLib.idle_add(self._on_killswitch_disabled_logout, f)
+                    lambda f: run_on_main_thread(self._on_killswitch_disabled_logout, f)
                 )
                 return
 
@@ -231,7 +243,7 @@ class Menu(Gio.Menu):  # pylint: disable=too-many-instance-attributes
     def _request_logout(self):
         future = self._controller.logout()
         future.add_done_callback(
-            lambda future: GLib.idle_add(self._on_logout_result, future)
+            lambda future: run_on_main_thread(self._on_logout_result, future)
         )
 
     def _on_logout_result(self, future: Future):
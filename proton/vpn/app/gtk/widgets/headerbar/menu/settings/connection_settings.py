@@ -20,8 +20,12 @@ You should have received a copy of the GNU General Public License
 along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
 
+from concurrent.futures import Future
+
 from gi.repository import Gtk
 from proton.vpn.app.gtk.controller import Controller
+from proton.vpn.app.gtk.services.auto_protocol import AUTO_PROTOCOL
+from proton.vpn.app.gtk.utils.glib import run_on_main_thread
 from proton.vpn.app.gtk.widgets.main.notification_bar import NotificationBar
 from proton.vpn.app.gtk.widgets.headerbar.menu.settings.common import (
     RECONNECT_MESSAGE, BaseCategoryContainer, SettingRow, SettingName, SettingDescription
@@ -32,6 +36,7 @@ class ConnectionSettings(BaseCategoryContainer):  # pylint: disable=too-many-ins
     """Settings related to connection are all grouped under this class."""
     CATEGORY_NAME = "Connection"
     PROTOCOL_LABEL = "Protocol"
+    AUTO_PROTOCOL_LABEL = "Auto"
     VPN_ACCELERATOR_LABEL = "VPN Accelerator"
     VPN_ACCELERATOR_DESCRIPTION = "Increase your connection speed by up to 400% "\
         "with performance enhancing technologies."
@@ -39,6 +44,10 @@ class ConnectionSettings(BaseCategoryContainer):  # pylint: disable=too-many-ins
     MODERATE_NAT_DESCRIPTION = "Disables randomization of the local addresses mapping. "\
         "This can slightly reduce connection security, but should allow direct "\
         "connections for online gaming and similar purposes."
+    RECONNECTION_STATISTICS_LABEL = "Reconnection time"
+    RECONNECTION_STATISTICS_DESCRIPTION = "Time it took to restore the VPN connection "\
+        "after it dropped, over the last {outages} recorded outages. Half of the "\
+        "connections (p50) and 90% of them (p90) were restored within the times shown."
 
     def __init__(self, controller: Controller, notification_bar: NotificationBar):
         super().__init__(self.CATEGORY_NAME)
@@ -48,6 +57,7 @@ class ConnectionSettings(BaseCategoryContainer):  # pylint: disable=too-many-ins
         self.vpn_accelerator_row = None
         self.protocol_row = None
         self.moderate_nat_row = None
+        self.reconnection_statistics_row = None
 
     def build_ui(self):
         """Builds the UI, invoking all necessary methods that are
@@ -55,6 +65,7 @@ class ConnectionSettings(BaseCategoryContainer):  # pylint: disable=too-many-ins
         self.build_protocol()
         self.build_vpn_accelerator()
         self.build_moderate_nat()
+        self.build_reconnection_statistics()
 
     @property
     def protocol(self) -> str:
@@ -104,19 +115,33 @@ class ConnectionSettings(BaseCategoryContainer):  # pylint: disable=too-many-ins
                     f"{RECONNECT_MESSAGE}"
                 )
 
-        available_protocols = self._controller.get_available_protocols()
-        combobox = Gtk.ComboBoxText()
+        def add_available_protocols(available_protocols: Future):
+            for protocol in available_protocols.result():
+                combobox.append(protocol.cls.protocol, protocol.cls.ui_protocol)
 
-        for protocol in available_protocols:
-            combobox.append(protocol.cls.protocol, protocol.cls.ui_protocol)
+            combobox.set_active_id(self.protocol)
+            combobox.set_sensitive(True)
+            # The handler is connected once the active protocol was set, so
+            # that setting it does not save settings.
+            combobox.connect("changed", on_combobox_changed)
 
+        combobox = Gtk.ComboBoxText()
+        combobox.append(AUTO_PROTOCOL, self.AUTO_PROTOCOL_LABEL)
         combobox.set_entry_text_column(1)
-        combobox.set_active_id(self.protocol)
-        combobox.connect("changed", on_combobox_changed)
 
         self.protocol_row = SettingRow(SettingName(self.PROTOCOL_LABEL), combobox)
         self.pack_start(self.protocol_row, False, False, 0)
 
+        # Available protocols are only known once the VPN connector is ready.
+        available_protocols = self._controller.get_available_protocols()
+        if available_protocols.done():
+            add_available_protocols(available_protocols)
+        else:
+            combobox.set_sensitive(False)
+            available_protocols.add_done_callback(
+                lambda future: run_on_main_thread(add_available_protocols, future)
+            )
+
     def build_vpn_accelerator(self):
         """Builds and adds the `vpn_accelerator` setting to the widget."""
         def on_switch_state(_, new_value: bool):
@@ -169,3 +194,25 @@ class ConnectionSettings(BaseCategoryContainer):  # pylint: disable=too-many-ins
         switch.set_state(self.moderate_nat)
         switch.connect("state-set", on_switch_state)
         self.pack_start(self.moderate_nat_row, False, False, 0)
+
+    def build_reconnection_statistics(self):
+        """
+        Builds and adds the reconnection time percentiles to the widget,
+        if any VPN connection drop was recorded.
+        """
+        summary = self._controller.reconnection_metrics.get_summary()
+        time_to_connected = summary["time_to_connected_s"]
+        if time_to_connected["p50"] is None:
+            return
+
+        label = Gtk.Label(
+            label=f"p50: {time_to_connected['p50']:.1f} s, p90: {time_to_connected['p90']:.1f} s"
+        )
+        self.reconnection_statistics_row = SettingRow(
+            SettingName(self.RECONNECTION_STATISTICS_LABEL),
+            label,
+            SettingDescription(
+                self.RECONNECTION_STATISTICS_DESCRIPTION.format(outages=summary["outages"])
+            )
+        )
+        self.pack_start(self.reconnection_statistics_row, False, False, 0)
@@ -78,8 +78,8 @@ class GeneralSettings(BaseCategoryContainer):  # pylint: disable=too-many-instan
 
     @connect_at_app_startup.setter
     def connect_at_app_startup(self, newvalue: str):
-        """Shortcut property that sets the new `connect_at_app_startup` setting and
-        stores to disk."""
+        """Shortcut property that sets the new `connect_at_app_startup` setting,
+        which is stored to disk in the background."""
         app_config = self._controller.app_configuration
         app_config.connect_at_app_startup = newvalue
         self._controller.app_configuration = app_config
@@ -116,8 +116,8 @@ class GeneralSettings(BaseCategoryContainer):  # pylint: disable=too-many-instan
 
     @tray_pinned_servers.setter
     def tray_pinned_servers(self, newvalue: str):
-        """Shortcut property that sets the new `tray_pinned_servers` setting and
-        stores to disk."""
+        """Shortcut property that sets the new `tray_pinned_servers` setting,
+        which is stored to disk in the background."""
         server_list = []
 
         for pinned_server in newvalue.split(","):
@@ -133,8 +133,8 @@ class GeneralSettings(BaseCategoryContainer):  # pylint: disable=too-many-instan
     def build_tray_pinned_servers(self):
         """Builds and adds the `tray_pinned_servers` setting to the widget."""
         def on_focus_outside_entry(entry: Gtk.Entry, _):
+            # The tray indicator reloads pinned servers once the app configuration changes.
             self.tray_pinned_servers = entry.get_text()
-            self._tray_indicator.reload_pinned_servers()
 
         if self._tray_indicator is None:
             return
@@ -20,19 +20,21 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
-from concurrent.futures import Future
+from concurrent.futures import CancelledError, Future
 from pathlib import Path
 
-from gi.repository import GLib, GObject
+from gi.repository import GObject
 
 from proton.vpn import logging
 
 from proton.vpn.app.gtk import Gtk
 from proton.vpn.app.gtk.assets import icons
 from proton.vpn.app.gtk.controller import Controller
+from proton.vpn.app.gtk.utils.executor import TaskScope
 from proton.vpn.app.gtk.widgets.login.logo import ProtonVPNLogo
 from proton.vpn.app.gtk.widgets.main.notifications import Notifications
 from proton.vpn.app.gtk.widgets.main.loading_widget import OverlayWidget, DefaultLoadingWidget
+from proton.vpn.app.gtk.utils.glib import run_on_main_thread
 
 logger = logging.getLogger(__name__)
 
@@ -58,6 +60,9 @@ class LoginForm(Gtk.Box):  # pylint: disable=R0902
         self._controller = controller
         self._notifications = notifications
         self._overlay_widget = overlay_widget
+        # Pending login requests are cancelled when the form is unrealized.
+        self._task_scope = TaskScope(controller.executor)
+        self.connect("unrealize", lambda *_: self._task_scope.cancel())
 
         self.pack_start(ProtonVPNLogo(), expand=False, fill=True, padding=0)
 
@@ -107,14 +112,19 @@ class LoginForm(Gtk.Box):  # pylint: disable=R0902
         self._overlay_widget.show(
             DefaultLoadingWidget(self.LOGGING_IN_MESSAGE)
         )
-        future = self._controller.login(self.username, self.password)
+        future = self._task_scope.track(
+            self._controller.login(self.username, self.password)
+        )
         future.add_done_callback(
-            lambda future: GLib.idle_add(self._on_login_result, future)
+            lambda future: run_on_main_thread(self._on_login_result, future)
         )
 
     def _on_login_result(self, future: Future):
         try:
             result = future.result()
+        except CancelledError:
+            logger.info("Login cancelled.", category="APP", subcategory="LOGIN", event="RESULT")
+            return
         except ValueError as error:
             self._notifications.show_error_message(self.INVALID_USERNAME_MESSAGE)
             logger.debug(error, category="APP", subcategory="LOGIN", event="RESULT")
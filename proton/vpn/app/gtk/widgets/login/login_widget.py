@@ -87,8 +87,8 @@ class LoginWidget(Gtk.Box):
         self.login_stack.reset()
 
     def _on_disable_killswitch(self, _):
-        self._controller.get_settings().killswitch = KillSwitchSettingEnum.OFF
-        self._controller.save_settings()
+        # The change is saved even if settings were not loaded yet.
+        self._controller.disable_killswitch()
         self.disable_killswitch.set_reveal_child(False)
         self.login_stack.login_form.set_property("sensitive", True)
 
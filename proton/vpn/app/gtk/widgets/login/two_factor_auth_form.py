@@ -18,17 +18,19 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
-from concurrent.futures import Future
+from concurrent.futures import CancelledError, Future
 
-from gi.repository import GLib, GObject
+from gi.repository import GObject
 
 from proton.vpn import logging
 
 from proton.vpn.app.gtk import Gtk
 from proton.vpn.app.gtk.controller import Controller
+from proton.vpn.app.gtk.utils.executor import TaskScope
 from proton.vpn.app.gtk.widgets.login.logo import ProtonVPNLogo
 from proton.vpn.app.gtk.widgets.main.notifications import Notifications
 from proton.vpn.app.gtk.widgets.main.loading_widget import OverlayWidget, DefaultLoadingWidget
+from proton.vpn.app.gtk.utils.glib import run_on_main_thread
 
 logger = logging.getLogger(__name__)
 
@@ -65,6 +67,9 @@ class TwoFactorAuthForm(Gtk.Box):  # pylint: disable=too-many-instance-attribute
         self._controller = controller
         self._notifications = notifications
         self._overlay_widget = overlay_widget
+        # Pending 2FA code submissions are cancelled when the form is unrealized.
+        self._task_scope = TaskScope(controller.executor)
+        self.connect("unrealize", lambda *_: self._task_scope.cancel())
 
         # pylint: disable=R0801
         self.pack_start(ProtonVPNLogo(), expand=False, fill=True, padding=0)
@@ -129,16 +134,22 @@ class TwoFactorAuthForm(Gtk.Box):  # pylint: disable=too-many-instance-attribute
         self._overlay_widget.show(
             DefaultLoadingWidget(self.LOGGING_IN_MESSAGE)
         )
-        future = self._controller.submit_2fa_code(
-            self.two_factor_auth_code
+        future = self._task_scope.track(
+            self._controller.submit_2fa_code(self.two_factor_auth_code)
         )
         future.add_done_callback(
-            lambda future: GLib.idle_add(self._on_2fa_submission_result, future)
+            lambda future: run_on_main_thread(self._on_2fa_submission_result, future)
         )
 
     def _on_2fa_submission_result(self, future: Future):
         try:
             result = future.result()
+        except CancelledError:
+            logger.info(
+                "2FA code submission cancelled.", category="APP",
+                subcategory="LOGIN-2FA", event="RESULT"
+            )
+            return
         finally:
             self._overlay_widget.hide()
 
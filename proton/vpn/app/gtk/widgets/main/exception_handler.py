@@ -21,12 +21,14 @@ along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
 import sys
 import threading
+from concurrent.futures import CancelledError
 
 from proton.vpn.connection.exceptions import AuthenticationError
 from proton.session.exceptions import ProtonAPINotReachable, ProtonAPIError, \
     ProtonAPIAuthenticationNeeded
 from proton.vpn.session.exceptions import ServerNotFoundError
 from proton.vpn import logging
+from proton.vpn.app.gtk.utils import async_logging
 
 logger = logging.getLogger(__name__)
 
@@ -110,6 +112,11 @@ class ExceptionHandler:
             self._main_widget.session_expired()
             return
 
+        if issubclass(exc_type, CancelledError):
+            # Tasks are cancelled on purpose (e.g. when the user leaves a flow).
+            logger.debug("Task cancelled.", category="APP", event="CANCELLED")
+            return
+
         if issubclass(exc_type, ProtonAPINotReachable):
             self._on_proton_api_not_reachable(exc_type, exc_value, exc_traceback)
         elif isinstance(exc_value, ProtonAPIError) and exc_value.error:
@@ -177,6 +184,8 @@ class ExceptionHandler:
             category="APP", event="CRASH",
             exc_info=(exc_type, exc_value, exc_traceback)
         )
+        # The crash is written to the log file right away, in case the app doesn't recover.
+        async_logging.flush()
 
         if self._controller:
             self._controller.send_error_to_proton(
@@ -31,10 +31,14 @@ from proton.vpn.app.gtk.widgets.vpn import VPNWidget
 from proton.vpn.app.gtk.widgets.main.loading_widget import OverlayWidget, DefaultLoadingWidget
 from proton.vpn.app.gtk.widgets.main.notifications import Notifications
 from proton.vpn.app.gtk.util import connect_once
+from proton.vpn.app.gtk.utils.startup_profiler import startup_profiler
+from proton.vpn import logging
 
 if TYPE_CHECKING:
     from proton.vpn.app.gtk.app import MainWindow
 
+logger = logging.getLogger(__name__)
+
 
 # pylint: disable=too-many-instance-attributes
 class MainWidget(Gtk.Overlay):
@@ -103,15 +107,37 @@ class MainWidget(Gtk.Overlay):
         Initializes the widget by showing either the vpn widget or the
         login widget depending on whether the user is authenticated or not.
         """
-        if self._controller.user_logged_in:
-            connect_once(
-                self.vpn_widget,
-                "vpn-widget-ready",
-                self._controller.run_startup_actions
+        user_logged_in = self._controller.user_logged_in
+        with startup_profiler.phase("MainWidget.initialize_visible_widget"):
+            if user_logged_in:
+                connect_once(
+                    self.vpn_widget,
+                    "vpn-widget-ready",
+                    self._controller.run_startup_actions
+                )
+                if startup_profiler.is_enabled:
+                    connect_once(
+                        self.vpn_widget,
+                        "vpn-widget-ready",
+                        self._finish_startup_profiling,
+                        "vpn-widget-ready"
+                    )
+                self._display_vpn_widget()
+            else:
+                self._display_login_widget()
+
+        if not user_logged_in:
+            self._finish_startup_profiling(self.login_widget, "login-widget-ready")
+
+    @staticmethod
+    def _finish_startup_profiling(_widget: Gtk.Widget, milestone: str):
+        startup_profiler.mark(milestone)
+        trace_file_path = startup_profiler.finish()
+        if trace_file_path:
+            logger.info(
+                f"Startup trace written to {trace_file_path}",
+                category="app", event="startup_profiled"
             )
-            self._display_vpn_widget()
-        else:
-            self._display_login_widget()
 
     def show_error_message(
         self, error_message: str, blocking: bool = False,
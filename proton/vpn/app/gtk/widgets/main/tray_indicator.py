@@ -20,7 +20,6 @@ You should have received a copy of the GNU General Public License
 along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
 import gi
-from gi.repository import GLib
 
 
 from proton.vpn import logging
@@ -29,6 +28,7 @@ from proton.vpn.connection import states
 from proton.vpn.app.gtk.assets.icons import ICONS_PATH
 from proton.vpn.app.gtk.controller import Controller
 from proton.vpn.app.gtk.widgets.main.main_window import MainWindow
+from proton.vpn.app.gtk.utils.glib import run_on_main_thread
 
 logger = logging.getLogger(__name__)
 
@@ -124,6 +124,9 @@ class TrayIndicator:
         self._main_window.header_bar.menu.connect(
             "user-logged-out", self._on_user_logged_out
         )
+        self._controller.app_config_store.connect(
+            "changed", self._on_app_config_changed
+        )
 
         self.status_update(self._controller.current_connection_status)
         self._controller.register_connection_status_subscriber(self)
@@ -137,7 +140,9 @@ class TrayIndicator:
 
         update_ui_method = f"_on_connection_{type(connection_status).__name__.lower()}"
         if hasattr(self, update_ui_method):
-            GLib.idle_add(getattr(self, update_ui_method))
+            run_on_main_thread(
+                getattr(self, update_ui_method), key=(self, "connection-status")
+            )
 
     @property
     def display_connect_entry(self) -> bool:
@@ -211,7 +216,7 @@ class TrayIndicator:
 
             self._set_visibility_for_pinned_servers(True)
 
-        GLib.idle_add(_reload_pinned_servers)
+        run_on_main_thread(_reload_pinned_servers)
 
     def _build_menu(self) -> Gtk.Menu:
         menu = Gtk.Menu()
@@ -275,7 +280,8 @@ class TrayIndicator:
     ):
         logger.info(f"Connect to {servername}", category="ui.tray", event="connect")
         future = self._controller.connect_from_tray(servername)
-        future.add_done_callback(lambda f: GLib.idle_add(f.result))  # bubble up exceptions if any.
+        # Bubble up exceptions if any.
+        future.add_done_callback(lambda f: run_on_main_thread(f.result))
 
     def _on_toggle_app_visibility_menu_entry_clicked(self, *_):
         if self._main_window.get_visible():
@@ -290,18 +296,24 @@ class TrayIndicator:
     def _on_connect_entry_clicked(self, _):
         logger.info("Connect to fastest server", category="ui.tray", event="connect")
         future = self._controller.connect_to_fastest_server()
-        future.add_done_callback(lambda f: GLib.idle_add(f.result))  # bubble up exceptions if any.
+        # Bubble up exceptions if any.
+        future.add_done_callback(lambda f: run_on_main_thread(f.result))
 
     def _on_disconnect_entry_clicked(self, _):
         logger.info("Disconnect from VPN", category="ui.tray", event="disconnect")
         future = self._controller.disconnect()
-        future.add_done_callback(lambda f: GLib.idle_add(f.result))  # bubble up exceptions if any.
+        # Bubble up exceptions if any.
+        future.add_done_callback(lambda f: run_on_main_thread(f.result))
 
     def _on_user_logged_in(self, *_):
         self.display_disconnect_entry = False
         self.display_connect_entry = True
         self.reload_pinned_servers()
 
+    def _on_app_config_changed(self, *_):
+        if self._controller.user_logged_in:
+            self.reload_pinned_servers()
+
     def _on_user_logged_out(self, *_):
         self.display_disconnect_entry = False
         self.display_connect_entry = False
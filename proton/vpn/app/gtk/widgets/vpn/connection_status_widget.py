@@ -19,11 +19,11 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
-from gi.repository import GLib
 from proton.vpn.app.gtk import Gtk
 from proton.vpn.connection import events, states
 from proton.vpn.app.gtk.controller import Controller
 from proton.vpn.app.gtk.widgets.main.loading_widget import OverlayWidget, LoadingConnectionWidget
+from proton.vpn.app.gtk.utils.glib import run_on_main_thread
 from proton.vpn import logging
 
 logger = logging.getLogger(__name__)
@@ -56,7 +56,7 @@ class VPNConnectionStatusWidget(Gtk.Box):
     def _on_cancel_button_clicked(self, _):
         logger.info("Disconnect from VPN", category="ui", event="disconnect")
         future = self._controller.disconnect()
-        future.add_done_callback(lambda f: GLib.idle_add(f.result))
+        future.add_done_callback(lambda f: run_on_main_thread(f.result))
 
     @property
     def status_message(self) -> str:
@@ -19,11 +19,11 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
-from gi.repository import GLib
 from proton.vpn.connection.states import State
 
 from proton.vpn.app.gtk import Gtk
 from proton.vpn.app.gtk.controller import Controller
+from proton.vpn.app.gtk.utils.glib import run_on_main_thread
 from proton.vpn import logging
 
 logger = logging.getLogger(__name__)
@@ -95,9 +95,11 @@ class QuickConnectWidget(Gtk.Box):
     def _on_connect_button_clicked(self, _):
         logger.info("Connect to fastest server", category="ui.tray", event="connect")
         future = self._controller.connect_to_fastest_server()
-        future.add_done_callback(lambda f: GLib.idle_add(f.result))  # bubble up exceptions if any.
+        # Bubble up exceptions if any.
+        future.add_done_callback(lambda f: run_on_main_thread(f.result))
 
     def _on_disconnect_button_clicked(self, _):
         logger.info("Disconnect from VPN", category="ui", event="disconnect")
         future = self._controller.disconnect()
-        future.add_done_callback(lambda f: GLib.idle_add(f.result))  # bubble up exceptions if any.
+        # Bubble up exceptions if any.
+        future.add_done_callback(lambda f: run_on_main_thread(f.result))
@@ -23,7 +23,7 @@ along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 from __future__ import annotations
 
 from typing import List, Tuple, Set
-from gi.repository import Atk, GLib, GObject
+from gi.repository import Atk, GObject
 
 from proton.vpn.app.gtk.utils import accessibility
 from proton.vpn.app.gtk.utils.search import normalize
@@ -35,6 +35,7 @@ from proton.vpn.app.gtk.controller import Controller
 from proton.vpn.app.gtk.widgets.vpn.serverlist.icons import \
     SmartRoutingIcon, P2PIcon, TORIcon, UnderMaintenanceIcon
 from proton.vpn.app.gtk.widgets.vpn.serverlist.server import ServerRow
+from proton.vpn.app.gtk.utils.glib import run_on_main_thread
 from proton.vpn.session.servers import LogicalServer
 from proton.vpn.session.servers import ServerFeatureEnum
 
@@ -246,7 +247,8 @@ class CountryHeader(Gtk.Box):  # pylint: disable=too-many-instance-attributes
 
     def _on_connect_button_clicked(self, _connect_button: Gtk.Button):
         future = self._controller.connect_to_country(self.country_code)
-        future.add_done_callback(lambda f: GLib.idle_add(f.result))  # bubble up exceptions if any.
+        # Bubble up exceptions if any.
+        future.add_done_callback(lambda f: run_on_main_thread(f.result))
 
     def _on_connection_state_disconnected(self):
         """Flags this server as "not connected"."""
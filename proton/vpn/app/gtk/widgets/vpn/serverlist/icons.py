@@ -27,8 +27,7 @@ class UnderMaintenanceIcon(Gtk.Image):
     """Icon displayed when a server/country is under maintenance."""
     def __init__(self, widget_under_maintenance: str):
         super().__init__()
-        pixbuf = icons.get(Path("maintenance-icon.svg"))
-        self.set_from_pixbuf(pixbuf)
+        icons.set_on_image(self, Path("maintenance-icon.svg"))
         self.set_tooltip_text(
             f"{widget_under_maintenance} is under maintenance"
         )
@@ -38,7 +37,7 @@ class SmartRoutingIcon(Gtk.Image):
     """Icon displayed when smart routing is used."""
     def __init__(self):
         super().__init__()
-        self.set_from_pixbuf(icons.get(Path("servers/smart-routing.svg")))
+        icons.set_on_image(self, Path("servers/smart-routing.svg"))
         help_text = "Smart routing is used"
         self.set_tooltip_text(help_text)
         self.get_accessible().set_name(help_text)
@@ -48,7 +47,7 @@ class StreamingIcon(Gtk.Image):
     """Icon displayed when a server supports streaming."""
     def __init__(self):
         super().__init__()
-        self.set_from_pixbuf(icons.get(Path("servers/streaming.svg")))
+        icons.set_on_image(self, Path("servers/streaming.svg"))
         help_text = "Streaming supported"
         self.set_tooltip_text(help_text)
         self.get_accessible().set_name(help_text)
@@ -58,7 +57,7 @@ class P2PIcon(Gtk.Image):
     """Icon displayed when a server supports P2P."""
     def __init__(self):
         super().__init__()
-        self.set_from_pixbuf(icons.get(Path("servers/p2p.svg")))
+        icons.set_on_image(self, Path("servers/p2p.svg"))
         help_text = "P2P/BitTorrent supported"
         self.set_tooltip_text(help_text)
         self.get_accessible().set_name(help_text)
@@ -68,7 +67,7 @@ class TORIcon(Gtk.Image):
     """Icon displayed when a server supports TOR."""
     def __init__(self):
         super().__init__()
-        self.set_from_pixbuf(icons.get(Path("servers/tor.svg")))
+        icons.set_on_image(self, Path("servers/tor.svg"))
         help_text = "TOR supported"
         self.set_tooltip_text(help_text)
         self.get_accessible().set_name(help_text)
@@ -83,7 +82,7 @@ class SecureCoreIcon(Gtk.Image):
     """
     def __init__(self, entry_country_name: str, exit_country_name: str):
         super().__init__()
-        self.set_from_pixbuf(icons.get(Path("servers/secure-core.svg")))
+        icons.set_on_image(self, Path("servers/secure-core.svg"))
         help_text = "Secure core server that "\
             f"connects to {exit_country_name} through {entry_country_name}."
         self.set_tooltip_text(help_text)
@@ -22,7 +22,7 @@ along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 from __future__ import annotations
 from typing import List, Optional
 
-from gi.repository import GLib, Pango, Atk
+from gi.repository import Pango, Atk
 
 from proton.vpn.app.gtk.utils import accessibility
 from proton.vpn.app.gtk.utils.search import normalize
@@ -35,6 +35,7 @@ from proton.vpn.app.gtk import Gtk
 from proton.vpn import logging
 
 from proton.vpn.app.gtk.controller import Controller
+from proton.vpn.app.gtk.utils.glib import run_on_main_thread
 
 logger = logging.getLogger(__name__)
 
@@ -214,7 +215,8 @@ class ServerRow(Gtk.Box):
 
     def _on_connect_button_clicked(self, _):
         future = self._controller.connect_to_server(self._server.name)
-        future.add_done_callback(lambda f: GLib.idle_add(f.result))  # bubble up exceptions if any.
+        # Bubble up exceptions if any.
+        future.add_done_callback(lambda f: run_on_main_thread(f.result))
 
     @property
     def available(self) -> bool:
@@ -30,6 +30,7 @@ from proton.vpn.app.gtk import Gtk
 from proton.vpn.app.gtk.controller import Controller
 from proton.vpn.app.gtk.services import VPNDataRefresher
 from proton.vpn.app.gtk.widgets.vpn.serverlist.country import CountryRow
+from proton.vpn.app.gtk.utils.glib import run_on_main_thread, run_once
 from proton.vpn.session.servers import Country, LogicalServer, ServerList
 from proton.vpn import logging
 
@@ -108,7 +109,7 @@ class ServerListWidget(Gtk.ScrolledWindow):
         This method is called by VPNWidget whenever the VPN connection status changes.
         Important: as this method is always called from another thread, we need
         to make sure that any resulting actions are passed to the main thread
-        running GLib's main loop with GLib.idle_add.
+        running GLib's main loop with run_on_main_thread.
         """
         connection = connection_status.context.connection
         if connection:
@@ -116,7 +117,9 @@ class ServerListWidget(Gtk.ScrolledWindow):
                 country_row = self._get_country_row(connection.server_id)
                 country_row.connection_status_update(connection_status)
 
-            GLib.idle_add(update_server_rows)
+            # Only updates of the same server row are coalesced, so that the row of
+            # the previous server is updated too when switching servers.
+            run_on_main_thread(update_server_rows, key=(self, connection.server_id))
 
     def _remove_country_rows(self):
         """Remove UI country rows."""
@@ -138,6 +141,7 @@ class ServerListWidget(Gtk.ScrolledWindow):
     ):
         for country_row in self._state.country_rows.values():
             country_row.update_server_loads()
+        self._notify_ui_updated_after_redraw()
 
     def display(self, user_tier: int, server_list: int):
         """Update UI with the new server list."""
@@ -162,6 +166,15 @@ class ServerListWidget(Gtk.ScrolledWindow):
         self._add_country_rows()
         self._container.show_all()
         self.emit("ui-updated")
+        self._notify_ui_updated_after_redraw()
+
+    def _notify_ui_updated_after_redraw(self):
+        # Idle callbacks run after GTK has redrawn the updated rows, since
+        # redrawing has a higher priority.
+        run_once(
+            self._controller.vpn_data_refresher.metrics.notify_ui_updated,
+            priority=GLib.PRIORITY_DEFAULT_IDLE
+        )
 
     def unload(self):
         """Things to do before the widget is being removed from the window."""
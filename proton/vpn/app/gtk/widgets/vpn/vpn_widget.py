@@ -24,7 +24,7 @@ from dataclasses import dataclass
 from typing import TYPE_CHECKING
 import time
 
-from gi.repository import GObject, GLib
+from gi.repository import GObject
 
 from proton.vpn import logging
 
@@ -36,6 +36,7 @@ from proton.vpn.app.gtk.widgets.vpn.serverlist.serverlist import ServerListWidge
 from proton.vpn.app.gtk.widgets.vpn.search_entry import SearchEntry
 from proton.vpn.app.gtk.widgets.vpn.connection_status_widget import VPNConnectionStatusWidget
 from proton.vpn.app.gtk.widgets.main.loading_widget import OverlayWidget
+from proton.vpn.app.gtk.utils.glib import run_on_main_thread
 from proton.vpn.session.client_config import ClientConfig
 from proton.vpn.session.servers import ServerList
 
@@ -131,7 +132,12 @@ class VPNWidget(Gtk.Box):
             for widget in self.connection_status_subscribers:
                 widget.connection_status_update(connection_state)
 
-        GLib.idle_add(update_widget)
+        # Updates are coalesced per server, so that subscribers showing
+        # server rows also get the last update of the previous server when
+        # switching servers.
+        connection = connection_state.context.connection
+        server_id = connection.server_id if connection else None
+        run_on_main_thread(update_widget, key=(self, server_id))
 
     def _on_vpn_data_ready(
             self,
@@ -165,7 +171,7 @@ class VPNWidget(Gtk.Box):
         # The VPN widget subscribes to connection status updates, and then
         # passes on these connection status updates to child widgets
         self._controller.register_connection_status_subscriber(self)
-        self._controller.reconnector.enable()
+        self._controller.enable_reconnector()
 
         self.server_list_widget.display(user_tier=user_tier, server_list=server_list)
 
@@ -189,7 +195,7 @@ class VPNWidget(Gtk.Box):
         )
 
         self._controller.unregister_connection_status_subscriber(self)
-        self._controller.reconnector.disable()
+        self._controller.disable_reconnector()
         self._controller.vpn_data_refresher.disable()
 
         for widget in [
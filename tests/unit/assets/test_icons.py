@@ -0,0 +1,87 @@
+"""
+Copyright (c) 2023 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+from proton.vpn.app.gtk.assets.icons import icons
+
+
+@pytest.fixture(autouse=True)
+def clear_icons_cache():
+    icons._cache.clear()
+    yield
+    icons._cache.clear()
+
+
+def test_get_renders_icon_at_the_specified_scale():
+    pixbuf = icons.get(Path("servers/p2p.svg"))
+    scaled_pixbuf = icons.get(Path("servers/p2p.svg"), scale=2)
+
+    assert scaled_pixbuf is not pixbuf
+    assert scaled_pixbuf.get_width() == 2 * pixbuf.get_width()
+    assert scaled_pixbuf.get_height() == 2 * pixbuf.get_height()
+
+
+def test_warm_up_caches_icons():
+    icons.warm_up([Path("servers/p2p.svg")], scale=2)
+
+    with patch.object(icons.GdkPixbuf.Pixbuf, "new_from_file_at_scale") as render_mock:
+        icons.get(Path("servers/p2p.svg"), scale=2)
+
+    render_mock.assert_not_called()
+
+
+def test_get_loads_icon_from_disk_cache_instead_of_rendering_it_again(tmp_path):
+    pixbuf = icons.get(Path("servers/p2p.svg"), disk_cache_dir=tmp_path)
+    icons._cache.clear()
+
+    with patch.object(icons.GdkPixbuf.Pixbuf, "new_from_file_at_scale") as render_mock:
+        cached_pixbuf = icons.get(Path("servers/p2p.svg"), disk_cache_dir=tmp_path)
+
+    render_mock.assert_not_called()
+    assert len(list(tmp_path.glob("p2p-*.png"))) == 1
+    assert cached_pixbuf.get_width() == pixbuf.get_width()
+
+
+def test_get_does_not_parse_the_icon_file_when_a_scaled_icon_is_in_the_disk_cache(tmp_path):
+    icons.get(Path("servers/p2p.svg"), scale=2, disk_cache_dir=tmp_path)
+    icons._cache.clear()
+
+    with patch.object(icons.GdkPixbuf.Pixbuf, "get_file_info") as get_file_info_mock, \
+            patch.object(icons.GdkPixbuf.Pixbuf, "new_from_file_at_scale") as render_mock:
+        icons.get(Path("servers/p2p.svg"), scale=2, disk_cache_dir=tmp_path)
+
+    get_file_info_mock.assert_not_called()
+    render_mock.assert_not_called()
+
+
+def test_set_on_image_loads_icon_from_disk_cache_instead_of_rendering_it_again(tmp_path):
+    icons.warm_up([Path("servers/p2p.svg")], scale=2, disk_cache_dir=tmp_path)
+    icons._cache.clear()
+    image = Mock()
+    image.get_scale_factor.return_value = 2
+
+    with patch.object(icons.GdkPixbuf.Pixbuf, "new_from_file_at_scale") as render_mock, \
+            patch.object(icons.Gdk, "cairo_surface_create_from_pixbuf"):
+        icons.set_on_image(image, Path("servers/p2p.svg"), disk_cache_dir=tmp_path)
+
+    render_mock.assert_not_called()
+    image.set_from_surface.assert_called_once()
@@ -0,0 +1,106 @@
+"""
+Copyright (c) 2023 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import json
+from concurrent.futures import Future
+from unittest.mock import Mock
+
+from proton.vpn.app.gtk.services.refresher.metrics import RefresherMetrics
+
+
+def test_track_api_call_records_api_call_duration_and_payload_size():
+    metrics = RefresherMetrics()
+    sample = metrics.start_sample("new-server-list")
+    future = Future()
+    metrics.track_api_call(sample, future, measure_payload_size=True)
+
+    future.set_result(Mock(to_dict=Mock(return_value={"LogicalServers": []})))
+
+    assert sample.api_call_duration >= 0
+    assert sample.payload_size == len(json.dumps({"LogicalServers": []}))
+    assert sample.error is None
+
+
+def test_track_api_call_records_api_call_error():
+    metrics = RefresherMetrics()
+    sample = metrics.start_sample("new-server-list")
+    future = Future()
+    metrics.track_api_call(sample, future)
+
+    future.set_exception(RuntimeError("API not reachable"))
+
+    assert "API not reachable" in sample.error
+    assert sample.payload_size is None
+
+
+def test_notify_ui_updated_records_time_to_ui_updated_for_the_last_signal_emitted():
+    metrics = RefresherMetrics()
+    sample = metrics.start_sample("new-server-list")
+    future = Future()
+    metrics.track_api_call(sample, future)
+    future.set_result(Mock())
+
+    with metrics.measure_signal_emit(sample):
+        metrics.notify_ui_updated()
+
+    assert sample.signal_emit_duration >= 0
+    assert sample.time_to_ui_updated >= 0
+
+
+def test_notify_ui_updated_records_time_to_ui_updated_for_all_signals_emitted_since_last_update():
+    metrics = RefresherMetrics()
+    samples = []
+    for name in ("new-server-list", "new-server-loads"):
+        sample = metrics.start_sample(name)
+        future = Future()
+        metrics.track_api_call(sample, future)
+        future.set_result(Mock())
+        with metrics.measure_signal_emit(sample):
+            pass
+        samples.append(sample)
+
+    metrics.notify_ui_updated()
+
+    assert all(sample.time_to_ui_updated >= 0 for sample in samples)
+
+
+def test_samples_are_kept_in_a_rolling_window():
+    metrics = RefresherMetrics(max_samples=2)
+
+    for name in ("new-server-list", "new-server-loads", "new-client-config"):
+        metrics.start_sample(name)
+
+    assert [sample.name for sample in metrics.samples] == [
+        "new-server-loads", "new-client-config"
+    ]
+
+
+def test_dump_writes_samples_and_summary_to_json_file(tmp_path):
+    metrics = RefresherMetrics()
+    sample = metrics.start_sample("new-server-loads")
+    sample.api_call_duration = 0.5
+
+    file_path = tmp_path / "refresher-metrics.json"
+    metrics.dump(str(file_path))
+
+    with open(file_path, encoding="utf-8") as file:
+        dumped_metrics = json.load(file)
+
+    assert dumped_metrics["samples"][0]["name"] == "new-server-loads"
+    assert dumped_metrics["summary"]["new-server-loads"]["count"] == 1
+    assert dumped_metrics["summary"]["new-server-loads"]["api_call_duration"]["max"] == 0.5
@@ -16,6 +16,7 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
+from concurrent.futures import Future
 from threading import Event
 from unittest.mock import Mock, patch
 
@@ -134,3 +135,123 @@ def test_refresh_schedules_next_refresh_if_server_list_is_not_expired(
         refresher._refresh,
         delay_seconds=api_mock.server_list.seconds_until_expiration
     )
+
+
+@patch("proton.vpn.app.gtk.services.refresher.server_list_refresher.run_after_seconds")
+def test_update_server_loads_does_not_schedule_next_refresh_if_refresher_is_disabled(
+        run_delayed_patch: Mock
+):
+    api_mock = Mock()
+    updated_server_list = Mock()
+    api_mock.update_server_loads.return_value = updated_server_list
+
+    refresher = ServerListRefresher(
+        executor=DummyThreadPoolExecutor(),
+        proton_vpn_api=api_mock
+    )
+    new_server_loads_event = Event()
+    refresher.connect("new-server-loads", lambda *_: new_server_loads_event.set())
+
+    future = refresher.update_server_loads()
+
+    assert future.result() is updated_server_list
+
+    process_gtk_events()
+
+    assert new_server_loads_event.wait(timeout=0)
+    run_delayed_patch.assert_not_called()
+
+
+@patch("proton.vpn.app.gtk.services.refresher.server_list_refresher.run_after_seconds")
+def test_disable_cancels_in_flight_server_list_refresh(run_delayed_patch: Mock):
+    api_mock = Mock()
+    api_mock.server_list.expired = True
+
+    executor_mock = Mock()
+    in_flight_future = Future()
+    executor_mock.submit_with_options.return_value = in_flight_future
+
+    refresher = ServerListRefresher(
+        executor=executor_mock,
+        proton_vpn_api=api_mock
+    )
+
+    refresher._refresh()
+    refresher.disable()
+
+    process_gtk_events()
+
+    assert in_flight_future.cancelled()
+    # The next refresh should not be scheduled after the refresher was disabled.
+    run_delayed_patch.assert_not_called()
+
+
+@patch("proton.vpn.app.gtk.services.refresher.server_list_refresher.GLib")
+@patch("proton.vpn.app.gtk.services.refresher.server_list_refresher.run_after_seconds")
+def test_refresh_if_expired_refreshes_expired_server_loads_straight_away(
+        run_delayed_patch: Mock, glib_mock: Mock
+):
+    api_mock = Mock()
+    api_mock.server_list.expired = False
+    api_mock.server_list.loads_expired = False
+    api_mock.server_list.seconds_until_expiration = 60
+    refresher = ServerListRefresher(
+        executor=DummyThreadPoolExecutor(),
+        proton_vpn_api=api_mock
+    )
+    refresher.enable()
+
+    # The server loads expired while the system was suspended.
+    api_mock.server_list.loads_expired = True
+    refresher.refresh_if_expired()
+
+    glib_mock.source_remove.assert_called_once_with(run_delayed_patch.return_value)
+    api_mock.update_server_loads.assert_called_once()
+
+
+@patch("proton.vpn.app.gtk.services.refresher.server_list_refresher.GLib")
+@patch("proton.vpn.app.gtk.services.refresher.server_list_refresher.run_after_seconds")
+def test_refresh_if_expired_does_not_remove_the_source_of_a_refresh_that_already_ran(
+        run_delayed_patch: Mock, glib_mock: Mock
+):
+    api_mock = Mock()
+    api_mock.server_list.expired = False
+    api_mock.server_list.loads_expired = False
+    api_mock.server_list.seconds_until_expiration = 60
+    executor_mock = Mock()
+    in_flight_future = Future()
+    executor_mock.submit_with_options.return_value = in_flight_future
+    refresher = ServerListRefresher(
+        executor=executor_mock,
+        proton_vpn_api=api_mock
+    )
+    refresher.enable()
+
+    # The scheduled refresh runs and the server loads update is still in progress.
+    api_mock.server_list.loads_expired = True
+    refresher._refresh()
+    refresher.refresh_if_expired()
+
+    assert refresher.enabled
+    glib_mock.source_remove.assert_not_called()
+    api_mock.update_server_loads.assert_not_called()
+    executor_mock.submit_with_options.assert_called_once()
+
+
+@patch("proton.vpn.app.gtk.services.refresher.server_list_refresher.run_after_seconds")
+def test_update_server_loads_returns_the_update_in_progress(run_delayed_patch: Mock):
+    api_mock = Mock()
+    api_mock.server_list.loads_expired = True
+    api_mock.server_list.expired = False
+    executor_mock = Mock()
+    in_flight_future = Future()
+    executor_mock.submit_with_options.return_value = in_flight_future
+    refresher = ServerListRefresher(
+        executor=executor_mock,
+        proton_vpn_api=api_mock
+    )
+
+    refresher._refresh()
+
+    assert refresher.update_server_loads() is in_flight_future
+    executor_mock.submit_with_options.assert_called_once()
@@ -0,0 +1,113 @@
+"""
+Copyright (c) 2023 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import socket
+from unittest.mock import Mock
+
+import pytest
+
+from proton.vpn.app.gtk.services.reconnector import netlink
+
+
+def build_message(message_type: int, payload: bytes = b"") -> bytes:
+    length = netlink.NLMSG_HEADER.size + len(payload)
+    padding = b"\0" * (((length + 3) & ~3) - length)
+    return netlink.NLMSG_HEADER.pack(length, message_type, 0, 0, 0) + payload + padding
+
+
+@pytest.fixture
+def socket_pair():
+    sender, receiver = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+    receiver.setblocking(False)
+    yield sender, receiver
+    sender.close()
+    receiver.close()
+
+
+def test_iter_messages_splits_datagram_into_aligned_messages():
+    data = build_message(netlink.RTM_NEWLINK, b"abcde") + build_message(netlink.RTM_DELROUTE)
+
+    assert list(netlink.iter_messages(data)) == [
+        (netlink.RTM_NEWLINK, b"abcde"), (netlink.RTM_DELROUTE, b"")
+    ]
+
+
+def test_drain_network_changes_returns_true_when_a_network_change_was_notified(socket_pair):
+    sender, receiver = socket_pair
+    sender.send(build_message(netlink.NLMSG_NOOP))
+    sender.send(build_message(netlink.RTM_NEWROUTE))
+
+    assert netlink.drain_network_changes(receiver)
+    # All pending messages were read.
+    assert not netlink.drain_network_changes(receiver)
+
+
+def test_drain_network_changes_returns_false_when_no_network_change_was_notified(socket_pair):
+    sender, receiver = socket_pair
+    sender.send(build_message(netlink.NLMSG_NOOP))
+
+    assert not netlink.drain_network_changes(receiver)
+
+
+# Kernel reply to an RTM_GETROUTE request for 192.0.2.1 (sequence number 7)
+# recorded on a machine with a default route.
+ROUTE_FOUND_REPLY = bytes.fromhex(
+    "6800000018000000070000005a2b000002200000fe0000010002000008000f00fe00000008000100"
+    "c0000201080004000400000008000700c0000202080019000000000024000c00020000003e7f0200"
+    "000000000000000000000000000000000000000000000000"
+)
+# Kernel reply to an RTM_GETROUTE request for 192.0.2.1 (sequence number 9)
+# recorded without any network interface up: the error is -ENETUNREACH.
+NETWORK_UNREACHABLE_REPLY = bytes.fromhex(
+    "380000000200000009000000972b00009bffffff240000001a000100090000000000000002200000"
+    "000000000000000008000100c0000201"
+)
+
+
+def test_build_get_route_request():
+    assert netlink.build_get_route_request("192.0.2.1", seq=9).hex() == (
+        "240000001a000100090000000000000002200000000000000000000008000100c0000201"
+    )
+
+
+@pytest.mark.parametrize("reply, seq, expected_result", [
+    (ROUTE_FOUND_REPLY, 7, True),
+    (NETWORK_UNREACHABLE_REPLY, 9, False),
+])
+def test_parse_get_route_reply(reply, seq, expected_result):
+    assert netlink.parse_get_route_reply(reply, seq) is expected_result
+
+
+def test_parse_get_route_reply_raises_value_error_when_reply_is_for_another_request():
+    with pytest.raises(ValueError):
+        netlink.parse_get_route_reply(ROUTE_FOUND_REPLY, seq=8)
+
+
+def test_has_route_to_sends_request_and_parses_reply():
+    sock = Mock()
+    sock.__enter__ = Mock(return_value=sock)
+    sock.__exit__ = Mock(return_value=False)
+
+    def reply(request, _address):
+        _length, _type, _flags, seq, _pid = netlink.NLMSG_HEADER.unpack_from(request)
+        sock.recv.return_value = (
+            ROUTE_FOUND_REPLY[:8] + seq.to_bytes(4, "little") + ROUTE_FOUND_REPLY[12:]
+        )
+    sock.sendto.side_effect = reply
+
+    assert netlink.has_route_to("192.0.2.1", socket_factory=lambda: sock)
@@ -16,15 +16,25 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
+import socket
+from concurrent.futures import Future
 from unittest.mock import Mock, patch
+
+import pytest
 from gi.repository import GLib
 
-from proton.vpn.app.gtk.services.reconnector.network_monitor import NetworkMonitor
+from proton.vpn.app.gtk.services.reconnector import netlink
+from proton.vpn.app.gtk.services.reconnector.network_monitor import (
+    NetlinkNetworkMonitor, NetworkMonitor, check_for_network_connectivity,
+    check_for_tunnel_liveness
+)
 from tests.unit.testing_utils import run_main_loop, DummyThreadPoolExecutor, process_gtk_events
 
 
 def test_enable_runs_check_network_state_async_periodically():
-    monitor = NetworkMonitor(DummyThreadPoolExecutor(), polling_interval_ms=10)
+    monitor = NetworkMonitor(
+        DummyThreadPoolExecutor(), min_polling_interval_ms=10, max_polling_interval_ms=10
+    )
 
     main_loop = GLib.MainLoop()
 
@@ -46,7 +56,9 @@ def test_enable_runs_check_network_state_async_periodically():
 def test_check_network_state_async_calls_network_up_callback_when_network_connectivity_is_detected(
         check_for_network_connectivity_mock
 ):
-    monitor = NetworkMonitor(DummyThreadPoolExecutor(), polling_interval_ms=10)
+    monitor = NetworkMonitor(
+        DummyThreadPoolExecutor(), min_polling_interval_ms=10, max_polling_interval_ms=10
+    )
     monitor.network_up_callback = Mock()
 
     for connectivity_check_result, network_up_callback_should_be_called in [
@@ -66,7 +78,9 @@ def test_check_network_state_async_calls_network_up_callback_when_network_connec
 
 
 def test_disable_stops_running_network_state_async_periodically():
-    monitor = NetworkMonitor(DummyThreadPoolExecutor(), polling_interval_ms=10)
+    monitor = NetworkMonitor(
+        DummyThreadPoolExecutor(), min_polling_interval_ms=10, max_polling_interval_ms=10
+    )
 
     main_loop = GLib.MainLoop()
 
@@ -85,3 +99,190 @@ def test_disable_stops_running_network_state_async_periodically():
     assert not monitor.is_enabled
     # Since the monitor was disabled after the second network check, only 2 network checks should have been done.
     assert patched_check_network_state.call_count == 2
+
+
+@patch("proton.vpn.app.gtk.services.reconnector.network_monitor.netlink.open_route_monitor_socket")
+def test_netlink_monitor_checks_network_state_when_a_network_change_is_notified(
+        open_route_monitor_socket_mock
+):
+    sender, receiver = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+    receiver.setblocking(False)
+    open_route_monitor_socket_mock.return_value = receiver
+    monitor = NetlinkNetworkMonitor(DummyThreadPoolExecutor(), change_coalescing_delay_ms=10)
+    main_loop = GLib.MainLoop()
+
+    with patch.object(monitor, "check_network_state_async") as patched_check_network_state:
+        def notify_network_change_after_first_check():
+            if patched_check_network_state.call_count == 1:
+                # Bursts of notifications result in a single check.
+                sender.send(netlink.NLMSG_HEADER.pack(16, netlink.RTM_DELROUTE, 0, 0, 0))
+                sender.send(netlink.NLMSG_HEADER.pack(16, netlink.RTM_NEWROUTE, 0, 0, 0))
+                GLib.timeout_add(interval=100, function=main_loop.quit)
+        patched_check_network_state.side_effect = notify_network_change_after_first_check
+
+        monitor.enable()
+        run_main_loop(main_loop, timeout_in_ms=1000)
+        monitor.disable()
+
+    sender.close()
+    assert patched_check_network_state.call_count == 2
+    assert not monitor.is_enabled
+
+
+@patch("proton.vpn.app.gtk.services.reconnector.network_monitor.netlink.open_route_monitor_socket")
+def test_netlink_monitor_falls_back_to_polling_when_netlink_is_not_available(
+        open_route_monitor_socket_mock
+):
+    open_route_monitor_socket_mock.side_effect = PermissionError("Operation not permitted")
+    monitor = NetlinkNetworkMonitor(
+        DummyThreadPoolExecutor(), min_polling_interval_ms=10, max_polling_interval_ms=10
+    )
+    main_loop = GLib.MainLoop()
+
+    with patch.object(monitor, "check_network_state_async") as patched_check_network_state:
+        def quit_main_loop_after_2_connectivity_checks():
+            if patched_check_network_state.call_count == 2:
+                main_loop.quit()
+        patched_check_network_state.side_effect = quit_main_loop_after_2_connectivity_checks
+
+        monitor.enable()
+        run_main_loop(main_loop, timeout_in_ms=1000)
+
+    assert monitor.is_enabled
+    monitor.disable()
+
+
+@patch("proton.vpn.app.gtk.services.reconnector.network_monitor.subprocess")
+@patch("proton.vpn.app.gtk.services.reconnector.network_monitor.netlink.has_route_to")
+def test_check_for_network_connectivity_falls_back_to_ip_route_when_netlink_is_not_available(
+        has_route_to_mock, subprocess_mock
+):
+    has_route_to_mock.side_effect = PermissionError("Operation not permitted")
+    subprocess_mock.run.return_value.returncode = 0
+
+    assert check_for_network_connectivity()
+    subprocess_mock.run.assert_called_once()
+
+
+@patch("proton.vpn.app.gtk.services.reconnector.network_monitor.run_after_ms", Mock())
+def test_polling_interval_backs_off_while_network_is_up():
+    monitor = NetworkMonitor(
+        DummyThreadPoolExecutor(), min_polling_interval_ms=250, max_polling_interval_ms=1000
+    )
+    monitor._is_network_up = True
+
+    intervals = []
+    with patch.object(monitor, "check_network_state_async"):
+        for _ in range(4):
+            intervals.append(monitor.polling_interval_ms)
+            monitor._poll()
+
+    assert intervals == [250, 500, 1000, 1000]
+
+
+@patch("proton.vpn.app.gtk.services.reconnector.network_monitor.run_after_ms", Mock())
+def test_polling_interval_is_capped_lower_while_network_is_down():
+    monitor = NetworkMonitor(
+        DummyThreadPoolExecutor(), min_polling_interval_ms=250,
+        max_polling_interval_ms=30_000, max_polling_interval_when_down_ms=1000
+    )
+    monitor._is_network_up = False
+
+    with patch.object(monitor, "check_network_state_async"):
+        for _ in range(5):
+            monitor._poll()
+
+    assert monitor.polling_interval_ms == 1000
+
+
+def test_poll_fast_resets_polling_interval_and_polls_right_away():
+    monitor = NetworkMonitor(
+        DummyThreadPoolExecutor(), min_polling_interval_ms=250, max_polling_interval_ms=30_000
+    )
+    monitor._is_network_up = True
+
+    with patch.object(monitor, "check_network_state_async") as patched_check_network_state:
+        monitor.enable()
+        process_gtk_events()
+        # Simulate that the polling interval already backed off.
+        monitor._polling_interval_ms = 8000
+        patched_check_network_state.reset_mock()
+
+        monitor.poll_fast()
+        process_gtk_events()
+        monitor.disable()
+
+    patched_check_network_state.assert_called_once()
+    assert monitor.polling_interval_ms == 500
+
+
+@patch("proton.vpn.app.gtk.services.reconnector.network_monitor.check_for_network_connectivity")
+def test_network_state_change_records_detection_latency(check_for_network_connectivity_mock):
+    monitor = NetworkMonitor(DummyThreadPoolExecutor())
+
+    check_for_network_connectivity_mock.return_value = False
+    monitor.check_network_state_async()
+    process_gtk_events()
+    check_for_network_connectivity_mock.return_value = True
+    monitor.check_network_state_async()
+    process_gtk_events()
+
+    state_change = monitor.last_state_change
+    assert state_change.network_up
+    assert state_change.previous_state_duration >= 0
+    assert state_change.max_detection_latency_ms >= 0
+
+
+def test_check_network_state_async_runs_requested_checks_one_after_the_other():
+    executor = Mock()
+    first_check, second_check = Future(), Future()
+    executor.submit_with_options.side_effect = [first_check, second_check]
+    monitor = NetworkMonitor(executor)
+    monitor.network_up_callback = Mock()
+
+    assert monitor.check_network_state_async() is first_check
+    # Checks requested while one is running only run once it finishes.
+    assert monitor.check_network_state_async() is first_check
+    assert executor.submit_with_options.call_count == 1
+
+    first_check.set_result(False)
+    process_gtk_events()
+
+    assert executor.submit_with_options.call_count == 2
+    assert monitor.is_network_up is False
+
+    second_check.set_result(True)
+    process_gtk_events()
+
+    assert monitor.is_network_up is True
+    monitor.network_up_callback.assert_called_once()
+
+
+def test_checks_finishing_after_the_monitor_is_disabled_are_ignored():
+    executor = Mock()
+    check = Future()
+    executor.submit_with_options.return_value = check
+    monitor = NetworkMonitor(executor)
+    monitor.network_up_callback = Mock()
+
+    monitor.check_network_state_async()
+    monitor.check_network_state_async()  # Requests another check once this one finishes.
+    monitor.disable()
+
+    check.set_result(True)
+    process_gtk_events()
+
+    assert monitor.is_network_up is None
+    monitor.network_up_callback.assert_not_called()
+    assert executor.submit_with_options.call_count == 1
+
+
+@pytest.mark.parametrize("connection_error, expected_result", [(None, True), (OSError(), False)])
+def test_check_for_tunnel_liveness_opens_a_connection_through_the_tunnel(
+        connection_error, expected_result
+):
+    with patch(
+        "proton.vpn.app.gtk.services.reconnector.network_monitor.socket.create_connection",
+        side_effect=connection_error
+    ):
+        assert check_for_tunnel_liveness() is expected_result
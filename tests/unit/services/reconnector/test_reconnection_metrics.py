@@ -0,0 +1,107 @@
+"""
+Copyright (c) 2023 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import json
+from unittest.mock import patch
+
+import pytest
+
+from proton.vpn.app.gtk.services.reconnector.reconnection_metrics import (
+    ReconnectionMetrics, Outage, percentile, summarize,
+    CAUSE_DROP, CAUSE_NETWORK_UP, OUTCOME_CONNECTED, OUTCOME_DISCONNECTED
+)
+from tests.unit.testing_utils import DummyThreadPoolExecutor
+
+
+@pytest.mark.parametrize("percent, expected_percentile", [
+    (0, 1), (50, 5), (90, 9), (99, 10), (100, 10)
+])
+def test_percentile_uses_the_nearest_rank_method(percent, expected_percentile):
+    assert percentile(list(range(10, 0, -1)), percent) == expected_percentile
+
+
+def test_summarize_only_takes_into_account_restored_connections_for_time_to_connected():
+    outages = [
+        Outage(started_at=0, cause=CAUSE_DROP, outcome=OUTCOME_CONNECTED, ended_at=duration)
+        for duration in (1, 2, 3, 4)
+    ] + [Outage(started_at=0, cause=CAUSE_DROP, outcome=OUTCOME_DISCONNECTED, ended_at=100)]
+
+    summary = summarize(outages)
+
+    assert summary["outages"] == 5
+    assert summary["outcomes"] == {OUTCOME_CONNECTED: 4, OUTCOME_DISCONNECTED: 1}
+    assert summary["time_to_connected_s"] == {"p50": 2, "p90": 4, "p99": 4}
+
+
+def test_recorded_outages_are_written_to_the_history_file_once_flushed(tmp_path):
+    file_path = tmp_path / "reconnection-metrics.json"
+    metrics = ReconnectionMetrics(
+        DummyThreadPoolExecutor(), file_path=str(file_path), write_delay_ms=60 * 1000
+    )
+
+    metrics.record_outage_start(CAUSE_DROP, detected_at=100)
+    metrics.record_attempt_scheduled(1000, CAUSE_DROP)
+    metrics.record_attempt_started("CH#1")
+    metrics.record_attempt_scheduled(2000, CAUSE_NETWORK_UP)
+    metrics.record_outage_end(OUTCOME_CONNECTED, detected_at=105)
+    metrics.flush().result()
+
+    outages = json.loads(file_path.read_text())["outages"]
+    assert len(outages) == 1
+    assert outages[0]["cause"] == CAUSE_DROP
+    assert outages[0]["outcome"] == OUTCOME_CONNECTED
+    assert [attempt["cause"] for attempt in outages[0]["attempts"]] == [CAUSE_DROP, CAUSE_NETWORK_UP]
+    assert outages[0]["attempts"][0]["server_name"] == "CH#1"
+    assert metrics.dump()["summary"]["time_to_connected_s"]["p50"] == pytest.approx(5)
+
+
+def test_history_is_bounded(tmp_path):
+    file_path = tmp_path / "reconnection-metrics.json"
+    file_path.write_text(json.dumps({"outages": [
+        Outage(started_at=i, cause=CAUSE_DROP, outcome=OUTCOME_CONNECTED, ended_at=i + 1).to_dict()
+        for i in range(3)
+    ]}))
+    metrics = ReconnectionMetrics(DummyThreadPoolExecutor(), file_path=str(file_path), max_outages=3)
+    metrics.preload()
+
+    metrics.record_outage_start(CAUSE_DROP)
+    metrics.record_outage_end(OUTCOME_CONNECTED)
+
+    assert [outage.started_at for outage in metrics.outages][:2] == [1, 2]
+    assert len(metrics.outages) == 3
+
+
+@patch("proton.vpn.app.gtk.services.reconnector.reconnection_metrics.time")
+def test_outage_duration_is_not_affected_by_system_clock_changes(time_mock, tmp_path):
+    metrics = ReconnectionMetrics(
+        DummyThreadPoolExecutor(), file_path=str(tmp_path / "reconnection-metrics.json")
+    )
+    metrics.preload()
+
+    time_mock.time.return_value = 1000
+    time_mock.monotonic.return_value = 50
+    metrics.record_outage_start(CAUSE_DROP)
+
+    # The system clock is set back an hour while the VPN connection is down.
+    time_mock.time.return_value = 1000 - 3600 + 2
+    time_mock.monotonic.return_value = 52
+    metrics.record_outage_end(OUTCOME_CONNECTED)
+
+    outage, = metrics.outages
+    assert outage.started_at == 1000
+    assert outage.time_to_connected == 2
@@ -0,0 +1,52 @@
+"""
+Copyright (c) 2023 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from unittest.mock import Mock
+
+from proton.vpn.app.gtk.services.reconnector.reconnection_target import find_equivalent_server
+
+
+def create_server(server_id, exit_country="CH", features=(), enabled=True, tier=2, score=1.0):
+    return Mock(
+        id=server_id, exit_country=exit_country, features=list(features),
+        enabled=enabled, tier=tier, score=score
+    )
+
+
+def test_find_equivalent_server_returns_the_server_with_the_lowest_score_in_the_same_country_with_the_same_features():
+    server = create_server("original", features=("P2P",))
+    servers = [
+        server,
+        create_server("other-country", exit_country="SE", features=("P2P",), score=0.1),
+        create_server("other-features", features=("TOR",), score=0.1),
+        create_server("disabled", features=("P2P",), enabled=False, score=0.1),
+        create_server("higher-tier", features=("P2P",), tier=3, score=0.1),
+        create_server("excluded", features=("P2P",), score=0.1),
+        create_server("worse", features=("P2P",), score=2.0),
+        create_server("best", features=("P2P",), score=1.0),
+    ]
+
+    equivalent_server = find_equivalent_server(servers, server, excluded_server_ids={"excluded"})
+
+    assert equivalent_server.id == "best"
+
+
+def test_find_equivalent_server_returns_none_if_there_is_not_an_equivalent_server():
+    server = create_server("original")
+
+    assert find_equivalent_server([server, create_server("other", exit_country="SE")], server) is None
@@ -26,11 +26,14 @@ from proton.vpn.core.connection import VPNConnectorWrapper
 
 from proton.vpn.app.gtk.services import VPNDataRefresher
 from proton.vpn.app.gtk.services.reconnector.network_monitor import NetworkMonitor
+from proton.vpn.app.gtk.services.reconnector.reconnection_metrics import (
+    ReconnectionMetrics, CAUSE_DROP, CAUSE_NETWORK_UP, OUTCOME_CONNECTED
+)
 from proton.vpn.app.gtk.services.reconnector.reconnector import VPNReconnector
 from proton.vpn.app.gtk.services.reconnector.session_monitor import SessionMonitor
 from proton.vpn.app.gtk.services.reconnector.vpn_monitor import VPNMonitor
 from proton.vpn.app.gtk.utils.executor import AsyncExecutor
-from tests.unit.testing_utils import process_gtk_events
+from tests.unit.testing_utils import process_gtk_events, DummyThreadPoolExecutor
 
 
 @pytest.fixture
@@ -63,6 +66,15 @@ def session_monitor():
     return Mock(SessionMonitor)
 
 
+def create_server_list(*servers):
+    server_list = Mock()
+    server_list.get_by_id.side_effect = lambda server_id: next(
+        (server for server in servers if server.id == server_id), None
+    )
+    server_list.__iter__ = Mock(side_effect=lambda: iter(servers))
+    return server_list
+
+
 def test_enable_enables_vpn_and_network_and_session_monitors(
         vpn_connector, vpn_data_refresher, vpn_monitor, network_monitor, session_monitor, async_executor
 ):
@@ -244,6 +256,10 @@ def test_on_vpn_drop_a_reconnection_attempt_is_scheduled_with_an_exponential_bac
         vpn_connector, vpn_data_refresher, vpn_monitor, network_monitor, session_monitor, async_executor
     )
     vpn_connector.current_state = states.Error()
+    # Without equivalent servers, reconnection attempts keep targeting the same server.
+    server = Mock(id="1", exit_country="CH", features=[], enabled=True, tier=2, score=1)
+    vpn_data_refresher.server_list = create_server_list(server)
+    vpn_connector.current_connection.server_id = server.id
 
     glib_mock.timeout_add_seconds.return_value = 1
     random_mock.uniform.return_value = 1  # Get rid of randomness.
@@ -359,3 +375,281 @@ def test_on_vpn_up_resets_retry_counter_and_removes_pending_scheduled_attempt(
     assert reconnector.retry_counter == 0
     # and the pending scheduled connection has been unscheduled.
     assert not reconnector.is_reconnection_scheduled
+
+
+@patch("proton.vpn.app.gtk.services.reconnector.reconnector.run_on_main_thread")
+def test_reconnection_is_scheduled_on_resume_once_network_is_up_if_vpn_was_connected_before_sleep(
+    run_on_main_thread_mock,
+    vpn_connector, vpn_data_refresher, vpn_monitor, network_monitor, session_monitor, async_executor
+):
+    run_on_main_thread_mock.side_effect = lambda function, *args: function(*args)
+    reconnector = VPNReconnector(
+        vpn_connector, vpn_data_refresher, vpn_monitor, network_monitor, session_monitor, async_executor
+    )
+    vpn_connector.current_state = states.Connected()
+    network_monitor.check_network_state_async.return_value.add_done_callback.side_effect = \
+        lambda callback: callback(network_monitor.check_network_state_async.return_value)
+    # The VPN tunnel did not survive the suspension.
+    tunnel_liveness_check = network_monitor.check_tunnel_liveness_async.return_value
+    tunnel_liveness_check.result.return_value = False
+    tunnel_liveness_check.add_done_callback.side_effect = \
+        lambda callback: callback(tunnel_liveness_check)
+
+    with patch.object(reconnector, "schedule_reconnection") as schedule_reconnection_mock:
+        session_monitor.prepare_for_sleep_callback()
+
+        # The network is still down when the system resumes.
+        network_monitor.is_network_up = False
+        session_monitor.resumed_callback()
+
+        vpn_data_refresher.refresh_expired_data.assert_called_once()
+        network_monitor.poll_fast.assert_called_once()
+        schedule_reconnection_mock.assert_not_called()
+
+        # The tunnel is reestablished as soon as the network is up, without waiting for the VPN drop.
+        network_monitor.is_network_up = True
+        network_monitor.network_up_callback()
+
+        schedule_reconnection_mock.assert_called_once()
+
+
+@pytest.mark.parametrize("current_state, tunnel_alive, reconnection_expected", [
+    (states.Connected(), True, False),
+    (states.Connected(), False, True),
+    (states.Error(), None, True),
+    (states.Disconnected(), None, False),
+])
+@patch("proton.vpn.app.gtk.services.reconnector.reconnector.run_on_main_thread")
+def test_reconnection_on_resume_only_happens_if_the_vpn_dropped_or_the_tunnel_is_not_alive(
+    run_on_main_thread_mock, current_state, tunnel_alive, reconnection_expected,
+    vpn_connector, vpn_data_refresher, vpn_monitor, network_monitor, session_monitor, async_executor
+):
+    run_on_main_thread_mock.side_effect = lambda function, *args: function(*args)
+    reconnector = VPNReconnector(
+        vpn_connector, vpn_data_refresher, vpn_monitor, network_monitor, session_monitor, async_executor
+    )
+    vpn_connector.current_state = states.Connected()
+    network_monitor.is_network_up = True
+    for check in (network_monitor.check_network_state_async, network_monitor.check_tunnel_liveness_async):
+        check.return_value.result.return_value = tunnel_alive
+        check.return_value.add_done_callback.side_effect = \
+            lambda callback, check=check: callback(check.return_value)
+
+    with patch.object(reconnector, "schedule_reconnection") as schedule_reconnection_mock:
+        session_monitor.prepare_for_sleep_callback()
+        vpn_connector.current_state = current_state
+        session_monitor.resumed_callback()
+
+    assert schedule_reconnection_mock.called == reconnection_expected
+
+
+def test_reconnection_is_not_scheduled_on_resume_if_vpn_was_not_connected_before_sleep(
+    vpn_connector, vpn_data_refresher, vpn_monitor, network_monitor, session_monitor, async_executor
+):
+    reconnector = VPNReconnector(
+        vpn_connector, vpn_data_refresher, vpn_monitor, network_monitor, session_monitor, async_executor
+    )
+    vpn_connector.current_state = states.Disconnected()
+
+    with patch.object(reconnector, "schedule_reconnection") as schedule_reconnection_mock:
+        session_monitor.prepare_for_sleep_callback()
+        session_monitor.resumed_callback()
+
+    vpn_data_refresher.refresh_expired_data.assert_called_once()
+    network_monitor.check_network_state_async.assert_not_called()
+    schedule_reconnection_mock.assert_not_called()
+
+
+@patch("proton.vpn.app.gtk.services.reconnector.reconnector.GLib")
+def test_reconnection_attempt_uses_the_reconnection_target_computed_when_the_vpn_was_up(
+    glib_mock,
+    vpn_connector, vpn_data_refresher, vpn_monitor, network_monitor, session_monitor, async_executor
+):
+    reconnector = VPNReconnector(
+        vpn_connector, vpn_data_refresher, vpn_monitor, network_monitor, session_monitor, async_executor
+    )
+    vpn_connector.current_connection.server_id = "server-id"
+
+    vpn_monitor.vpn_up_callback()  # Simulate VPN up event.
+
+    vpn_data_refresher.server_list.get_by_id.assert_called_once_with("server-id")
+    vpn_connector.get_vpn_server.assert_called_once_with(
+        vpn_data_refresher.server_list.get_by_id.return_value, vpn_data_refresher.client_config
+    )
+
+    vpn_connector.current_state = states.Error()
+    vpn_monitor.vpn_drop_callback()  # Simulate VPN drop.
+    _, reconnect_func = glib_mock.timeout_add.call_args.args
+    reconnect_func()
+
+    # The VPN server is not looked up again at retry time.
+    vpn_connector.get_vpn_server.assert_called_once()
+    async_executor.submit.assert_called_once_with(
+        vpn_connector.connect,
+        vpn_connector.get_vpn_server.return_value,
+        vpn_connector.current_connection.protocol,
+        vpn_connector.current_connection.backend
+    )
+
+
+def test_an_equivalent_server_is_chosen_as_reconnection_target_when_the_server_is_removed_from_the_server_list(
+    vpn_connector, vpn_data_refresher, vpn_monitor, network_monitor, session_monitor, async_executor
+):
+    reconnector = VPNReconnector(
+        vpn_connector, vpn_data_refresher, vpn_monitor, network_monitor, session_monitor, async_executor
+    )
+    server = Mock(id="1", exit_country="CH", features=[], enabled=True, tier=2, score=1)
+    fallback_server = Mock(id="2", exit_country="CH", features=[], enabled=True, tier=2, score=2)
+    other_country_server = Mock(id="3", exit_country="SE", features=[], enabled=True, tier=2, score=0)
+    vpn_connector.current_connection.server_id = server.id
+    vpn_data_refresher.server_list.get_by_id.return_value = server
+    reconnector.enable()
+
+    # The server is removed from the server list.
+    new_server_list = Mock()
+    new_server_list.get_by_id.return_value = None
+    new_server_list.__iter__ = Mock(return_value=iter([fallback_server, other_country_server]))
+    vpn_data_refresher.server_list = new_server_list
+    new_server_list_callback = next(
+        call.args[1] for call in vpn_data_refresher.connect.call_args_list
+        if call.args[0] == "new-server-list"
+    )
+    new_server_list_callback(vpn_data_refresher, new_server_list)
+
+    assert reconnector.reconnection_target.server_id == server.id
+    assert reconnector.reconnection_target.logical_server is fallback_server
+    assert reconnector.reconnection_target.is_fallback
+    vpn_connector.get_vpn_server.assert_called_with(fallback_server, vpn_data_refresher.client_config)
+
+
+@patch("proton.vpn.app.gtk.services.reconnector.reconnector.random")
+def test_retry_delay_is_capped(
+    random_mock,
+    vpn_connector, vpn_data_refresher, vpn_monitor, network_monitor, session_monitor, async_executor
+):
+    reconnector = VPNReconnector(
+        vpn_connector, vpn_data_refresher, vpn_monitor, network_monitor, session_monitor, async_executor
+    )
+    random_mock.uniform.return_value = 1  # Get rid of randomness.
+    reconnector.retry_counter = 20
+
+    assert reconnector._calculate_retry_delay_in_milliseconds() == VPNReconnector.MAX_RETRY_DELAY_IN_MS
+
+
+def test_retry_delay_is_capped_after_a_very_large_number_of_attempts(
+    vpn_connector, vpn_data_refresher, vpn_monitor, network_monitor, session_monitor, async_executor
+):
+    reconnector = VPNReconnector(
+        vpn_connector, vpn_data_refresher, vpn_monitor, network_monitor, session_monitor, async_executor
+    )
+    # E.g. after the network was down for a whole weekend, with an attempt every minute.
+    reconnector.retry_counter = 5000
+
+    assert reconnector._calculate_retry_delay_in_milliseconds() == VPNReconnector.MAX_RETRY_DELAY_IN_MS
+
+
+@patch("proton.vpn.app.gtk.services.reconnector.reconnector.GLib")
+def test_reconnector_fails_over_to_an_equivalent_server_after_repeated_failed_attempts(
+    glib_mock,
+    vpn_connector, vpn_data_refresher, vpn_monitor, network_monitor, session_monitor, async_executor
+):
+    reconnector = VPNReconnector(
+        vpn_connector, vpn_data_refresher, vpn_monitor, network_monitor, session_monitor, async_executor
+    )
+    server = Mock(id="1", exit_country="CH", features=[], enabled=True, tier=2, score=1)
+    fallback_server = Mock(id="2", exit_country="CH", features=[], enabled=True, tier=2, score=2)
+    vpn_data_refresher.server_list = create_server_list(server, fallback_server)
+    vpn_connector.get_vpn_server.side_effect = lambda logical_server, _: f"vpn-server-{logical_server.id}"
+    vpn_connector.current_connection.server_id = server.id
+    vpn_connector.current_state = states.Error()
+
+    for _ in range(VPNReconnector.FAILED_ATTEMPTS_BEFORE_FAILOVER + 1):
+        vpn_monitor.vpn_drop_callback()  # Simulate VPN drop.
+        _, reconnect_func = glib_mock.timeout_add.call_args.args
+        reconnect_func()
+
+    connected_vpn_servers = [call.args[1] for call in async_executor.submit.call_args_list]
+    assert connected_vpn_servers == (
+        ["vpn-server-1"] * VPNReconnector.FAILED_ATTEMPTS_BEFORE_FAILOVER + ["vpn-server-2"]
+    )
+    assert reconnector.decisions[-1].event == "failover"
+
+
+@patch("proton.vpn.app.gtk.services.reconnector.reconnector.GLib")
+def test_reconnector_falls_back_to_the_protocol_returned_by_the_fallback_protocol_getter(
+    glib_mock,
+    vpn_connector, vpn_data_refresher, vpn_monitor, network_monitor, session_monitor, async_executor
+):
+    fallback_protocol_getter = Mock(return_value="openvpn-tcp")
+    reconnector = VPNReconnector(
+        vpn_connector, vpn_data_refresher, vpn_monitor, network_monitor, session_monitor,
+        async_executor, fallback_protocol_getter=fallback_protocol_getter
+    )
+    server = Mock(id="1", exit_country="CH", features=[], enabled=True, tier=2, score=1)
+    vpn_data_refresher.server_list = create_server_list(server)
+    vpn_connector.current_connection.server_id = server.id
+    vpn_connector.current_connection.protocol = "wireguard"
+    vpn_connector.current_state = states.Error()
+
+    vpn_monitor.vpn_drop_callback()  # Simulate the connection failing.
+    _, reconnect_func = glib_mock.timeout_add.call_args.args
+    reconnect_func()
+
+    fallback_protocol_getter.assert_called_once_with("wireguard")
+    assert async_executor.submit.call_args.args[2] == "openvpn-tcp"
+    assert reconnector.decisions[-1].event == "protocol_fallback"
+
+
+def test_reconnection_target_fails_over_to_an_equivalent_server_when_the_server_is_disabled(
+    vpn_connector, vpn_data_refresher, vpn_monitor, network_monitor, session_monitor, async_executor
+):
+    reconnector = VPNReconnector(
+        vpn_connector, vpn_data_refresher, vpn_monitor, network_monitor, session_monitor, async_executor
+    )
+    server = Mock(id="1", exit_country="CH", features=[], enabled=True, tier=2, score=1)
+    fallback_server = Mock(id="2", exit_country="CH", features=[], enabled=True, tier=2, score=2)
+    vpn_data_refresher.server_list = create_server_list(server, fallback_server)
+    vpn_connector.current_connection.server_id = server.id
+    reconnector.enable()
+    assert reconnector.reconnection_target.logical_server is server
+
+    # The server is put under maintenance.
+    server.enabled = False
+    new_server_loads_callback = next(
+        call.args[1] for call in vpn_data_refresher.connect.call_args_list
+        if call.args[0] == "new-server-loads"
+    )
+    new_server_loads_callback(vpn_data_refresher, vpn_data_refresher.server_list)
+
+    assert reconnector.reconnection_target.logical_server is fallback_server
+    assert reconnector.decisions[-1].event == "fallback"
+
+
+@patch("proton.vpn.app.gtk.services.reconnector.reconnector.GLib")
+def test_reconnector_records_the_outage_from_the_vpn_drop_until_the_vpn_is_up(
+    glib_mock, tmp_path,
+    vpn_connector, vpn_data_refresher, vpn_monitor, network_monitor, session_monitor, async_executor
+):
+    metrics = ReconnectionMetrics(
+        DummyThreadPoolExecutor(), file_path=str(tmp_path / "reconnection-metrics.json"),
+        write_delay_ms=60 * 1000
+    )
+    VPNReconnector(
+        vpn_connector, vpn_data_refresher, vpn_monitor, network_monitor, session_monitor, async_executor,
+        metrics=metrics
+    )
+    vpn_connector.current_state = states.Error()
+    vpn_monitor.last_drop_detected_at = 100
+    vpn_monitor.last_up_detected_at = 103
+
+    vpn_monitor.vpn_drop_callback()  # Simulate VPN drop.
+    _, reconnect_func = glib_mock.timeout_add.call_args.args
+    reconnect_func()
+    network_monitor.network_up_callback()  # Simulate network up.
+    vpn_monitor.vpn_up_callback()  # Simulate VPN up event.
+
+    outage, = metrics.outages
+    assert outage.cause == CAUSE_DROP
+    assert outage.outcome == OUTCOME_CONNECTED
+    assert outage.time_to_connected == pytest.approx(3)
+    assert [attempt.cause for attempt in outage.attempts] == [CAUSE_DROP, CAUSE_NETWORK_UP]
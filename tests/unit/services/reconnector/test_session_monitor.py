@@ -21,28 +21,74 @@ import pytest
 
 from proton.vpn.app.gtk.services.reconnector.session_monitor import (
     SessionMonitor, BUS_NAME,
-    SESSION_INTERFACE, UNLOCK_SIGNAL
+    SESSION_INTERFACE, LOCK_SIGNAL, UNLOCK_SIGNAL
 )
 
 
 PATH_NAME = "/some/random/bus/object/path"
 
 
-def test_enable_hooks_login1_unlock_signal():
+def get_signal_handler(bus_mock, signal_name):
+    for signal_receiver_call in bus_mock.add_signal_receiver.call_args_list:
+        if signal_receiver_call.kwargs["signal_name"] == signal_name:
+            return signal_receiver_call.kwargs["handler_function"]
+    raise AssertionError(f"{signal_name} signal receiver was not added.")
+
+
+@patch("proton.vpn.app.gtk.services.reconnector.session_monitor.dbus")
+def test_enable_hooks_login1_lock_and_unlock_signals(_dbus_mock):
+    bus_mock = Mock()
+    session_monitor = SessionMonitor(bus_mock, PATH_NAME)
+    session_monitor.session_unlocked_callback = Mock()
+
+    session_monitor.enable()
+
+    for signal_name in (UNLOCK_SIGNAL, LOCK_SIGNAL):
+        signal_receiver_call = next(
+            call for call in bus_mock.add_signal_receiver.call_args_list
+            if call.kwargs["signal_name"] == signal_name
+        )
+        assert signal_receiver_call.kwargs["dbus_interface"] == SESSION_INTERFACE
+        assert signal_receiver_call.kwargs["bus_name"] == BUS_NAME
+        assert signal_receiver_call.kwargs["path"] == PATH_NAME
+
+
+@patch("proton.vpn.app.gtk.services.reconnector.session_monitor.dbus")
+def test_unlock_signal_calls_session_unlocked_callback_once_session_was_locked(_dbus_mock):
     bus_mock = Mock()
     callback_mock = Mock()
     session_monitor = SessionMonitor(bus_mock, PATH_NAME)
     session_monitor.session_unlocked_callback = callback_mock
+    session_monitor.enable()
 
+    get_signal_handler(bus_mock, LOCK_SIGNAL)()
+    assert not session_monitor.is_session_unlocked
+
+    get_signal_handler(bus_mock, UNLOCK_SIGNAL)()
+    assert session_monitor.is_session_unlocked
+    callback_mock.assert_called_once()
+
+
+@patch("proton.vpn.app.gtk.services.reconnector.session_monitor.dbus")
+def test_is_session_unlocked_is_cached_from_locked_hint(dbus_mock):
+    bus_mock = Mock()
+    properties_proxy_mock = Mock()
+    dbus_mock.Interface.return_value = properties_proxy_mock
+    session_monitor = SessionMonitor(bus_mock, PATH_NAME)
+    session_monitor.session_unlocked_callback = Mock()
     session_monitor.enable()
 
-    bus_mock.add_signal_receiver.assert_called_once_with(
-        handler_function=callback_mock,
-        signal_name=UNLOCK_SIGNAL,
-        dbus_interface=SESSION_INTERFACE,
-        bus_name=BUS_NAME,
-        path=PATH_NAME
-    )
+    # The initial lock state is fetched asynchronously.
+    properties_proxy_mock.Get.call_args.kwargs["reply_handler"](True)
+    assert not session_monitor.is_session_unlocked
+
+    on_properties_changed = get_signal_handler(bus_mock, "PropertiesChanged")
+    on_properties_changed(SESSION_INTERFACE, {"LockedHint": False}, [])
+    assert session_monitor.is_session_unlocked
+    session_monitor.session_unlocked_callback.assert_called_once()
+
+    # Checking the lock state does not do any D-Bus call.
+    properties_proxy_mock.Get.assert_called_once()
 
 
 def test_enable_raises_runtime_error_if_callback_is_not_set():
@@ -54,18 +100,36 @@ def test_enable_raises_runtime_error_if_callback_is_not_set():
 
 
 @patch("proton.vpn.app.gtk.services.reconnector.session_monitor.dbus")
-def test_enable_raises_runtime_error_if_there_is_not_an_active_session(dbus_mock):
+def test_enable_looks_up_active_session_asynchronously(dbus_mock):
     bus_mock = Mock()
-    callback_mock = Mock()
     properties_proxy_mock = Mock()
+    dbus_mock.Interface.return_value = properties_proxy_mock
     session_monitor = SessionMonitor(bus_mock)
-    session_monitor.session_unlocked_callback = callback_mock
+    session_monitor.session_unlocked_callback = Mock()
+
+    session_monitor.enable()
+    bus_mock.add_signal_receiver.assert_not_called()
+
+    on_seat_properties = properties_proxy_mock.GetAll.call_args.kwargs["reply_handler"]
+    on_seat_properties({"ActiveSession": ("1", PATH_NAME)})
+
+    assert get_signal_handler(bus_mock, UNLOCK_SIGNAL)
+    assert bus_mock.add_signal_receiver.call_args.kwargs["path"] == PATH_NAME
 
-    properties_proxy_mock.GetAll.return_value = {"ActiveSession": []}
+
+@patch("proton.vpn.app.gtk.services.reconnector.session_monitor.dbus")
+def test_session_is_assumed_unlocked_if_there_is_not_an_active_session(dbus_mock):
+    bus_mock = Mock()
+    properties_proxy_mock = Mock()
     dbus_mock.Interface.return_value = properties_proxy_mock
+    session_monitor = SessionMonitor(bus_mock)
+    session_monitor.session_unlocked_callback = Mock()
 
-    with pytest.raises(RuntimeError):
-        session_monitor.enable()
+    session_monitor.enable()
+    properties_proxy_mock.GetAll.call_args.kwargs["reply_handler"]({"ActiveSession": []})
+
+    bus_mock.add_signal_receiver.assert_not_called()
+    assert session_monitor.is_session_unlocked
 
 
 def test_disable_unhooks_login1_signal():
@@ -92,3 +156,21 @@ def test_disable_does_not_unhook_from_login1_signal_if_it_was_not_hooked_before(
 
     session_monitor.disable()
     assert not signal_receiver_mock.remove.call_count
+
+
+@pytest.mark.parametrize("start, expected_callback", [
+    (True, "prepare_for_sleep_callback"),
+    (False, "resumed_callback"),
+])
+@patch("proton.vpn.app.gtk.services.reconnector.session_monitor.dbus")
+def test_prepare_for_sleep_signal_calls_sleep_and_resume_callbacks(_dbus_mock, start, expected_callback):
+    bus_mock = Mock()
+    session_monitor = SessionMonitor(bus_mock, PATH_NAME)
+    session_monitor.session_unlocked_callback = Mock()
+    session_monitor.prepare_for_sleep_callback = Mock()
+    session_monitor.resumed_callback = Mock()
+    session_monitor.enable()
+
+    get_signal_handler(bus_mock, "PrepareForSleep")(start)
+
+    getattr(session_monitor, expected_callback).assert_called_once()
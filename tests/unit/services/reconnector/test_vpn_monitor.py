@@ -24,6 +24,7 @@ from proton.vpn.connection import states
 from proton.vpn.core.connection import VPNConnectorWrapper
 
 from proton.vpn.app.gtk.services.reconnector.vpn_monitor import VPNMonitor
+from tests.unit.testing_utils import process_gtk_events
 
 
 def test_enable_registers_monitor_to_connection_state_updated():
@@ -51,9 +52,9 @@ def test_disable_unregisters_monitor_from_connection_state_updates():
     (states.Disconnected(), False),
     (states.Error(), True)
 ])
-@patch("proton.vpn.app.gtk.services.reconnector.vpn_monitor.GLib")
+@patch("proton.vpn.app.gtk.services.reconnector.vpn_monitor.run_on_main_thread")
 def test_status_update_only_triggers_vpn_drop_callback_on_error_connection_state(
-        glib_mock, state, vpn_drop_callback_called
+        run_on_main_thread_mock, state, vpn_drop_callback_called
 ):
     vpn_connector = Mock(VPNConnectorWrapper)
     monitor = VPNMonitor(vpn_connector)
@@ -62,9 +63,9 @@ def test_status_update_only_triggers_vpn_drop_callback_on_error_connection_state
     monitor.status_update(state)
 
     if vpn_drop_callback_called:
-        glib_mock.idle_add.assert_called_with(monitor.vpn_drop_callback)
+        run_on_main_thread_mock.assert_called_with(monitor.vpn_drop_callback)
     else:
-        glib_mock.idle_add.assert_not_called()
+        run_on_main_thread_mock.assert_not_called()
 
 
 @pytest.mark.parametrize("state,vpn_up_callback_called", [
@@ -74,9 +75,9 @@ def test_status_update_only_triggers_vpn_drop_callback_on_error_connection_state
     (states.Disconnected(), False),
     (states.Error(), False)
 ])
-@patch("proton.vpn.app.gtk.services.reconnector.vpn_monitor.GLib")
+@patch("proton.vpn.app.gtk.services.reconnector.vpn_monitor.run_on_main_thread")
 def test_status_update_only_triggers_vpn_up_callback_on_connected_connection_state(
-        glib_mock, state, vpn_up_callback_called
+        run_on_main_thread_mock, state, vpn_up_callback_called
 ):
     vpn_connector = Mock(VPNConnectorWrapper)
     monitor = VPNMonitor(vpn_connector)
@@ -85,10 +86,40 @@ def test_status_update_only_triggers_vpn_up_callback_on_connected_connection_sta
     monitor.status_update(state)
 
     if vpn_up_callback_called:
-        glib_mock.idle_add.assert_called_with(monitor.vpn_up_callback)
+        run_on_main_thread_mock.assert_called_with(monitor.vpn_up_callback)
     else:
-        glib_mock.idle_add.assert_not_called()
+        run_on_main_thread_mock.assert_not_called()
 
 
 def test_status_update_does_not_fail_when_callbacks_were_not_set():
     pass
+
+
+@patch("proton.vpn.app.gtk.services.reconnector.vpn_monitor.run_on_main_thread")
+def test_status_update_records_when_the_vpn_connection_drop_was_detected_and_triggers_vpn_disconnected_callback(
+        run_on_main_thread_mock
+):
+    monitor = VPNMonitor(Mock(VPNConnectorWrapper))
+    monitor.vpn_disconnected_callback = Mock()
+
+    monitor.status_update(states.Error())
+    assert monitor.last_drop_detected_at is not None
+
+    monitor.status_update(states.Disconnected())
+    run_on_main_thread_mock.assert_called_with(monitor.vpn_disconnected_callback)
+
+
+def test_status_update_runs_the_callbacks_of_every_transition_in_order():
+    monitor = VPNMonitor(Mock(VPNConnectorWrapper))
+    callbacks_called = []
+    monitor.vpn_up_callback = lambda: callbacks_called.append("up")
+    monitor.vpn_drop_callback = lambda: callbacks_called.append("drop")
+    monitor.vpn_disconnected_callback = lambda: callbacks_called.append("disconnected")
+
+    # The state changes several times before the main loop runs the callbacks.
+    monitor.status_update(states.Connected())
+    monitor.status_update(states.Error())
+    monitor.status_update(states.Disconnected())
+    process_gtk_events()
+
+    assert callbacks_called == ["up", "drop", "disconnected"]
@@ -0,0 +1,132 @@
+"""
+Copyright (c) 2023 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import json
+from concurrent.futures import Future
+from unittest.mock import Mock
+
+from proton.vpn.app.gtk.config import AppConfig
+from proton.vpn.app.gtk.services.app_config_store import AppConfigStore
+from tests.unit.testing_utils import DummyThreadPoolExecutor, process_gtk_events
+
+
+def test_get_loads_app_config_from_file(tmp_path):
+    file_path = tmp_path / "app-config.json"
+    file_path.write_text(json.dumps(
+        {"tray_pinned_servers": ["NL#1"], "connect_at_app_startup": "ch"}
+    ))
+    store = AppConfigStore(DummyThreadPoolExecutor(), file_path=str(file_path))
+
+    store.preload()
+
+    assert store.get() == AppConfig(tray_pinned_servers=["NL#1"], connect_at_app_startup="CH")
+
+
+def test_get_writes_default_app_config_when_the_file_does_not_exist(tmp_path):
+    file_path = tmp_path / "config" / "app-config.json"
+    store = AppConfigStore(DummyThreadPoolExecutor(), file_path=str(file_path))
+
+    assert store.get() == AppConfig.default()
+    store.flush().result()
+    assert json.loads(file_path.read_text()) == AppConfig.default().to_dict()
+
+
+def test_set_writes_app_config_to_file_only_once_flushed(tmp_path):
+    file_path = tmp_path / "app-config.json"
+    store = AppConfigStore(
+        DummyThreadPoolExecutor(), file_path=str(file_path),
+        app_config=AppConfig.default(), write_delay_ms=60 * 1000
+    )
+
+    app_config = store.get()
+    app_config.connect_at_app_startup = "FASTEST"
+    store.set(app_config)
+    app_config.tray_pinned_servers = ["JP"]
+    store.set(app_config)
+
+    assert not file_path.exists()
+
+    store.flush().result()
+
+    assert json.loads(file_path.read_text()) == {
+        "tray_pinned_servers": ["JP"], "connect_at_app_startup": "FASTEST"
+    }
+    assert list(tmp_path.iterdir()) == [file_path]
+
+
+def test_set_emits_changed_signal_only_when_the_app_config_changed(tmp_path):
+    store = AppConfigStore(
+        DummyThreadPoolExecutor(), file_path=str(tmp_path / "app-config.json"),
+        app_config=AppConfig.default()
+    )
+    on_changed = Mock()
+    store.connect("changed", on_changed)
+
+    app_config = store.get()
+    store.set(app_config)
+    on_changed.assert_not_called()
+
+    app_config.connect_at_app_startup = "US"
+    store.set(app_config)
+    on_changed.assert_called_once_with(store, app_config)
+
+
+def test_get_returns_default_app_config_until_it_is_loaded(tmp_path):
+    file_path = tmp_path / "app-config.json"
+    file_path.write_text(json.dumps({"tray_pinned_servers": ["NL#1"]}))
+    executor = Mock()
+    load = Future()
+    executor.submit.return_value = load
+    store = AppConfigStore(executor, file_path=str(file_path))
+    on_changed = Mock()
+    store.connect("changed", on_changed)
+
+    assert store.get() == AppConfig.default()
+    assert not store.loaded
+
+    load.set_result(store._read())
+    process_gtk_events()
+
+    assert store.get().tray_pinned_servers == ["NL#1"]
+    on_changed.assert_called_once_with(store, store.get())
+
+
+def test_app_config_set_before_it_is_loaded_is_applied_once_loaded(tmp_path):
+    file_path = tmp_path / "app-config.json"
+    file_path.write_text(json.dumps({"tray_pinned_servers": ["NL#1"]}))
+    load = Future()
+    # The configuration is loaded with submit, while writes use submit_with_options.
+    executor = Mock(submit_with_options=DummyThreadPoolExecutor().submit_with_options)
+    executor.submit.return_value = load
+    store = AppConfigStore(executor, file_path=str(file_path))
+
+    app_config = store.get()
+    app_config.connect_at_app_startup = "FASTEST"
+    saved = store.set(app_config)
+    assert not saved.done()
+
+    load.set_result(store._read())
+    process_gtk_events()
+    store.flush().result()
+
+    assert saved.done()
+    # Values which were not changed keep their loaded value.
+    assert store.get() == AppConfig(tray_pinned_servers=["NL#1"], connect_at_app_startup="FASTEST")
+    assert json.loads(file_path.read_text()) == {
+        "tray_pinned_servers": ["NL#1"], "connect_at_app_startup": "FASTEST"
+    }
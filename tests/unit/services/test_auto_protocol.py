@@ -0,0 +1,230 @@
+"""
+Copyright (c) 2023 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+import json
+import socket
+from unittest.mock import Mock
+
+import pytest
+
+from proton.vpn.connection import states
+
+from proton.vpn.app.gtk.services.auto_protocol import (
+    AutoProtocolSelector, get_network_id, probe_tcp, probe_udp
+)
+from tests.unit.testing_utils import DummyThreadPoolExecutor
+
+LOCALHOST = "127.0.0.1"
+
+
+def get_unused_port(socket_type) -> int:
+    """Returns a local port nothing is listening on."""
+    with socket.socket(socket.AF_INET, socket_type) as sock:
+        sock.bind((LOCALHOST, 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def tcp_server_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((LOCALHOST, 0))
+        sock.listen()
+        yield sock.getsockname()[1]
+
+
+@pytest.fixture
+def silent_udp_server_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind((LOCALHOST, 0))
+        yield sock.getsockname()[1]
+
+
+class _EchoProtocol(asyncio.DatagramProtocol):
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.transport.sendto(data, addr)
+
+
+def test_probe_tcp_returns_whether_a_connection_could_be_established(tcp_server_port):
+    assert asyncio.run(probe_tcp(LOCALHOST, tcp_server_port))
+    assert not asyncio.run(probe_tcp(LOCALHOST, get_unused_port(socket.SOCK_STREAM)))
+
+
+def test_probe_udp_returns_true_if_the_endpoint_replies():
+    async def run():
+        transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+            _EchoProtocol, local_addr=(LOCALHOST, 0)
+        )
+        try:
+            return await probe_udp(LOCALHOST, transport.get_extra_info("sockname")[1], b"ping")
+        finally:
+            transport.close()
+
+    assert asyncio.run(run()) is True
+
+
+def test_probe_udp_returns_false_if_the_packet_is_rejected_and_none_if_there_is_no_reply(
+        silent_udp_server_port
+):
+    assert asyncio.run(probe_udp(LOCALHOST, get_unused_port(socket.SOCK_DGRAM), b"ping")) is False
+    assert asyncio.run(probe_udp(LOCALHOST, silent_udp_server_port, b"ping", timeout=0.05)) is None
+
+
+def create_vpn_server(openvpn_udp_port, openvpn_tcp_port, wireguard_port):
+    return Mock(
+        server_ip=LOCALHOST,
+        openvpn_ports=Mock(udp=[openvpn_udp_port], tcp=[openvpn_tcp_port]),
+        wireguard_ports=Mock(udp=[wireguard_port], tcp=[])
+    )
+
+
+def create_connection_state(state_type, protocol):
+    connection_state = state_type()
+    connection_state.context.connection = Mock(protocol=protocol)
+    return connection_state
+
+
+def test_select_returns_the_preferred_reachable_protocol_and_remembers_it_once_connected(
+        tmp_path, tcp_server_port
+):
+    file_path = tmp_path / "auto-protocol.json"
+    selector = AutoProtocolSelector(
+        DummyThreadPoolExecutor(), file_path=str(file_path),
+        network_id_getter=lambda: "wlan0/10.0.0.1"
+    )
+    # UDP is blocked on this network.
+    vpn_server = create_vpn_server(
+        openvpn_udp_port=get_unused_port(socket.SOCK_DGRAM),
+        openvpn_tcp_port=tcp_server_port,
+        wireguard_port=get_unused_port(socket.SOCK_DGRAM)
+    )
+
+    protocol = asyncio.run(selector.select(vpn_server, ["openvpn-tcp", "openvpn-udp", "wireguard"]))
+
+    assert protocol == "openvpn-tcp"
+    assert not file_path.exists()
+
+    selector.status_update(create_connection_state(states.Connected, "openvpn-tcp"))
+
+    assert json.loads(file_path.read_text()) == {"wlan0/10.0.0.1": "openvpn-tcp"}
+    assert AutoProtocolSelector(
+        DummyThreadPoolExecutor(), file_path=str(file_path)
+    ).get_remembered_protocol("wlan0/10.0.0.1") == "openvpn-tcp"
+
+
+def test_selected_protocol_is_forgotten_when_the_connection_fails(
+        tmp_path, tcp_server_port, silent_udp_server_port
+):
+    file_path = tmp_path / "auto-protocol.json"
+    file_path.write_text(json.dumps({"wlan0/10.0.0.1": "openvpn-tcp"}))
+    selector = AutoProtocolSelector(
+        DummyThreadPoolExecutor(), file_path=str(file_path),
+        network_id_getter=lambda: "wlan0/10.0.0.1"
+    )
+    vpn_server = create_vpn_server(
+        openvpn_udp_port=silent_udp_server_port,
+        openvpn_tcp_port=tcp_server_port,
+        wireguard_port=silent_udp_server_port
+    )
+
+    asyncio.run(selector.select(vpn_server, ["openvpn-tcp", "openvpn-udp", "wireguard"]))
+    selector.status_update(create_connection_state(states.Error, "openvpn-tcp"))
+
+    assert json.loads(file_path.read_text()) == {}
+    assert selector.get_remembered_protocol("wlan0/10.0.0.1") is None
+
+
+def test_select_prefers_the_protocol_remembered_for_the_network(
+        tmp_path, tcp_server_port, silent_udp_server_port
+):
+    file_path = tmp_path / "auto-protocol.json"
+    file_path.write_text(json.dumps({"wlan0/10.0.0.1": "openvpn-tcp"}))
+    selector = AutoProtocolSelector(
+        DummyThreadPoolExecutor(), file_path=str(file_path),
+        network_id_getter=lambda: "wlan0/10.0.0.1"
+    )
+    vpn_server = create_vpn_server(
+        openvpn_udp_port=silent_udp_server_port,
+        openvpn_tcp_port=tcp_server_port,
+        wireguard_port=silent_udp_server_port
+    )
+
+    protocol = asyncio.run(selector.select(vpn_server, ["openvpn-tcp", "openvpn-udp", "wireguard"]))
+
+    assert protocol == "openvpn-tcp"
+
+
+def test_select_prefers_a_reachable_tcp_protocol_over_silent_udp_ones(
+        tmp_path, tcp_server_port, silent_udp_server_port
+):
+    selector = AutoProtocolSelector(
+        DummyThreadPoolExecutor(), file_path=str(tmp_path / "auto-protocol.json"),
+        network_id_getter=lambda: "wlan0/10.0.0.1"
+    )
+    # UDP packets are silently dropped on this network.
+    vpn_server = create_vpn_server(
+        openvpn_udp_port=silent_udp_server_port,
+        openvpn_tcp_port=tcp_server_port,
+        wireguard_port=silent_udp_server_port
+    )
+
+    protocol = asyncio.run(selector.select(vpn_server, ["openvpn-tcp", "openvpn-udp", "wireguard"]))
+
+    assert protocol == "openvpn-tcp"
+
+
+def test_get_fallback_protocol_returns_the_next_candidate_after_the_connection_failed(
+        tmp_path, silent_udp_server_port
+):
+    selector = AutoProtocolSelector(
+        DummyThreadPoolExecutor(), file_path=str(tmp_path / "auto-protocol.json"),
+        network_id_getter=lambda: "wlan0/10.0.0.1"
+    )
+    # Nothing replies, so the preferred protocol is selected.
+    vpn_server = create_vpn_server(
+        openvpn_udp_port=silent_udp_server_port,
+        openvpn_tcp_port=get_unused_port(socket.SOCK_STREAM),
+        wireguard_port=silent_udp_server_port
+    )
+
+    protocol = asyncio.run(selector.select(vpn_server, ["openvpn-tcp", "openvpn-udp", "wireguard"]))
+    assert protocol == "wireguard"
+    selector.status_update(create_connection_state(states.Connecting, "wireguard"))
+    selector.status_update(create_connection_state(states.Error, "wireguard"))
+
+    assert selector.get_fallback_protocol("wireguard") == "openvpn-udp"
+    selector.status_update(create_connection_state(states.Connecting, "openvpn-udp"))
+    selector.status_update(create_connection_state(states.Connected, "openvpn-udp"))
+
+    assert selector.get_remembered_protocol("wlan0/10.0.0.1") == "openvpn-udp"
+    # Once the connection was established, a later failure is not a reason to fall back.
+    assert selector.get_fallback_protocol("openvpn-udp") is None
+
+
+def test_get_network_id_returns_the_interface_and_gateway_of_the_default_route(tmp_path):
+    route_table = tmp_path / "route"
+    route_table.write_text(
+        "Iface\tDestination\tGateway \tFlags\tRefCnt\tUse\tMetric\tMask\t\tMTU\tWindow\tIRTT\n"
+        "wlan0\t0000A8C0\t00000000\t0001\t0\t0\t600\t00FFFFFF\t0\t0\t0\n"
+        "wlan0\t00000000\t0100A8C0\t0003\t0\t0\t600\t00000000\t0\t0\t0\n"
+    )
+
+    assert get_network_id(str(route_table)) == "wlan0/192.168.0.1"
@@ -0,0 +1,125 @@
+"""
+Copyright (c) 2023 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+import socket
+from unittest.mock import Mock, patch
+
+import pytest
+
+from proton.vpn.session.servers import ServerFeatureEnum
+
+from proton.vpn.app.gtk.services.latency_prober import LatencyProber, get_candidates
+
+
+@pytest.fixture
+def listening_port():
+    """Port of a local stand-in server endpoint, listening on 127.0.0.1 only."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        sock.listen()
+        yield sock.getsockname()[1]
+
+
+def create_server(server_id, entry_ip="127.0.0.1", exit_country="CH", score=1.0, features=()):
+    server = Mock(
+        id=server_id, exit_country=exit_country, score=score, enabled=True, tier=0,
+        features=list(features), physical_servers=[Mock(enabled=True, entry_ip=entry_ip)]
+    )
+    server.name = server_id
+    return server
+
+
+def test_get_candidates_returns_the_best_scored_servers_in_the_same_country():
+    selected_server = create_server("CH#1", score=1)
+    servers = [
+        create_server("CH#3", score=3),
+        selected_server,
+        create_server("CH#2", score=2),
+        create_server("SE#1", exit_country="SE", score=0),
+        create_server("CH-SC", features=[ServerFeatureEnum.SECURE_CORE], score=0),
+    ]
+
+    candidates = get_candidates(servers, selected_server, user_tier=2, max_candidates=2)
+
+    assert [server.id for server in candidates] == ["CH#1", "CH#2"]
+
+
+def test_select_fastest_returns_a_reachable_server(listening_port):
+    prober = LatencyProber(enabled=True, port=listening_port, network_id_getter=lambda: "net")
+    # Nothing listens on 127.0.0.2, so the connection is refused.
+    unreachable_server = create_server("CH#1", entry_ip="127.0.0.2")
+    reachable_server = create_server("CH#2", entry_ip="127.0.0.1")
+
+    fastest = asyncio.run(prober.select_fastest([unreachable_server, reachable_server]))
+
+    assert fastest is reachable_server
+
+
+def test_select_fastest_returns_none_when_probing_is_disabled(listening_port):
+    prober = LatencyProber(enabled=False, port=listening_port)
+
+    assert asyncio.run(prober.select_fastest([create_server("CH#1")])) is None
+
+
+def test_measure_leaves_out_servers_not_measured_before_the_deadline():
+    prober = LatencyProber(enabled=True, deadline_in_seconds=0.05, network_id_getter=lambda: "net")
+
+    async def measure_round_trip_time(server):
+        await asyncio.sleep(0.01 if server.id == "CH#1" else 10)
+        return 0.01
+
+    with patch.object(prober, "_measure_round_trip_time", side_effect=measure_round_trip_time):
+        round_trip_times = asyncio.run(prober.measure([create_server("CH#1"), create_server("CH#2")]))
+
+    assert round_trip_times == {"CH#1": 0.01}
+
+
+def test_measure_caches_round_trip_times_per_network(listening_port):
+    network_id = "wlan0/10.0.0.1"
+    prober = LatencyProber(enabled=True, port=listening_port, network_id_getter=lambda: network_id)
+    server = create_server("CH#1")
+
+    asyncio.run(prober.measure([server]))
+    with patch.object(prober, "_measure_round_trip_time") as measure_round_trip_time_mock:
+        asyncio.run(prober.measure([server]))
+        measure_round_trip_time_mock.assert_not_called()
+
+        # Measurements are not shared between networks.
+        network_id = "eth0/192.168.0.1"
+        measure_round_trip_time_mock.return_value = None
+        asyncio.run(prober.measure([server]))
+        measure_round_trip_time_mock.assert_called_once_with(server)
+
+
+def test_measure_does_not_probe_servers_while_a_vpn_connection_is_active(listening_port):
+    vpn_connection_active = True
+    prober = LatencyProber(
+        enabled=True, port=listening_port, network_id_getter=lambda: "net",
+        vpn_connection_active_getter=lambda: vpn_connection_active
+    )
+    server = create_server("CH#1")
+
+    with patch.object(prober, "_measure_round_trip_time") as measure_round_trip_time_mock:
+        assert asyncio.run(prober.measure([server])) == {}
+        assert asyncio.run(prober.select_fastest([server])) is None
+        measure_round_trip_time_mock.assert_not_called()
+
+    # Once the VPN connection is down, servers are probed again.
+    vpn_connection_active = False
+    assert asyncio.run(prober.select_fastest([server])) is server
@@ -1,7 +1,12 @@
-from unittest.mock import Mock, patch
+import asyncio
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from unittest.mock import AsyncMock, Mock, patch
 import pytest
 
 from proton.vpn.app.gtk.controller import Controller
+from proton.vpn.connection.enum import KillSwitchSetting as KillSwitchSettingEnum
+from tests.unit.testing_utils import DummyThreadPoolExecutor, process_gtk_events
 
 
 @pytest.mark.parametrize(
@@ -35,3 +40,280 @@ def test_autoconnect_feature(
             mock_method.assert_called_once_with(call_arg) 
         else:
             mock_method.assert_called_once()
+
+
+@pytest.mark.parametrize("server_loads_age, update_expected", [(10, False), (600, True)])
+def test_connect_to_fastest_server_updates_server_loads_only_when_they_are_too_old(
+        server_loads_age, update_expected
+):
+    vpn_data_refresher = Mock()
+    controller = Controller(
+        executor=Mock(),
+        api=Mock(),
+        vpn_data_refresher=vpn_data_refresher,
+        server_loads_max_age_in_seconds=300
+    )
+
+    with patch.object(
+        Controller, "server_loads_age_in_seconds", new=server_loads_age
+    ):
+        controller.connect_to_fastest_server()
+
+    assert vpn_data_refresher.update_server_loads.called is update_expected
+
+
+def test_select_server_and_connect_falls_back_to_cached_server_loads_on_timeout():
+    api = Mock()
+    controller = Controller(
+        executor=Mock(),
+        api=api,
+        vpn_data_refresher=Mock(),
+        server_loads_update_timeout_in_seconds=0.01
+    )
+    select_server = Mock()
+    connection_future = Future()
+    connection_future.set_result(None)
+
+    # The server loads update never finishes.
+    server_loads_update = Future()
+    with patch.object(controller, "_connect_to_vpn", return_value=connection_future):
+        asyncio.run(controller._select_server_and_connect(
+            select_server, server_loads_update, server_loads_age=600
+        ))
+
+    select_server.assert_called_once_with(api.server_list)
+
+
+def test_select_server_and_connect_uses_updated_server_loads():
+    controller = Controller(executor=Mock(), api=Mock(), vpn_data_refresher=Mock())
+    select_server = Mock()
+    connection_future = Future()
+    connection_future.set_result(None)
+
+    updated_server_list = Mock()
+    server_loads_update = Future()
+    server_loads_update.set_result(updated_server_list)
+    with patch.object(controller, "_connect_to_vpn", return_value=connection_future):
+        asyncio.run(controller._select_server_and_connect(
+            select_server, server_loads_update, server_loads_age=600
+        ))
+
+    select_server.assert_called_once_with(updated_server_list)
+
+
+@patch("proton.vpn.app.gtk.controller.run_on_main_thread", new=lambda function: function())
+@patch("proton.vpn.app.gtk.controller.SessionMonitor")
+@patch("proton.vpn.app.gtk.controller.NetlinkNetworkMonitor")
+@patch("proton.vpn.app.gtk.controller.VPNMonitor")
+@patch("proton.vpn.app.gtk.controller.VPNReconnector")
+def test_actions_requested_before_the_vpn_connector_is_ready_are_applied_once_it_is(
+        vpn_reconnector_class_mock, *_
+):
+    api = Mock()
+    vpn_connector = Mock()
+    api.get_vpn_connector = AsyncMock(return_value=vpn_connector)
+    controller = Controller(executor=Mock(), api=api, vpn_data_refresher=Mock())
+    subscriber = Mock()
+
+    controller.register_connection_status_subscriber(subscriber)
+    controller.enable_reconnector()
+
+    assert not controller.vpn_connector_ready.done()
+    vpn_reconnector_class_mock.return_value.enable.assert_not_called()
+
+    asyncio.run(controller.initialize_vpn_connector())
+
+    assert controller.vpn_connector_ready.result() is vpn_connector
+    vpn_connector.register.assert_called_once_with(subscriber)
+    subscriber.status_update.assert_called_once_with(vpn_connector.current_state)
+    vpn_reconnector_class_mock.return_value.enable.assert_called_once()
+
+
+def test_disconnect_waits_for_the_vpn_connector_to_be_ready():
+    executor = Mock()
+    controller = Controller(executor=executor, api=Mock(), vpn_data_refresher=Mock())
+
+    controller.disconnect()
+
+    executor.submit.assert_called_once_with(controller._disconnect_once_connector_is_ready)
+
+
+def test_unregister_connection_status_subscriber_before_the_vpn_connector_is_ready():
+    controller = Controller(executor=Mock(), api=Mock(), vpn_data_refresher=Mock())
+    subscriber = Mock()
+    controller.register_connection_status_subscriber(subscriber)
+
+    controller.unregister_connection_status_subscriber(subscriber)
+    # Unregistering a subscriber which was not registered is a no-op too.
+    controller.unregister_connection_status_subscriber(Mock())
+
+    assert not controller._pending_connection_status_subscribers
+
+
+def test_connect_and_disconnect_fail_with_the_vpn_connector_initialization_error():
+    api = Mock()
+    initialization_error = RuntimeError("Initialization failed")
+    api.get_vpn_connector = AsyncMock(side_effect=initialization_error)
+    controller = Controller(executor=Mock(), api=api, vpn_data_refresher=Mock())
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(controller.initialize_vpn_connector())
+
+    for future in (controller._connect_to_vpn(Mock()), controller.disconnect()):
+        assert future.exception() is initialization_error
+
+
+def test_get_available_protocols_resolves_once_the_vpn_connector_is_ready():
+    vpn_connector = Mock()
+    openvpn_udp, openvpn_tcp = Mock(), Mock()
+    openvpn_udp.cls.ui_protocol = "OpenVPN (UDP)"
+    openvpn_tcp.cls.ui_protocol = "OpenVPN (TCP)"
+    vpn_connector.get_available_protocols_for_backend.return_value = [openvpn_udp, openvpn_tcp]
+    controller = Controller(executor=Mock(), api=Mock(), vpn_data_refresher=Mock())
+
+    available_protocols = controller.get_available_protocols()
+    assert not available_protocols.done()
+
+    controller._vpn_connector_ready.set_result(vpn_connector)
+
+    assert available_protocols.result() == [openvpn_tcp, openvpn_udp]
+
+
+def test_get_settings_returns_preloaded_settings_without_loading_them_again():
+    api = Mock()
+    controller = Controller(
+        executor=DummyThreadPoolExecutor(), api=api, vpn_data_refresher=Mock()
+    )
+
+    controller.preload_settings()
+    settings = controller.get_settings()
+
+    assert settings is api.load_settings.return_value
+    api.load_settings.assert_called_once()
+
+
+def test_get_settings_returns_default_settings_until_settings_are_loaded():
+    api = Mock()
+    executor = Mock()
+    controller = Controller(executor=executor, api=api, vpn_data_refresher=Mock())
+    settings_load = Future()
+    executor.submit.return_value = settings_load
+
+    with patch("proton.vpn.app.gtk.controller.Settings") as settings_class_mock:
+        default_settings = controller.get_settings()
+        controller.save_settings()
+
+        settings_load.set_result(api.load_settings.return_value)
+        settings = controller.get_settings()
+
+    assert default_settings is settings_class_mock.default.return_value
+    assert settings is api.load_settings.return_value
+    api.save_settings.assert_not_called()
+
+
+@dataclass
+class FeaturesStub:
+    netshield: int = 0
+
+
+@dataclass
+class SettingsStub:
+    protocol: str = "openvpn-udp"
+    killswitch: KillSwitchSettingEnum = KillSwitchSettingEnum.OFF
+    features: FeaturesStub = field(default_factory=FeaturesStub)
+
+
+def test_settings_changed_before_being_loaded_are_applied_and_saved_once_loaded():
+    api = Mock()
+    controller = Controller(
+        executor=DummyThreadPoolExecutor(), api=api, vpn_data_refresher=Mock()
+    )
+    settings_load = Future()
+    loaded_settings = SettingsStub(protocol="wireguard", killswitch=KillSwitchSettingEnum.PERMANENT)
+
+    with patch("proton.vpn.app.gtk.controller.Settings") as settings_class_mock, \
+            patch.object(controller, "preload_settings", return_value=settings_load):
+        settings_class_mock.default.return_value = SettingsStub()
+        controller.get_settings().features.netshield = 2
+        controller.save_settings()
+        killswitch_disabled = controller.disable_killswitch()
+
+        settings_load.set_result(loaded_settings)
+        process_gtk_events()
+
+    assert killswitch_disabled.done()
+    assert loaded_settings.killswitch == KillSwitchSettingEnum.OFF
+    assert loaded_settings.features.netshield == 2
+    # Settings which were not changed keep their loaded value.
+    assert loaded_settings.protocol == "wireguard"
+    api.save_settings.assert_called_with(loaded_settings)
+
+
+def test_clear_settings_discards_pending_settings_write():
+    api = Mock()
+    controller = Controller(
+        executor=DummyThreadPoolExecutor(), api=api, vpn_data_refresher=Mock(),
+        settings=Mock()
+    )
+
+    controller.save_settings()
+    controller.clear_settings()
+    controller.flush_settings()
+
+    api.save_settings.assert_not_called()
+
+
+def test_save_settings_debounces_writes_and_flush_settings_writes_them_right_away():
+    api = Mock()
+    controller = Controller(
+        executor=DummyThreadPoolExecutor(), api=api, vpn_data_refresher=Mock(),
+        settings=Mock()
+    )
+
+    controller.save_settings()
+    controller.save_settings()
+    api.save_settings.assert_not_called()
+
+    controller.flush_settings()
+    api.save_settings.assert_called_once()
+
+
+def test_connect_with_auto_protocol_connects_with_the_protocol_selected_by_probing_the_server():
+    vpn_connector = Mock()
+    openvpn_tcp = Mock()
+    openvpn_tcp.cls.protocol = "openvpn-tcp"
+    vpn_connector.get_available_protocols_for_backend.return_value = [openvpn_tcp]
+    auto_protocol_selector = Mock()
+    auto_protocol_selector.select = AsyncMock(return_value="openvpn-tcp")
+    controller = Controller(
+        executor=DummyThreadPoolExecutor(), api=Mock(), vpn_data_refresher=Mock(),
+        vpn_connector=vpn_connector, auto_protocol_selector=auto_protocol_selector
+    )
+    vpn_server = Mock()
+
+    asyncio.run(controller._connect_with_auto_protocol(vpn_server))
+
+    auto_protocol_selector.select.assert_called_once_with(vpn_server, ["openvpn-tcp"])
+    vpn_connector.register.assert_called_once_with(auto_protocol_selector)
+    vpn_connector.connect.assert_called_once_with(vpn_server, protocol="openvpn-tcp")
+
+
+def test_select_server_and_connect_connects_to_the_server_with_the_lowest_latency():
+    api = Mock()
+    latency_prober = Mock(enabled=True, max_candidates=5)
+    fastest_server = Mock()
+    latency_prober.select_fastest = AsyncMock(return_value=fastest_server)
+    controller = Controller(
+        executor=Mock(), api=api, vpn_data_refresher=Mock(), latency_prober=latency_prober
+    )
+    connection_future = Future()
+    connection_future.set_result(None)
+
+    with patch("proton.vpn.app.gtk.controller.get_candidates") as get_candidates_mock, \
+            patch.object(controller, "_connect_to_vpn", return_value=connection_future) as connect_mock:
+        asyncio.run(controller._select_server_and_connect(
+            Mock(), server_loads_update=None, server_loads_age=0
+        ))
+
+    latency_prober.select_fastest.assert_called_once_with(get_candidates_mock.return_value)
+    connect_mock.assert_called_once_with(fastest_server)
@@ -0,0 +1,91 @@
+"""
+Copyright (c) 2023 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import json
+import re
+import subprocess
+import sys
+
+import pytest
+
+# Budgets for importing the app module, which determines how long it takes
+# for the app window to show up. If they are exceeded, consider deferring the
+# new imports with proton.vpn.app.gtk.utils.lazy.lazy_import.
+APP_MODULE = "proton.vpn.app.gtk.app"
+APP_PACKAGE = "proton.vpn.app.gtk"
+# The app module imported 67 modules of the app package when this budget was
+# set, as counted from their import statements. The headroom leaves room for
+# new modules while still noticing when a whole subtree becomes eager.
+MAX_IMPORTED_APP_MODULES = 80
+# The import time depends on the machine running the tests, so the bound is
+# loose on purpose: it's only meant to catch imports that became much slower.
+MAX_IMPORT_TIME_IN_SECONDS = 5
+
+# Modules which should only be imported the first time they are used.
+LAZILY_IMPORTED_MODULES = [
+    "proton.vpn.app.gtk.widgets.headerbar.menu.bug_report_dialog",
+    "proton.vpn.app.gtk.widgets.headerbar.menu.about_dialog",
+    "proton.vpn.app.gtk.widgets.headerbar.menu.release_notes_dialog",
+    "proton.vpn.app.gtk.widgets.headerbar.menu.settings.settings_window",
+    "dbus",
+    "dbus.mainloop.glib",
+]
+
+MEASURE_IMPORT_SCRIPT = """
+import json, sys
+import proton.vpn.app.gtk.app
+print(json.dumps({"modules": list(sys.modules)}))
+"""
+
+
+def test_importing_app_module_is_within_budget():
+    # The import is measured in a new interpreter, so that modules
+    # imported by other tests are not already cached.
+    output = subprocess.run(
+        [sys.executable, "-c", MEASURE_IMPORT_SCRIPT],
+        capture_output=True, check=True, text=True
+    ).stdout
+    modules = json.loads(output.splitlines()[-1])["modules"]
+
+    app_modules = [
+        module for module in modules
+        if module == APP_PACKAGE or module.startswith(f"{APP_PACKAGE}.")
+    ]
+    assert len(app_modules) <= MAX_IMPORTED_APP_MODULES
+    for module in LAZILY_IMPORTED_MODULES:
+        assert module not in modules, f"{module} should be imported lazily"
+
+
+def test_importing_app_module_is_within_time_budget():
+    # -X importtime reports the cumulative import time of each module,
+    # which excludes the time the interpreter takes to start up.
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {APP_MODULE}"],
+        capture_output=True, check=False, text=True
+    )
+    match = re.search(
+        rf"^import time:\s*\d+\s*\|\s*(\d+)\s*\|\s*{re.escape(APP_MODULE)}$",
+        result.stderr, re.MULTILINE
+    )
+    if result.returncode != 0:
+        pytest.skip(f"{APP_MODULE} could not be imported, so its import time can't be measured.")
+    if not match:
+        pytest.skip(f"The import time of {APP_MODULE} was not reported by -X importtime.")
+
+    import_time_in_seconds = int(match.group(1)) / 1_000_000
+    assert import_time_in_seconds < MAX_IMPORT_TIME_IN_SECONDS
@@ -105,4 +105,6 @@ class DummyThreadPoolExecutor:
 
         return future
 
-
+    # pylint: disable=unused-argument
+    def submit_with_options(self, fn, args=(), kwargs=None, **options):
+        return self.submit(fn, *args, **(kwargs or {}))
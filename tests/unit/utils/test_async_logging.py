@@ -0,0 +1,113 @@
+"""
+Copyright (c) 2023 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import logging
+import threading
+
+import pytest
+
+from proton.vpn.app.gtk.utils.async_logging import AsyncLoggingPipeline, RingBufferHandler
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+        self.threads = []
+
+    def emit(self, record):
+        self.messages.append(self.format(record))
+        self.threads.append(threading.get_ident())
+
+
+@pytest.fixture
+def logger_and_handler():
+    logger = logging.getLogger("test_async_logging")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    handler = RecordingHandler()
+    logger.addHandler(handler)
+    yield logger, handler
+    logger.removeHandler(handler)
+
+
+def test_pipeline_passes_records_to_original_handlers_on_a_background_thread(logger_and_handler):
+    logger, handler = logger_and_handler
+    pipeline = AsyncLoggingPipeline(logger)
+    pipeline.start()
+    try:
+        logger.info("Hello %s", "world")
+        assert pipeline.flush()
+    finally:
+        pipeline.stop()
+
+    assert handler.messages == ["Hello world"]
+    assert handler.threads != [threading.get_ident()]
+
+
+def test_pipeline_merges_the_message_with_its_arguments_when_logging(logger_and_handler):
+    logger, handler = logger_and_handler
+    pipeline = AsyncLoggingPipeline(logger)
+    pipeline.start()
+    servers = ["NL#1"]
+    try:
+        logger.info("Servers: %s", servers)
+        # Arguments mutated after logging don't change the logged message.
+        servers.append("CH#1")
+        assert pipeline.flush()
+    finally:
+        pipeline.stop()
+
+    assert handler.messages == ["Servers: ['NL#1']"]
+    assert pipeline.ring_buffer.records[0].args is None
+
+
+def test_pipeline_stop_handles_pending_records_and_restores_handlers(logger_and_handler):
+    logger, handler = logger_and_handler
+    handlers = list(logger.handlers)
+    pipeline = AsyncLoggingPipeline(logger)
+    pipeline.start()
+
+    for i in range(100):
+        logger.debug("Record %d", i)
+    pipeline.stop()
+
+    assert len(handler.messages) == 100
+    assert logger.handlers == handlers
+
+
+def test_pipeline_keeps_last_records_in_ring_buffer(logger_and_handler):
+    logger, _ = logger_and_handler
+    pipeline = AsyncLoggingPipeline(logger, ring_buffer_capacity=2)
+    pipeline.start()
+    try:
+        for i in range(3):
+            logger.warning("Record %d", i)
+        pipeline.flush()
+    finally:
+        pipeline.stop()
+
+    assert pipeline.ring_buffer.get_lines() == ["Record 1", "Record 2"]
+
+
+def test_ring_buffer_handler_drops_oldest_records_once_full():
+    handler = RingBufferHandler(capacity=1)
+    handler.handle(logging.makeLogRecord({"msg": "first"}))
+    handler.handle(logging.makeLogRecord({"msg": "second"}))
+
+    assert [record.getMessage() for record in handler.records] == ["second"]
@@ -0,0 +1,102 @@
+"""
+Copyright (c) 2023 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from unittest.mock import Mock, call
+
+from gi.repository import GLib
+
+from proton.vpn.app.gtk.utils.debounce import DebouncedWriter
+from tests.unit.testing_utils import DummyThreadPoolExecutor, run_main_loop
+
+
+def test_debounced_writer_writes_a_burst_of_write_requests_once_with_the_latest_arguments():
+    write = Mock()
+    writer = DebouncedWriter(DummyThreadPoolExecutor(), write, delay_ms=10)
+    main_loop = GLib.MainLoop()
+
+    writer.request_write("first")
+    future = writer.request_write("second")
+    future.add_done_callback(lambda _: GLib.idle_add(main_loop.quit))
+
+    run_main_loop(main_loop)
+
+    write.assert_called_once_with("second")
+    assert not writer.has_pending_write
+
+
+def test_debounced_writer_flush_runs_pending_write_without_waiting_for_the_delay():
+    write = Mock()
+    writer = DebouncedWriter(DummyThreadPoolExecutor(), write, delay_ms=60 * 1000)
+
+    writer.request_write("data")
+    future = writer.flush()
+
+    assert future.done()
+    write.assert_called_once_with("data")
+    assert not writer.has_pending_write
+
+
+def test_debounced_writer_flush_does_nothing_when_there_is_no_pending_write():
+    write = Mock()
+    writer = DebouncedWriter(DummyThreadPoolExecutor(), write)
+
+    assert writer.flush().done()
+    write.assert_not_called()
+
+
+def test_debounced_writer_propagates_write_errors():
+    write = Mock(side_effect=OSError("Disk full"))
+    writer = DebouncedWriter(DummyThreadPoolExecutor(), write)
+
+    writer.request_write("data")
+    future = writer.flush()
+
+    assert isinstance(future.exception(), OSError)
+    assert write.mock_calls == [call("data")]
+
+
+def test_debounced_writer_cancel_discards_the_pending_write():
+    write = Mock()
+    writer = DebouncedWriter(DummyThreadPoolExecutor(), write, delay_ms=60 * 1000)
+
+    future = writer.request_write("data")
+    writer.cancel()
+
+    assert future.cancelled()
+    assert not writer.has_pending_write
+    assert writer.flush().done()
+    write.assert_not_called()
+
+
+def test_debounced_writer_skips_writes_older_than_the_last_one_run():
+    write = Mock()
+    executor = Mock()
+    writer = DebouncedWriter(executor, write)
+
+    writer.request_write("old")
+    writer.flush()
+    writer.request_write("new")
+    writer.flush()
+
+    # The writes are run in the opposite order they were submitted.
+    (new_write_call, old_write_call) = reversed(executor.submit_with_options.call_args_list)
+    for write_call in (new_write_call, old_write_call):
+        write_in_order, args = write_call.args
+        write_in_order(*args)
+
+    write.assert_called_once_with("new")
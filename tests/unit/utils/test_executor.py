@@ -18,9 +18,19 @@ along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
 
 import asyncio
+import threading
 import time
+from threading import Event
 
-from proton.vpn.app.gtk.utils.executor import AsyncExecutor
+import pytest
+
+from concurrent.futures import CancelledError
+
+from proton.vpn.app.gtk.utils.executor import (
+    AsyncExecutor, PriorityThreadPoolExecutor, TaskPriority,
+    CancellationToken, TaskScope, get_current_cancellation_token,
+    EventLoopMode, EVENT_LOOP_MODE_ENV_VAR
+)
 
 
 def test_async_executor_submit_with_coroutine_func():
@@ -54,3 +64,216 @@ def test_async_executor_stop_stops_running_the_executor():
     executor.start()
     executor.stop()
     assert not executor.is_running
+
+
+def test_priority_thread_pool_executor_starts_interactive_tasks_while_background_workers_are_busy():
+    pool = PriorityThreadPoolExecutor(max_workers=4)
+    release_background_tasks = Event()
+
+    # Background tasks can't take the workers reserved for interactive tasks.
+    background_futures = [
+        pool.submit_with_options(release_background_tasks.wait, priority=TaskPriority.BACKGROUND)
+        for _ in range(10)
+    ]
+
+    interactive_future = pool.submit(lambda: "done")
+
+    try:
+        assert interactive_future.result(timeout=1) == "done"
+        assert not any(future.done() for future in background_futures)
+    finally:
+        release_background_tasks.set()
+        pool.shutdown()
+
+    assert all(future.result() for future in background_futures)
+
+
+def test_priority_thread_pool_executor_limits_bulk_tasks_to_their_worker_budget():
+    pool = PriorityThreadPoolExecutor(max_workers=4)
+    release_bulk_tasks = Event()
+    bulk_task_started = Event()
+
+    def bulk_task():
+        bulk_task_started.set()
+        release_bulk_tasks.wait()
+
+    # With 4 workers, 2 are reserved for interactive tasks and bulk tasks
+    # can take half of the remaining ones.
+    first_bulk_future = pool.submit_with_options(bulk_task, priority=TaskPriority.BULK)
+    assert bulk_task_started.wait(timeout=1)
+    bulk_task_started.clear()
+    second_bulk_future = pool.submit_with_options(bulk_task, priority=TaskPriority.BULK)
+
+    try:
+        assert not bulk_task_started.wait(timeout=0.1)
+        assert second_bulk_future.running() is False
+    finally:
+        release_bulk_tasks.set()
+        pool.shutdown()
+
+    assert first_bulk_future.done() and second_bulk_future.done()
+
+
+def test_priority_thread_pool_executor_caps_background_and_bulk_tasks_together():
+    pool = PriorityThreadPoolExecutor(max_workers=8)
+    release_tasks = Event()
+
+    # Background and bulk tasks share the workers which are not reserved
+    # for interactive tasks.
+    non_interactive_futures = [
+        pool.submit_with_options(release_tasks.wait, priority=priority)
+        for priority in [TaskPriority.BACKGROUND] * 6 + [TaskPriority.BULK] * 2
+    ]
+
+    interactive_future = pool.submit(lambda: "done")
+
+    try:
+        assert interactive_future.result(timeout=1) == "done"
+        assert sum(future.running() for future in non_interactive_futures) == 6
+    finally:
+        release_tasks.set()
+        pool.shutdown()
+
+    assert all(future.result() for future in non_interactive_futures)
+
+
+def test_async_executor_submit_regular_func_with_priority():
+    with AsyncExecutor() as executor:
+        future = executor.submit_with_options(lambda: "done", priority=TaskPriority.BACKGROUND)
+        assert future.result() == "done"
+
+
+def test_async_executor_runs_blocking_functions_on_named_worker_threads():
+    with AsyncExecutor(max_workers=3) as executor:
+        thread_name = executor.submit(lambda: threading.current_thread().name).result()
+
+    assert thread_name.startswith(AsyncExecutor.THREAD_NAME_PREFIX)
+
+
+def test_async_executor_uses_the_same_pool_for_run_in_executor():
+    async def run_in_default_executor():
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, lambda: threading.current_thread().name)
+
+    with AsyncExecutor(max_workers=3) as executor:
+        thread_name = executor.submit(run_in_default_executor).result()
+
+    assert thread_name.startswith(AsyncExecutor.THREAD_NAME_PREFIX)
+
+
+def test_async_executor_stop_shuts_down_the_thread_pool():
+    executor = AsyncExecutor(max_workers=3)
+    executor.start()
+    executor.stop()
+
+    with pytest.raises(RuntimeError):
+        executor.submit(lambda: None)
+
+
+def test_async_executor_submit_cancels_coroutine_after_timeout():
+    with AsyncExecutor() as executor:
+        future = executor.submit_with_options(asyncio.sleep, (10,), timeout=0.01)
+        with pytest.raises((asyncio.TimeoutError, TimeoutError)):
+            future.result(timeout=1)
+
+
+def test_async_executor_submit_cancels_coroutine_when_cancellation_token_is_cancelled():
+    cancellation_token = CancellationToken()
+    with AsyncExecutor() as executor:
+        future = executor.submit_with_options(
+            asyncio.sleep, (10,), cancellation_token=cancellation_token
+        )
+        cancellation_token.cancel()
+        with pytest.raises(CancelledError):
+            future.result(timeout=1)
+
+
+def test_async_executor_submit_cancels_cooperative_blocking_func_after_timeout():
+    def cooperative_blocking_func():
+        cancellation_token = get_current_cancellation_token()
+        while True:
+            cancellation_token.raise_if_cancelled()
+            time.sleep(0.001)
+
+    with AsyncExecutor() as executor:
+        future = executor.submit_with_options(cooperative_blocking_func, timeout=0.01)
+        with pytest.raises(CancelledError):
+            future.result(timeout=1)
+
+
+def test_async_executor_submit_passes_option_names_through_to_the_callable():
+    def blocking_func(priority, timeout, cancellation_token):
+        return priority, timeout, cancellation_token
+
+    with AsyncExecutor() as executor:
+        future = executor.submit(
+            blocking_func, priority="high", timeout=1, cancellation_token="token"
+        )
+        assert future.result(timeout=1) == ("high", 1, "token")
+
+
+def test_async_executor_submit_with_options_cancels_the_timer_when_the_task_is_done():
+    with AsyncExecutor() as executor:
+        future = executor.submit_with_options(lambda: "done", timeout=10)
+        assert future.result(timeout=1) == "done"
+        # Wait for the asyncio loop to process the timer cancellation.
+        executor.submit(asyncio.sleep, 0.01).result(timeout=1)
+
+        assert not [
+            handle for handle in executor._loop._scheduled if not handle.cancelled()
+        ]
+
+
+def test_task_scope_cancel_cancels_all_tasks_in_the_scope():
+    with AsyncExecutor() as executor:
+        task_scope = TaskScope(executor)
+        submitted_future = task_scope.submit(asyncio.sleep, 10)
+        tracked_future = task_scope.track(executor.submit(asyncio.sleep, 10))
+
+        task_scope.cancel()
+
+        for future in (submitted_future, tracked_future):
+            with pytest.raises(CancelledError):
+                future.result(timeout=1)
+
+        # The scope can still be used after being cancelled.
+        assert task_scope.submit(lambda: "done").result(timeout=1) == "done"
+
+
+def test_async_executor_in_glib_mode_runs_coroutines_on_the_thread_driving_the_glib_main_loop():
+    async def get_thread_id():
+        await asyncio.sleep(0.01)
+        return threading.get_ident()
+
+    with AsyncExecutor(loop_mode=EventLoopMode.GLIB) as executor:
+        assert executor.run_until_complete(get_thread_id) == threading.get_ident()
+
+
+def test_async_executor_in_glib_mode_runs_blocking_functions_on_the_thread_pool():
+    with AsyncExecutor(loop_mode=EventLoopMode.GLIB) as executor:
+        assert executor.run_until_complete(threading.get_ident) != threading.get_ident()
+
+
+@pytest.mark.parametrize("loop_mode", [EventLoopMode.THREAD, EventLoopMode.GLIB])
+def test_async_executor_run_until_complete_raises_error_when_called_from_its_loop(loop_mode):
+    with AsyncExecutor(loop_mode=loop_mode) as executor:
+        async def wait_for_another_coroutine():
+            return executor.run_until_complete(asyncio.sleep, 0)
+
+        with pytest.raises(RuntimeError):
+            executor.run_until_complete(wait_for_another_coroutine)
+
+
+@pytest.mark.parametrize("env_var_value,expected_mode", [
+    (None, EventLoopMode.THREAD),
+    ("glib", EventLoopMode.GLIB),
+    ("THREAD", EventLoopMode.THREAD),
+    ("unknown", EventLoopMode.THREAD),
+])
+def test_event_loop_mode_from_environment(monkeypatch, env_var_value, expected_mode):
+    if env_var_value is None:
+        monkeypatch.delenv(EVENT_LOOP_MODE_ENV_VAR, raising=False)
+    else:
+        monkeypatch.setenv(EVENT_LOOP_MODE_ENV_VAR, env_var_value)
+
+    assert EventLoopMode.from_environment() is expected_mode
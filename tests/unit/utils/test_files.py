@@ -0,0 +1,44 @@
+"""
+Copyright (c) 2023 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import json
+
+import pytest
+
+from proton.vpn.app.gtk.utils.files import write_json_atomically
+
+
+def test_write_json_atomically_replaces_the_file_without_leaving_temporary_files(tmp_path):
+    file_path = tmp_path / "config" / "data.json"
+
+    write_json_atomically(str(file_path), {"version": 1})
+    write_json_atomically(str(file_path), {"version": 2})
+
+    assert json.loads(file_path.read_text()) == {"version": 2}
+    assert list(file_path.parent.iterdir()) == [file_path]
+
+
+def test_write_json_atomically_keeps_the_previous_file_when_writing_fails(tmp_path):
+    file_path = tmp_path / "data.json"
+    write_json_atomically(str(file_path), {"version": 1})
+
+    with pytest.raises(TypeError):
+        write_json_atomically(str(file_path), {"version": object()})
+
+    assert json.loads(file_path.read_text()) == {"version": 1}
+    assert list(tmp_path.iterdir()) == [file_path]
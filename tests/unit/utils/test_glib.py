@@ -16,7 +16,7 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
-from unittest.mock import Mock, call
+from unittest.mock import Mock, call, patch
 
 from proton.vpn.app.gtk.utils import glib
 from gi.repository import GLib
@@ -52,3 +52,51 @@ def test_run_periodically():
 
     assert mock.call_count == expected_number_of_calls
     assert mock.mock_calls == [call("arg1", arg2="arg2") for _ in range(expected_number_of_calls)]
+
+
+def test_main_thread_dispatcher_runs_callbacks_in_order_from_a_single_idle_source():
+    dispatcher = glib.MainThreadDispatcher()
+    mock = Mock()
+
+    dispatcher.dispatch(mock.first, "arg1")
+    dispatcher.dispatch(mock.second, arg2="arg2")
+
+    assert dispatcher.queue_depth == 2
+
+    process_gtk_events()
+
+    assert mock.mock_calls == [call.first("arg1"), call.second(arg2="arg2")]
+    assert dispatcher.queue_depth == 0
+
+
+def test_main_thread_dispatcher_only_runs_latest_callback_dispatched_with_the_same_key():
+    dispatcher = glib.MainThreadDispatcher()
+    mock = Mock()
+
+    dispatcher.dispatch(mock.update, "connecting", key="connection-status")
+    dispatcher.dispatch(mock.other)
+    dispatcher.dispatch(mock.update, "connected", key="connection-status")
+
+    process_gtk_events()
+
+    assert mock.mock_calls == [call.update("connected"), call.other()]
+    stats = dispatcher.get_stats()
+    assert stats["dispatched"] == 3
+    assert stats["coalesced"] == 1
+    assert stats["max_queue_depth"] == 2
+    assert stats["latency_max"] is not None
+
+
+def test_main_thread_dispatcher_keeps_running_callbacks_after_one_of_them_fails():
+    dispatcher = glib.MainThreadDispatcher()
+    failing_callback = Mock(side_effect=RuntimeError("Expected error"))
+    callback = Mock()
+
+    dispatcher.dispatch(failing_callback)
+    dispatcher.dispatch(callback)
+
+    with patch("sys.excepthook") as excepthook_mock:
+        process_gtk_events()
+
+    excepthook_mock.assert_called_once()
+    callback.assert_called_once()
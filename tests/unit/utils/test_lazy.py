@@ -0,0 +1,43 @@
+"""
+Copyright (c) 2023 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import sys
+
+from proton.vpn.app.gtk.utils.lazy import lazy_import
+
+
+def test_lazy_import_only_imports_module_the_first_time_it_is_used(monkeypatch, tmp_path):
+    (tmp_path / "lazily_imported_module.py").write_text(
+        "class Dialog:\n"
+        "    def __init__(self, title):\n"
+        "        self.title = title\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    Dialog = lazy_import("lazily_imported_module", "Dialog")
+
+    assert "lazily_imported_module" not in sys.modules
+    assert not Dialog.is_loaded
+
+    dialog = Dialog(title="title")
+
+    assert "lazily_imported_module" in sys.modules
+    assert Dialog.is_loaded
+    assert dialog.title == "title"
+    assert Dialog.__name__ == "Dialog"
+    monkeypatch.delitem(sys.modules, "lazily_imported_module")
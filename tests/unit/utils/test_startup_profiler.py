@@ -0,0 +1,80 @@
+"""
+Copyright (c) 2023 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import json
+
+import pytest
+
+from proton.vpn.app.gtk.utils.startup_profiler import (
+    StartupProfiler, get_trace_file_path, remove_profile_startup_option,
+    DEFAULT_TRACE_FILE_PATH, PROFILE_STARTUP_ENV_VAR
+)
+
+
+@pytest.mark.parametrize("argv,environ,expected_trace_file_path", [
+    (["protonvpn-app"], {}, None),
+    (["protonvpn-app", "--profile-startup"], {}, DEFAULT_TRACE_FILE_PATH),
+    (["protonvpn-app", "--profile-startup=/tmp/trace.json"], {}, "/tmp/trace.json"),
+    (["protonvpn-app"], {PROFILE_STARTUP_ENV_VAR: "1"}, DEFAULT_TRACE_FILE_PATH),
+    (["protonvpn-app"], {PROFILE_STARTUP_ENV_VAR: "/tmp/trace.json"}, "/tmp/trace.json"),
+    (["protonvpn-app"], {PROFILE_STARTUP_ENV_VAR: "0"}, None),
+])
+def test_get_trace_file_path(argv, environ, expected_trace_file_path):
+    assert get_trace_file_path(argv, environ) == expected_trace_file_path
+
+
+def test_remove_profile_startup_option():
+    argv = ["protonvpn-app", "--profile-startup=/tmp/trace.json", "--other-option"]
+
+    assert remove_profile_startup_option(argv) == ["protonvpn-app", "--other-option"]
+
+
+def test_startup_profiler_does_not_record_anything_when_not_enabled():
+    profiler = StartupProfiler()
+
+    with profiler.phase("phase"):
+        profiler.mark("milestone")
+
+    assert profiler.to_trace()["traceEvents"] == []
+    assert profiler.finish() is None
+
+
+def test_startup_profiler_writes_phases_milestones_and_imports_to_trace_file(
+        tmp_path, monkeypatch
+):
+    module_path = tmp_path / "module_imported_while_profiling.py"
+    module_path.write_text("VALUE = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    trace_file_path = tmp_path / "trace.json"
+    profiler = StartupProfiler()
+
+    profiler.enable(str(trace_file_path))
+    with profiler.phase("phase"):
+        import module_imported_while_profiling  # noqa: F401 pylint: disable=C0415,W0611,E0401
+        profiler.mark("milestone")
+
+    assert profiler.finish() == str(trace_file_path)
+
+    trace = json.loads(trace_file_path.read_text())
+    events_by_name = {event["name"]: event for event in trace["traceEvents"]}
+    assert events_by_name["phase"]["ph"] == "X"
+    assert events_by_name["milestone"]["ph"] == "i"
+    assert events_by_name["import module_imported_while_profiling"]["cat"] == "import"
+    assert "module_imported_while_profiling" in trace["otherData"][
+        "import_time_per_top_level_module_ms"
+    ]
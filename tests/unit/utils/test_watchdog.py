@@ -0,0 +1,81 @@
+"""
+Copyright (c) 2023 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import time
+from unittest.mock import patch
+
+from gi.repository import GLib
+
+from proton.vpn.app.gtk.utils.executor import AsyncExecutor
+from proton.vpn.app.gtk.utils.watchdog import LagWatchdog, StallHistogram
+from tests.unit.testing_utils import run_main_loop
+
+
+def test_stall_histogram_counts_stalls_per_bucket():
+    histogram = StallHistogram()
+
+    histogram.add(80)
+    histogram.add(300)
+    histogram.add(400)
+    histogram.add(60000)
+
+    assert histogram.counts["<=100ms"] == 1
+    assert histogram.counts["<=500ms"] == 2
+    assert histogram.counts[">10000ms"] == 1
+    assert str(histogram) == "<=100ms: 1, <=500ms: 2, >10000ms: 1"
+
+
+@patch("proton.vpn.app.gtk.utils.watchdog.logger")
+def test_watchdog_logs_the_stack_of_the_handler_stalling_the_glib_main_loop(logger_mock):
+    watchdog = LagWatchdog(interval_ms=10, threshold_ms=50)
+    main_loop = GLib.MainLoop()
+
+    def stall_main_loop():
+        time.sleep(0.3)
+        GLib.timeout_add(50, main_loop.quit)
+        return False
+
+    watchdog.start()
+    GLib.timeout_add(50, stall_main_loop)
+    try:
+        run_main_loop(main_loop)
+    finally:
+        watchdog.stop()
+
+    messages = [call.args[0] for call in logger_mock.warning.call_args_list]
+    assert any("stall_main_loop" in message for message in messages)
+    assert sum(watchdog.glib_loop.histogram.counts.values()) == 1
+
+
+@patch("proton.vpn.app.gtk.utils.watchdog.logger")
+def test_watchdog_logs_the_stack_of_the_coroutine_stalling_the_asyncio_loop(logger_mock):
+    async def stall_asyncio_loop():
+        time.sleep(0.3)
+
+    with AsyncExecutor() as executor:
+        watchdog = LagWatchdog(executor, interval_ms=10, threshold_ms=50)
+        watchdog.start()
+        try:
+            time.sleep(0.05)
+            executor.submit(stall_asyncio_loop).result()
+            time.sleep(0.05)
+        finally:
+            watchdog.stop()
+
+    messages = [call.args[0] for call in logger_mock.warning.call_args_list]
+    assert any("stall_asyncio_loop" in message for message in messages)
@@ -18,6 +18,7 @@ along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
 
 import pytest
+from concurrent.futures import Future
 from unittest.mock import Mock, PropertyMock, patch
 from tests.unit.testing_utils import process_gtk_events
 from proton.vpn.app.gtk.widgets.headerbar.menu.settings.connection_settings import ConnectionSettings
@@ -39,7 +40,9 @@ PLUS_TIER = 1
 @pytest.fixture
 def mocked_controller_and_protocol():
     controller_mock = Mock(name="controller")
-    controller_mock.get_available_protocols.return_value = [MockOpenVPNTCP, MockOpenVPNUDP]
+    available_protocols = Future()
+    available_protocols.set_result([MockOpenVPNTCP, MockOpenVPNUDP])
+    controller_mock.get_available_protocols.return_value = available_protocols
 
     property_mock = PropertyMock(name="protocol", return_value=MockOpenVPNTCP.cls.protocol)
     type(controller_mock.get_settings.return_value).protocol = property_mock
@@ -104,6 +107,29 @@ def test_protocol_when_switching_switch_protocol_and_ensure_changes_are_saved(mo
     controller_mock.save_settings.assert_called_once()
 
 
+@patch("proton.vpn.app.gtk.widgets.headerbar.menu.settings.connection_settings.run_on_main_thread")
+def test_protocol_combobox_is_populated_once_available_protocols_are_known(
+        run_on_main_thread_mock, mocked_controller_and_protocol
+):
+    controller_mock, protocol_mock = mocked_controller_and_protocol
+    available_protocols = Future()
+    controller_mock.get_available_protocols.return_value = available_protocols
+    run_on_main_thread_mock.side_effect = lambda function, *args: function(*args)
+
+    connection_settings = ConnectionSettings(controller_mock, Mock())
+    connection_settings.build_protocol()
+
+    combobox = connection_settings.protocol_row.interactive_object
+    assert not combobox.get_sensitive()
+    protocol_mock.assert_not_called()
+
+    available_protocols.set_result([MockOpenVPNTCP, MockOpenVPNUDP])
+
+    assert combobox.get_sensitive()
+    assert combobox.get_active_id() == MockOpenVPNTCP.cls.protocol
+    controller_mock.save_settings.assert_not_called()
+
+
 @pytest.mark.parametrize("is_connection_active", [False, True])    
 def test_protocol_when_reconnect_message_reacts_accordingly_if_there_is_an_active_connection_or_not(is_connection_active, mocked_controller_and_protocol):
     controller_mock, protocol_mock = mocked_controller_and_protocol
@@ -185,6 +211,29 @@ def test_vpn_accelerator_when_clientconfig_dictates_the_setting_state(is_client_
         assert not connection_settings.vpn_accelerator_row
 
 
+@patch("proton.vpn.app.gtk.widgets.headerbar.menu.settings.connection_settings.run_on_main_thread")
+def test_protocol_combobox_is_populated_once_available_protocols_are_known(
+        run_on_main_thread_mock, mocked_controller_and_protocol
+):
+    controller_mock, protocol_mock = mocked_controller_and_protocol
+    available_protocols = Future()
+    controller_mock.get_available_protocols.return_value = available_protocols
+    run_on_main_thread_mock.side_effect = lambda function, *args: function(*args)
+
+    connection_settings = ConnectionSettings(controller_mock, Mock())
+    connection_settings.build_protocol()
+
+    combobox = connection_settings.protocol_row.interactive_object
+    assert not combobox.get_sensitive()
+    protocol_mock.assert_not_called()
+
+    available_protocols.set_result([MockOpenVPNTCP, MockOpenVPNUDP])
+
+    assert combobox.get_sensitive()
+    assert combobox.get_active_id() == MockOpenVPNTCP.cls.protocol
+    controller_mock.save_settings.assert_not_called()
+
+
 @pytest.mark.parametrize("is_connection_active", [False, True])    
 def test_vpn_accelerator_when_reconnect_message_reacts_accordingly_if_there_is_an_active_connection_or_not(is_connection_active, mocked_controller_and_vpn_accelerator):
     controller_mock, vpn_accelerator_mock = mocked_controller_and_vpn_accelerator
@@ -267,6 +316,29 @@ def test_moderate_nat_when_clientconfig_dictates_the_setting_state(is_client_con
         assert not connection_settings.moderate_nat_row
 
 
+@patch("proton.vpn.app.gtk.widgets.headerbar.menu.settings.connection_settings.run_on_main_thread")
+def test_protocol_combobox_is_populated_once_available_protocols_are_known(
+        run_on_main_thread_mock, mocked_controller_and_protocol
+):
+    controller_mock, protocol_mock = mocked_controller_and_protocol
+    available_protocols = Future()
+    controller_mock.get_available_protocols.return_value = available_protocols
+    run_on_main_thread_mock.side_effect = lambda function, *args: function(*args)
+
+    connection_settings = ConnectionSettings(controller_mock, Mock())
+    connection_settings.build_protocol()
+
+    combobox = connection_settings.protocol_row.interactive_object
+    assert not combobox.get_sensitive()
+    protocol_mock.assert_not_called()
+
+    available_protocols.set_result([MockOpenVPNTCP, MockOpenVPNUDP])
+
+    assert combobox.get_sensitive()
+    assert combobox.get_active_id() == MockOpenVPNTCP.cls.protocol
+    controller_mock.save_settings.assert_not_called()
+
+
 @pytest.mark.parametrize("is_connection_active", [False, True])    
 def test_moderate_nat_when_reconnect_message_reacts_accordingly_if_there_is_an_active_connection_or_not(is_connection_active, mocked_controller_and_moderate_nat):
     controller_mock, moderate_nat_mock = mocked_controller_and_moderate_nat
@@ -300,3 +372,19 @@ def test_moderate_nat_upgrade_tag_override_interactive_object_if_plan_upgrade_is
         assert feature_settings.moderate_nat_row.overriden_by_upgrade_tag
     else:
         assert not feature_settings.moderate_nat_row.overriden_by_upgrade_tag
+
+
+def test_reconnection_statistics_are_shown_only_once_a_vpn_connection_was_restored():
+    controller_mock = Mock(name="controller")
+    controller_mock.reconnection_metrics.get_summary.return_value = {
+        "outages": 0, "time_to_connected_s": {"p50": None, "p90": None, "p99": None}
+    }
+    connection_settings = ConnectionSettings(controller_mock, Mock())
+    connection_settings.build_reconnection_statistics()
+    assert connection_settings.reconnection_statistics_row is None
+
+    controller_mock.reconnection_metrics.get_summary.return_value = {
+        "outages": 4, "time_to_connected_s": {"p50": 1.5, "p90": 8.25, "p99": 9}
+    }
+    connection_settings.build_reconnection_statistics()
+    assert connection_settings.reconnection_statistics_row is not None
@@ -143,17 +143,3 @@ def test_tray_pinned_servers_when_changing_entry_and_leaving_focus_ensuring_chan
         _new_setting = []
 
     tray_pinned_servers_mock.assert_called_once_with(_new_setting)
-
-
-def test_tray_pinned_servers_when_changing_entry_and_leaving_focus_ensuring_tray_reload_pinned_servers(mocked_controller_and_tray_pinned_servers):
-    controller_mock, tray_pinned_servers_mock = mocked_controller_and_tray_pinned_servers
-
-    tray_indicator_mock = Mock()
-
-    general_settings = GeneralSettings(controller_mock, tray_indicator_mock)
-    general_settings.build_tray_pinned_servers()
-
-    general_settings.tray_pinned_servers_row.interactive_object.set_text("")
-    general_settings.tray_pinned_servers_row.interactive_object.emit("focus-out-event", Gdk.Event(Gdk.EventType.FOCUS_CHANGE))
-
-    tray_indicator_mock.reload_pinned_servers.assert_called_once()
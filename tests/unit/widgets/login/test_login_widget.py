@@ -17,7 +17,7 @@ You should have received a copy of the GNU General Public License
 along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
 import pytest
-from unittest.mock import Mock, patch, PropertyMock
+from unittest.mock import Mock, patch
 
 from proton.vpn.app.gtk.widgets.login.login_widget import LoginStack, KillSwitchSettingEnum, LoginWidget
 from tests.unit.testing_utils import process_gtk_events
@@ -78,8 +78,6 @@ def test_login_widget_displays_disable_killswitch_revealer_if_permanent_kill_swi
 @patch("proton.vpn.app.gtk.widgets.login.login_widget.Gtk.Box.pack_end")
 def test_login_widget_enables_login_form_and_updates_settings_when_killswitch_is_disabled(pack_end_mock, pack_start_mock):
     controller_mock = Mock()
-    killswitch_property_mock = PropertyMock()
-    type(controller_mock.get_settings.return_value).killswitch = killswitch_property_mock
     disable_killswitch_widget_mock = Mock()
     login_stack_mock = Mock()
 
@@ -91,7 +89,6 @@ def test_login_widget_enables_login_form_and_updates_settings_when_killswitch_is
     callback = disable_killswitch_widget_mock.connect.mock_calls[0].args[1]
     callback(None)
 
-    killswitch_property_mock.assert_called_once_with(KillSwitchSettingEnum.OFF)
-    controller_mock.save_settings.assert_called_once()
+    controller_mock.disable_killswitch.assert_called_once()
     disable_killswitch_widget_mock.set_reveal_child.assert_called_once_with(False)
     login_stack_mock.login_form.set_property.assert_called_once_with("sensitive", True)
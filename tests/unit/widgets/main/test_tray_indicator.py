@@ -331,6 +331,26 @@ def test_remove_pinned_server_entry_when_user_has_logged_out(controller_mock):
     assert not tray_indicator.are_servers_pinned
 
 
+def test_pinned_server_entries_are_reloaded_when_app_configuration_changes(controller_mock):
+    indicator_mock = Mock()
+    main_window = Mock()
+    main_window.get_visible.return_value = True
+
+    controller_mock.user_logged_in = True
+    controller_mock.current_connection_status = states.Disconnected()
+    controller_mock.app_configuration.tray_pinned_servers = ["TEST#30"]
+
+    tray_indicator = TrayIndicator(controller=controller_mock, main_window=main_window, native_indicator=indicator_mock)
+    process_gtk_events()
+
+    controller_mock.app_configuration.tray_pinned_servers = ["TEST#40"]
+    on_app_config_changed = controller_mock.app_config_store.connect.call_args.args[1]
+    on_app_config_changed(controller_mock.app_config_store, controller_mock.app_configuration)
+    process_gtk_events()
+
+    assert tray_indicator.top_most_pinned_server_entry.get_label() == "TEST#40"
+
+
 def test_ensure_pinned_server_entries_remain_in_order_after_user_has_logged_out_and_logged_in(controller_mock):
     indicator_mock = Mock()
     main_window = Mock()
@@ -119,7 +119,7 @@ def test_display_initializes_widget(server_list):
 
     connection_status_subscriber.connection_status_update.assert_called_once()  # (1)
     controller_mock.register_connection_status_subscriber.assert_called_once_with(vpn_widget)  # (2)
-    controller_mock.reconnector.enable.assert_called_once()  # (3)
+    controller_mock.enable_reconnector.assert_called_once()  # (3)
     assert vpn_widget_ready_event.wait(timeout=0), "vpn-data-ready signal was not sent."  # (4)
 
 
@@ -156,5 +156,5 @@ def test_unload_resets_widget_state():
 
     controller_mock.disconnect.assert_called_once()  # (1)
     controller_mock.unregister_connection_status_subscriber.assert_called_once_with(vpn_widget)  # (2)
-    controller_mock.reconnector.disable.assert_called_once()  # (3)
+    controller_mock.disable_reconnector.assert_called_once()  # (3)
     controller_mock.vpn_data_refresher.disable.assert_called_once()  # (4)